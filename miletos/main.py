@@ -1,14 +1,16 @@
 import time as modutime
 
 import os, fnmatch
+import hashlib
 import sys, datetime
 import numpy as np
 import scipy.interpolate
+import scipy.optimize
 import scipy.stats
 
 from tqdm import tqdm
 
-from numba import jit, prange
+from numba import jit, prange, set_num_threads, get_num_threads
 
 import pandas as pd
 
@@ -3393,9 +3395,9 @@ def plot_popl(gdat, strgpdfn):
                                 plt.close()
 
    
-def bdtr_wrap(gdat, b, p, y, epocmask, perimask, duramask, strgintp, strgoutp, strgtren, timescalbdtr):
+def bdtr_wrap(gdat, b, p, y, epocmask, perimask, duramask, strgintp, strgoutp, strgtren, timescalbdtr, dictwarm=None):
     '''
-    Wrap baseline-detrending function
+    Wrap baseline-detrending function, where dictwarm, if provided, keeps the detrended regions of each channel across calls
     '''
     
     # output
@@ -3404,10 +3406,22 @@ def bdtr_wrap(gdat, b, p, y, epocmask, perimask, duramask, strgintp, strgoutp, s
     # trend
     gdat.listarrytser[strgtren][b][p][y] = np.copy(gdat.listarrytser[strgintp][b][p][y])
     
-    for e in gdat.indxener[p]:
-        gdat.rflxbdtr, gdat.rflxbdtrregi, gdat.listindxtimeregi[b][p][y], gdat.indxtimeregioutt[b][p][y], gdat.listobjtspln[b][p][y], gdat.listtimebrek = \
-                     bdtr_tser(gdat.listarrytser[strgintp][b][p][y][:, e, 0], gdat.listarrytser[strgintp][b][p][y][:, e, 1], \
-                                       stdvlcur=gdat.listarrytser[strgintp][b][p][y][:, e, 2], \
+    arry = gdat.listarrytser[strgintp][b][p][y]
+    
+    # Boolean flag to detrend all channels at once, which is possible when they share the same times, and hence the same regions, masks and knots
+    boolbdtrmult = gdat.numbener[p] > 1 and gdat.typebdtr != 'GaussianProcess' and (arry[:, :, 0] == arry[:, 0, None, 0]).all()
+    
+    if boolbdtrmult:
+        if dictwarm is not None:
+            if not 'mult' in dictwarm:
+                dictwarm['mult'] = dict()
+            dictwarmener = dictwarm['mult']
+        else:
+            dictwarmener = None
+        
+        gdat.rflxbdtr, gdat.rflxbdtrregi, gdat.listindxtimeregi[b][p][y], gdat.indxtimeregioutt[b][p][y], listobjtspln, gdat.listtimebrek = \
+                     bdtr_tser(arry[:, 0, 0], arry[:, :, 1], \
+                                       stdvlcur=arry[:, :, 2], \
                                        epocmask=epocmask, perimask=perimask, duramask=duramask, \
                                        timescalbdtr=timescalbdtr, \
                                        typeverb=gdat.typeverb, \
@@ -3417,9 +3431,50 @@ def bdtr_wrap(gdat, b, p, y, epocmask, perimask, duramask, strgintp, strgoutp, s
                                        timescalbdtrmedi=gdat.timescalbdtrmedi, \
                                        boolbrekregi=gdat.boolbrekregi, \
                                        typebdtr=gdat.typebdtr, \
+                                       dictwarm=dictwarmener, \
+                                       objtpool=gdat.objtpoolbdtr, \
+                                       booloptigpro=gdat.booloptigpro, \
                                       )
-    
-        gdat.listarrytser[strgoutp][b][p][y][:, e, 1] = np.concatenate(gdat.rflxbdtrregi)
+        
+        gdat.listarrytser[strgoutp][b][p][y][:, :, 1] = np.concatenate(gdat.rflxbdtrregi, 0)
+        
+        # splines of the channel used for clipping
+        if listobjtspln is None:
+            gdat.listobjtspln[b][p][y] = None
+        else:
+            gdat.listobjtspln[b][p][y] = [[] for i in range(len(listobjtspln))]
+            for i in range(len(listobjtspln)):
+                if listobjtspln[i] is None:
+                    gdat.listobjtspln[b][p][y][i] = None
+                else:
+                    gdat.listobjtspln[b][p][y][i] = scipy.interpolate.BSpline(listobjtspln[i].t, listobjtspln[i].c[:, gdat.indxenerclip], listobjtspln[i].k)
+    else:
+        for e in gdat.indxener[p]:
+            if dictwarm is not None:
+                if not e in dictwarm:
+                    dictwarm[e] = dict()
+                dictwarmener = dictwarm[e]
+            else:
+                dictwarmener = None
+            
+            gdat.rflxbdtr, gdat.rflxbdtrregi, gdat.listindxtimeregi[b][p][y], gdat.indxtimeregioutt[b][p][y], gdat.listobjtspln[b][p][y], gdat.listtimebrek = \
+                         bdtr_tser(arry[:, e, 0], arry[:, e, 1], \
+                                           stdvlcur=arry[:, e, 2], \
+                                           epocmask=epocmask, perimask=perimask, duramask=duramask, \
+                                           timescalbdtr=timescalbdtr, \
+                                           typeverb=gdat.typeverb, \
+                                           timeedge=gdat.listtimebrek, \
+                                           timebrekregi=gdat.timebrekregi, \
+                                           ordrspln=gdat.ordrspln, \
+                                           timescalbdtrmedi=gdat.timescalbdtrmedi, \
+                                           boolbrekregi=gdat.boolbrekregi, \
+                                           typebdtr=gdat.typebdtr, \
+                                           dictwarm=dictwarmener, \
+                                           objtpool=gdat.objtpoolbdtr, \
+                                           booloptigpro=gdat.booloptigpro, \
+                                          )
+        
+            gdat.listarrytser[strgoutp][b][p][y][:, e, 1] = np.concatenate(gdat.rflxbdtrregi)
     
     numbsplnregi = len(gdat.rflxbdtrregi)
     gdat.indxsplnregi[b][p][y] = np.arange(numbsplnregi)
@@ -3752,8 +3807,92 @@ def retr_namebdtrclip(e, r):
     return strgarrybdtrinpt, strgarryclipoutp, strgarrybdtroutp, strgarryclipinpt, strgarrybdtrblin
 
 
-def rebn_tser(arry, numbbins=None, delt=None, blimxdat=None):
+# cache of rebinned time-series shared by the callers of rebn_tser that enable it, ordered from the least to the most recently used
+dictcachrebn = {'dictarry': dict(), 'sizetotl': 0, 'maxmsize': 500e6, 'numbhits': 0, 'numbmiss': 0}
+
+
+def setp_cachrebn(maxmsize=None, boolclea=False):
+    '''
+    Set the maximum memory [bytes] of the cache of rebinned time-series and optionally clear the cache.
+    '''
+    
+    if boolclea:
+        dictcachrebn['dictarry'] = dict()
+        dictcachrebn['sizetotl'] = 0
+        dictcachrebn['numbhits'] = 0
+        dictcachrebn['numbmiss'] = 0
+    
+    if maxmsize is not None:
+        dictcachrebn['maxmsize'] = maxmsize
+    
+    # evict the least recently used rebinned time-series until the cache fits in memory
+    while dictcachrebn['sizetotl'] > dictcachrebn['maxmsize'] and len(dictcachrebn['dictarry']) > 0:
+        strgkeyy = next(iter(dictcachrebn['dictarry']))
+        dictcachrebn['sizetotl'] -= dictcachrebn['dictarry'].pop(strgkeyy).nbytes
+
+
+def retr_strghasharry(arry):
+    '''
+    Return the hash of the content of a time-series, which takes a pass over the time-series and should therefore be computed once 
+    when the same time-series is rebinned many times.
+    '''
+    
+    objthash = hashlib.sha1()
+    arry = np.ascontiguousarray(arry)
+    objthash.update(repr((arry.shape, arry.dtype.str)).encode())
+    objthash.update(arry.view(np.uint8))
+    
+    return objthash.hexdigest()
+
+
+def retr_strgkeyyrebn(strghasharry, numbbins, delt, blimxdat):
+    '''
+    Return the key of a rebinned time-series in the cache, given the hash of the content of the time-series and the binning.
+    '''
+    
+    objthash = hashlib.sha1()
+    objthash.update(repr((strghasharry, numbbins, delt)).encode())
+    if blimxdat is not None:
+        objthash.update(np.ascontiguousarray(blimxdat, dtype=float).view(np.uint8))
+    
+    return objthash.hexdigest()
+
+
+def rebn_tser(arry, numbbins=None, delt=None, blimxdat=None, \
+              
+              # Boolean flag to look up and store the rebinned time-series in the cache of rebinned time-series, 
+              # which is only worth it when the same time-series is rebinned repeatedly, since the lookup hashes the time-series
+              boolcach=False, \
+              
+              # hash of the content of the time-series, as returned by retr_strghasharry, which is computed if not provided
+              strghasharry=None, \
+             ):
+    '''
+    Rebin a time-series into bins of equal number, width, or given limits.
+    '''
     
+    if boolcach:
+        if strghasharry is None:
+            strghasharry = retr_strghasharry(arry)
+        strgkeyy = retr_strgkeyyrebn(strghasharry, numbbins, delt, blimxdat)
+        if strgkeyy in dictcachrebn['dictarry']:
+            # move the rebinned time-series to the most recently used end of the cache
+            arryrebn = dictcachrebn['dictarry'].pop(strgkeyy)
+            dictcachrebn['dictarry'][strgkeyy] = arryrebn
+            dictcachrebn['numbhits'] += 1
+            
+            # return a copy since callers may modify the rebinned time-series
+            return arryrebn.copy()
+        
+        dictcachrebn['numbmiss'] += 1
+        arryrebn = rebn_tser(arry, numbbins=numbbins, delt=delt, blimxdat=blimxdat, boolcach=False)
+        if arryrebn.nbytes <= dictcachrebn['maxmsize']:
+            dictcachrebn['dictarry'][strgkeyy] = arryrebn.copy()
+            dictcachrebn['sizetotl'] += arryrebn.nbytes
+            setp_cachrebn()
+        
+        return arryrebn
+
     if not (numbbins is None and delt is None and blimxdat is not None or \
             numbbins is not None and delt is None and blimxdat is None or \
             numbbins is None and delt is not None and blimxdat is None):
@@ -3800,9 +3939,18 @@ def rebn_tser(arry, numbbins=None, delt=None, blimxdat=None):
     else:
         arryrebn[:, 0] = bctrxdat
 
+    # the samples in each bin are contiguous if the time-series is sorted, which avoids scanning all samples for each bin
+    boolsort = (np.diff(xdat) >= 0).all()
+    if boolsort:
+        indxxdatinit = np.searchsorted(xdat, blimxdat[:-1], side='right')
+        indxxdatfinl = np.searchsorted(xdat, blimxdat[1:], side='left')
+    
     indxbins = np.arange(numbbins)
     for k in indxbins:
-        indxxdat = np.where((xdat < blimxdat[k+1]) & (xdat > blimxdat[k]))[0]
+        if boolsort:
+            indxxdat = np.arange(indxxdatinit[k], max(indxxdatinit[k], indxxdatfinl[k]))
+        else:
+            indxxdat = np.where((xdat < blimxdat[k+1]) & (xdat > blimxdat[k]))[0]
         if indxxdat.size > 0:
             #if arry.ndim == 3:
             arryrebn[k, ..., 1] = np.mean(arry[indxxdat, ..., 1], axis=0)
@@ -4885,7 +5033,228 @@ def setp_modlbase(gdat, strgmodl, h=None):
                 setp_para(gdat, strgmodl, 'mass', 0.1, 100., ['$M_c$', ''], strgcomp=strgcomp)
 
 
+def retr_powrlspemult(time, lcur, freq, \
+                      
+                      # maximum number of elements of the blocks of trigonometric functions of frequency and time held in memory
+                      maxmsizeblok=int(1e7), \
+                     ):
+    '''
+    Return the Lomb-Scargle power, with a floating mean and the standard normalization, of many channels sampled at the same times, 
+    where the trigonometric sums over the times are computed once per trial frequency and the power of all channels is evaluated as a matrix product.
+    '''
+    
+    numbtime = time.size
+    numbfreq = freq.size
+    
+    # the power does not depend on the time origin
+    timecntr = time - np.mean(time)
+    
+    lcurcntr = lcur - np.mean(lcur, axis=0)[None, :]
+    sumssqualcur = np.sum(lcurcntr**2, axis=0)
+    
+    powr = np.empty((numbfreq, lcur.shape[1]))
+    numbfreqblok = max(1, maxmsizeblok // numbtime)
+    for indxfreqinit in range(0, numbfreq, numbfreqblok):
+        indxfreq = slice(indxfreqinit, min(indxfreqinit + numbfreqblok, numbfreq))
+        
+        phas = 2. * np.pi * freq[indxfreq, None] * timecntr[None, :]
+        cosi = np.cos(phas)
+        sine = np.sin(phas)
+        
+        # trigonometric sums shared by all channels
+        sumscosi = np.sum(cosi, axis=1)
+        sumssine = np.sum(sine, axis=1)
+        sumscosisqua = np.sum(cosi**2, axis=1)
+        sumscosisine = np.sum(cosi * sine, axis=1)
+        
+        # covariances of the cosine and sine terms after subtracting their means
+        covacc = sumscosisqua - sumscosi**2 / numbtime
+        covass = numbtime - sumscosisqua - sumssine**2 / numbtime
+        covacs = sumscosisine - sumscosi * sumssine / numbtime
+        
+        # projections of all channels onto the cosine and sine terms
+        projcosi = cosi @ lcurcntr
+        projsine = sine @ lcurcntr
+        
+        powr[indxfreq, :] = (covass[:, None] * projcosi**2 + covacc[:, None] * projsine**2 - 2. * covacs[:, None] * projcosi * projsine) / \
+                                                                            (covacc * covass - covacs**2)[:, None] / sumssqualcur[None, :]
+    
+    return powr
+
+
+def read_lspe(path):
+    '''
+    Read the LS periodogram, its peak and its false-alarm levels along with the hash of the inputs.
+    '''
+    
+    objtfile = np.load(path)
+    
+    dictlspe = dict()
+    for name in ['peri', 'powr', 'perimpow', 'powrmpow', 'listprob', 'powrfals']:
+        dictlspe[name] = objtfile[name]
+    dictlspe['strghash'] = str(objtfile['strghash'])
+    
+    return dictlspe
+
+
+def writ_lspe(path, dictlspe):
+    '''
+    Write the LS periodogram, its peak and its false-alarm levels along with the hash of the inputs.
+    '''
+    
+    print('Writing to %s...' % path)
+    with open(path, 'wb') as objtfile:
+        np.savez(objtfile, **dictlspe)
+
+
+# cache of the frequency grids of the LS periodogram, keyed by the minimum and maximum frequencies and the oversampling factor
+dictcachfreqlspe = dict()
+
+
+def retr_freqlspe(minmfreq, maxmfreq, factosam, \
+                  
+                  # maximum number of frequency grids held in the cache
+                  maxmnumbcach=10, \
+                 ):
+    '''
+    Return the regular frequency grid of the LS periodogram with a step of the minimum frequency divided by twice the oversampling factor, 
+    which is cached, read-only, and reused by all calls with the same minimum and maximum frequencies and oversampling factor.
+    '''
+    
+    strgkeyy = repr((minmfreq, maxmfreq, factosam))
+    if strgkeyy not in dictcachfreqlspe:
+        if len(dictcachfreqlspe) >= maxmnumbcach:
+            del dictcachfreqlspe[next(iter(dictcachfreqlspe))]
+        
+        # determine the frequency sampling resolution with N samples per line
+        deltfreq = minmfreq / factosam / 2.
+        dictcachfreqlspe[strgkeyy] = np.arange(minmfreq, maxmfreq, deltfreq)
+        
+        # the cached grid is shared by all callers
+        dictcachfreqlspe[strgkeyy].flags.writeable = False
+    
+    return dictcachfreqlspe[strgkeyy]
+
+
+def retr_gridextr(posi, valu, numbgrid, numbextr):
+    '''
+    Return the values of many channels, whose shape is (number of positions, number of channels), extirpolated onto the integer grid range(numbgrid) 
+    with Lagrange weights on the numbextr nearest grid points (Press & Rybicki 1989), where the weights are shared by all channels.
+    '''
+    
+    grid = np.zeros((numbgrid, valu.shape[1]), dtype=valu.dtype)
+    
+    # positions on the grid
+    boolintg = posi % 1 == 0
+    np.add.at(grid, posi[boolintg].astype(int), valu[boolintg])
+    posi = posi[~boolintg]
+    valu = valu[~boolintg]
+    
+    # lowest grid point of the extirpolation range of each position
+    indxlowr = np.clip((posi - numbextr // 2).astype(int), 0, numbgrid - numbextr)
+    numr = valu * np.prod(posi - indxlowr - np.arange(numbextr)[:, None], 0)[:, None]
+    deno = float(np.prod(np.arange(1, numbextr)))
+    for j in range(numbextr):
+        if j > 0:
+            deno *= j / (j - numbextr)
+        indx = indxlowr + numbextr - 1 - j
+        np.add.at(grid, indx, numr / (deno * (posi - indx))[:, None])
+    
+    return grid
+
+
+def retr_sumstrigfftt(time, valu, minmfreq, deltfreq, numbfreq, factosamfftt, numbextr):
+    '''
+    Return the sums over times of the values of many channels times the cosine and sine at the frequencies minmfreq + deltfreq * k, for k < numbfreq, 
+    by extirpolating onto a regular grid oversampled by factosamfftt and taking a single FFT of all channels.
+    '''
+    
+    numbfftt = int(2**np.ceil(np.log2(numbfreq * factosamfftt)))
+    
+    # the sums at the minimum frequency are shifted to the zeroth frequency of the FFT
+    valushft = valu * np.exp(2j * np.pi * minmfreq * time)[:, None]
+    
+    posi = (time * numbfftt * deltfreq) % numbfftt
+    grid = retr_gridextr(posi, valushft, numbfftt, numbextr)
+    fftt = np.fft.ifft(grid, axis=0, norm='forward')[:numbfreq, :]
+    
+    return fftt.real, fftt.imag
+
+
+def retr_powrlspefast(time, lcur, freq, tolrlspe, \
+                      
+                      # number of frequencies at which the power is also evaluated exactly to estimate the error
+                      numbfreqtest=100, \
+                     ):
+    '''
+    Return the LS power, with a floating mean and the standard normalization, on a regular frequency grid in O(N log N) time, 
+    by extirpolating the trigonometric sums onto a regular grid and using the FFT (Press & Rybicki 1989). The time-series can have a single channel 
+    or many channels sampled at the same times, in which case the sums that do not depend on the channel are computed once and the channels share one FFT. 
+    The oversampling of the FFT grid and the number of extirpolation points are increased until the maximum absolute error with respect to the exact power 
+    at a random subset of the frequencies is below tolrlspe. Also return the maximum absolute error and the time the exact evaluation 
+    at all frequencies would take, as estimated from the subset.
+    '''
+    
+    boolmult = lcur.ndim == 2
+    if not boolmult:
+        lcur = lcur[:, None]
+    
+    numbtime = time.size
+    numbfreq = freq.size
+    minmfreq = freq[0]
+    deltfreq = (freq[-1] - freq[0]) / max(numbfreq - 1, 1)
+    
+    # the power does not depend on the time origin
+    timeshft = time - np.amin(time)
+    
+    lcurcntr = lcur - np.mean(lcur, axis=0)[None, :]
+    sumssqualcur = np.sum(lcurcntr**2, axis=0)
+    
+    indxfreqtest = np.sort(np.random.default_rng(0).choice(numbfreq, min(numbfreqtest, numbfreq), replace=False))
+    timeinit = modutime.time()
+    powrtest = retr_powrlspemult(timeshft, lcur, freq[indxfreqtest])
+    timeexac = (modutime.time() - timeinit) * numbfreq / indxfreqtest.size
+    
+    factosamfftt = 5
+    numbextr = 4
+    while True:
+        # trigonometric sums shared by all channels, where those of the squares and products are evaluated at twice the frequency
+        sumscosi, sumssine = retr_sumstrigfftt(timeshft, np.ones((numbtime, 1)), minmfreq, deltfreq, numbfreq, factosamfftt, numbextr)
+        sumscosidoub, sumssinedoub = retr_sumstrigfftt(timeshft, np.ones((numbtime, 1)), 2. * minmfreq, 2. * deltfreq, numbfreq, factosamfftt, numbextr)
+        sumscosisqua = 0.5 * (numbtime + sumscosidoub[:, 0])
+        sumscosisine = 0.5 * sumssinedoub[:, 0]
+        sumscosi = sumscosi[:, 0]
+        sumssine = sumssine[:, 0]
+        
+        # covariances of the cosine and sine terms after subtracting their means
+        covacc = sumscosisqua - sumscosi**2 / numbtime
+        covass = numbtime - sumscosisqua - sumssine**2 / numbtime
+        covacs = sumscosisine - sumscosi * sumssine / numbtime
+        
+        # projections of all channels onto the cosine and sine terms
+        projcosi, projsine = retr_sumstrigfftt(timeshft, lcurcntr, minmfreq, deltfreq, numbfreq, factosamfftt, numbextr)
+        
+        powr = (covass[:, None] * projcosi**2 + covacc[:, None] * projsine**2 - 2. * covacs[:, None] * projcosi * projsine) / \
+                                                                            (covacc * covass - covacs**2)[:, None] / sumssqualcur[None, :]
+        
+        errr = np.amax(np.abs(powr[indxfreqtest, :] - powrtest))
+        if errr < tolrlspe or factosamfftt >= 80:
+            break
+        factosamfftt *= 2
+        numbextr += 2
+    
+    if errr >= tolrlspe:
+        print('Warning! The maximum absolute error of the fast LS periodogram (%g) is above the tolerance (%g).' % (errr, tolrlspe))
+    
+    if not boolmult:
+        powr = powr[:, 0]
+    
+    return powr, errr, timeexac
+
+
 def exec_lspe( \
+              # time-series, either with a single channel, whose shape is (number of times, 3), 
+              # or with many channels sampled at the same times, whose shape is (number of times, number of channels, 3)
               arrylcur, \
               
               pathvisu=None, \
@@ -4902,6 +5271,15 @@ def exec_lspe( \
               maxmfreq=None, \
               
               factosam=3., \
+              
+              # type of the evaluation of the periodogram
+              ## 'auto': astropy's default method
+              ## 'exact': direct summation over all times at each frequency
+              ## 'fast': O(N log N) evaluation by extirpolation and FFT with a maximum absolute error of tolrlspe in the power
+              typecalc='auto', \
+              
+              # maximum absolute error in the power when typecalc is 'fast'
+              tolrlspe=1e-4, \
 
               # factor to scale the size of text in the figures
               factsizetextfigr=1., \
@@ -4918,7 +5296,8 @@ def exec_lspe( \
              
              ):
     '''
-    Calculate the LS periodogram of a time-series.
+    Calculate the LS periodogram of a time-series. The periodograms of the channels of a multi-channel time-series are computed at once 
+    and the period and power at the maximum power are returned for each channel.
     '''
     
     if maxmfreq is not None and factnyqt is not None:
@@ -4929,18 +5308,32 @@ def exec_lspe( \
     if pathvisu is not None:
         pathplot = pathvisu + 'LSPeriodogram_%s.%s' % (strgextn, typefileplot)
 
+    # the periodogram, its peak and its false-alarm levels stored by an earlier call with the same inputs
+    dictlspe = None
     if pathdata is not None:
-        pathcsvv = pathdata + 'LSPeriodogram_%s.csv' % strgextn
+        pathlspe = pathdata + 'LSPeriodogram_%s.npz' % strgextn
+        
+        objthash = hashlib.sha1()
+        objthash.update(np.ascontiguousarray(arrylcur[..., :2], dtype=float).tobytes())
+        objthash.update(repr([arrylcur.shape, factnyqt, minmfreq, maxmfreq, factosam, typecalc, tolrlspe]).encode())
+        strghash = objthash.hexdigest()
+        
+        if os.path.exists(pathlspe):
+            dictlspe = read_lspe(pathlspe)
+            if dictlspe['strghash'] != strghash:
+                dictlspe = None
     
-    if pathdata is None or not os.path.exists(pathcsvv) or pathvisu is not None and not os.path.exists(pathplot):
+    if dictlspe is None:
         print('Calculating LS periodogram...')
         
         # factor by which the maximum frequency is compared to the Nyquist frequency
         if factnyqt is None:
             factnyqt = 1.
         
-        time = arrylcur[:, 0]
-        lcur = arrylcur[:, 1]
+        time = arrylcur[:, ..., 0]
+        if arrylcur.ndim == 3:
+            time = time[:, 0]
+        lcur = arrylcur[:, ..., 1]
         numbtime = time.size
         minmtime = np.amin(time)
         maxmtime = np.amax(time)
@@ -4953,35 +5346,72 @@ def exec_lspe( \
         if maxmfreq is None:
             maxmfreq = factnyqt * freqnyqt
         
-        # determine the frequency sampling resolution with N samples per line
-        deltfreq = minmfreq / factosam / 2.
-        freq = np.arange(minmfreq, maxmfreq, deltfreq)
+        freq = retr_freqlspe(minmfreq, maxmfreq, factosam)
         peri = 1. / freq
         
-        objtlspe = astropy.timeseries.LombScargle(time, lcur, nterms=1)
-
-        powr = objtlspe.power(freq)
+        if arrylcur.ndim == 2:
+            objtlspe = astropy.timeseries.LombScargle(time, lcur, nterms=1)
+        
+        timeinit = modutime.time()
+        if typecalc == 'fast':
+            powr, errr, timeexac = retr_powrlspefast(time, lcur, freq, tolrlspe)
+        elif typecalc == 'exact' or typecalc == 'auto':
+            if arrylcur.ndim == 3:
+                powr = retr_powrlspemult(time, lcur, freq)
+            elif typecalc == 'exact':
+                powr = objtlspe.power(freq, method='cython')
+            else:
+                powr = objtlspe.power(freq)
+        else:
+            print('typecalc')
+            print(typecalc)
+            raise Exception("Unknown type of evaluation of the LS periodogram. typecalc should be 'auto', 'exact' or 'fast'.")
+        timecalc = modutime.time() - timeinit
+        
+        dictlspeoutp['timecalc'] = timecalc
+        if typeverb > 0:
+            print('Evaluating the LS periodogram at %d frequencies of %d times took %.3g seconds.' % (freq.size, numbtime, timecalc))
+            if typecalc == 'fast':
+                print('The exact evaluation would take an estimated %.3g seconds and the maximum absolute error in the power is %.3g.' % (timeexac, errr))
+        if typecalc == 'fast':
+            dictlspeoutp['timeexac'] = timeexac
+            dictlspeoutp['errrpowr'] = errr
+        
+        #listindxperipeak, _ = scipy.signal.find_peaks(powr)
+        #indxperimpow = listindxperipeak[0]
+        indxperimpow = np.argmax(powr, axis=0)
+        
+        dictlspe = dict()
+        dictlspe['peri'] = peri
+        dictlspe['powr'] = powr
+        dictlspe['perimpow'] = peri[indxperimpow]
+        if arrylcur.ndim == 3:
+            dictlspe['powrmpow'] = powr[indxperimpow, np.arange(powr.shape[1])]
+        else:
+            dictlspe['powrmpow'] = powr[indxperimpow]
+        
+        # false-alarm levels, which are only evaluated for single-channel time-series
+        dictlspe['listprob'] = np.array([0.05])
+        if arrylcur.ndim == 2 and (pathvisu is not None or pathdata is not None):
+            dictlspe['powrfals'] = np.asarray(objtlspe.false_alarm_level(dictlspe['listprob']))
+        else:
+            dictlspe['powrfals'] = np.empty(0)
         
         if pathdata is not None:
-            arry = np.empty((peri.size, 2))
-            arry[:, 0] = peri
-            arry[:, 1] = powr
-            print('Writing to %s...' % pathcsvv)
-            np.savetxt(pathcsvv, arry, delimiter=',')
+            dictlspe['strghash'] = strghash
+            writ_lspe(pathlspe, dictlspe)
     
     else:
         if typeverb > 0:
-            print('Reading from %s...' % pathcsvv)
-        arry = np.loadtxt(pathcsvv, delimiter=',')
-        peri = arry[:, 0]
-        powr = arry[:, 1]
-    
-    #listindxperipeak, _ = scipy.signal.find_peaks(powr)
-    #indxperimpow = listindxperipeak[0]
-    indxperimpow = np.argmax(powr)
+            print('Reading from %s...' % pathlspe)
     
-    perimpow = peri[indxperimpow]
-    powrmpow = powr[indxperimpow]
+    peri = dictlspe['peri']
+    powr = dictlspe['powr']
+    perimpow = dictlspe['perimpow']
+    powrmpow = dictlspe['powrmpow']
+    if arrylcur.ndim == 2:
+        perimpow = float(perimpow)
+        powrmpow = float(powrmpow)
 
     if pathvisu is not None:
         if not os.path.exists(pathplot):
@@ -4990,33 +5420,41 @@ def exec_lspe( \
             sizefigr /= factsizetextfigr
 
             figr, axis = plt.subplots(figsize=sizefigr)
-            axis.plot(peri, powr, color='k')
-            
-            axis.axvline(perimpow, alpha=0.4, lw=3)
-            minmxaxi = np.amin(peri)
-            maxmxaxi = np.amax(peri)
-            for n in range(2, 10):
-                xpos = n * perimpow
-                if xpos > maxmxaxi:
-                    break
-                axis.axvline(xpos, alpha=0.4, lw=1, linestyle='dashed')
-            for n in range(2, 10):
-                xpos = perimpow / n
-                if xpos < minmxaxi:
-                    break
-                axis.axvline(xpos, alpha=0.4, lw=1, linestyle='dashed')
             
-            strgtitl = 'Maximum power of %.3g at %.3f days' % (powrmpow, perimpow)
-            
-            listprob = [0.05]
-            powrfals = objtlspe.false_alarm_level(listprob)
-            for p in range(len(listprob)):
-                axis.axhline(powrfals[p], ls='--')
-
-            axis.set_xscale('log')
-            axis.set_xlabel('Period [days]')
-            axis.set_ylabel('Normalized Power')
-            axis.set_title(strgtitl)
+            if arrylcur.ndim == 3:
+                # periodograms of all channels
+                objtimag = axis.pcolormesh(peri, np.arange(powr.shape[1]), powr.T, shading='nearest')
+                plt.colorbar(objtimag, ax=axis, label='Normalized Power')
+                axis.plot(perimpow, np.arange(powr.shape[1]), ls='', marker='o', ms=2, color='w')
+                axis.set_xscale('log')
+                axis.set_xlabel('Period [days]')
+                axis.set_ylabel('Channel')
+            else:
+                axis.plot(peri, powr, color='k')
+                
+                axis.axvline(perimpow, alpha=0.4, lw=3)
+                minmxaxi = np.amin(peri)
+                maxmxaxi = np.amax(peri)
+                for n in range(2, 10):
+                    xpos = n * perimpow
+                    if xpos > maxmxaxi:
+                        break
+                    axis.axvline(xpos, alpha=0.4, lw=1, linestyle='dashed')
+                for n in range(2, 10):
+                    xpos = perimpow / n
+                    if xpos < minmxaxi:
+                        break
+                    axis.axvline(xpos, alpha=0.4, lw=1, linestyle='dashed')
+                
+                strgtitl = 'Maximum power of %.3g at %.3f days' % (powrmpow, perimpow)
+                
+                for p in range(dictlspe['powrfals'].size):
+                    axis.axhline(dictlspe['powrfals'][p], ls='--')
+                
+                axis.set_xscale('log')
+                axis.set_xlabel('Period [days]')
+                axis.set_ylabel('Normalized Power')
+                axis.set_title(strgtitl)
             print('Writing to %s...' % pathplot)
             plt.savefig(pathplot)
             plt.close()
@@ -5024,224 +5462,1331 @@ def exec_lspe( \
 
     dictlspeoutp['perimpow'] = perimpow
     dictlspeoutp['powrmpow'] = powrmpow
+    dictlspeoutp['powrfals'] = dictlspe['powrfals']
     
     return dictlspeoutp
 
 
-#@jit(nopython=True)
-def srch_boxsperi_work_loop(m, phas, phasdiff, dydchalf):
-    
-    phasoffs = phas - phasdiff[m]
+def retr_sumstriglspe(time, lcur, freq, \
+                      
+                      # maximum number of elements of the blocks of trigonometric functions of frequency and time held in memory
+                      maxmsizeblok=int(1e7), \
+                     ):
+    '''
+    Return the sums over the samples of the trigonometric terms of the LS periodogram at each frequency, which are additive over samples. 
+    The columns are the sums of cos, sin, cos^2, cos sin, y cos and y sin.
+    '''
     
-    if phasdiff[m] < dydchalf:
-        booltemp = (phasoffs < dydchalf) | (1. - phas < dydchalf - phasoffs)
-    elif 1. - phasdiff[m] < dydchalf:
-        booltemp = (1. - phas - phasdiff[m] < dydchalf) | (phas < dydchalf - phasoffs)
-    else:
-        booltemp = np.abs(phasoffs) < dydchalf
+    numbtime = time.size
+    numbfreq = freq.size
     
-    indxitra = np.where(booltemp)[0]
+    sumstrig = np.zeros((numbfreq, 6))
+    if numbtime == 0:
+        return sumstrig
     
-    #print('srch_boxsperi_work_loop()')
-    #print('phas')
-    #summgene(phas)
-    #print('phasdiff[m]')
-    #print(phasdiff[m])
-    #print('phasoffs')
-    #print(phasoffs)
-    #print('dydchalf')
-    #print(dydchalf)
-    #print('indxitra')
-    #summgene(indxitra)
+    numbfreqblok = max(1, maxmsizeblok // numbtime)
+    for indxfreqinit in range(0, numbfreq, numbfreqblok):
+        indxfreq = slice(indxfreqinit, min(indxfreqinit + numbfreqblok, numbfreq))
+        
+        phas = 2. * np.pi * freq[indxfreq, None] * time[None, :]
+        cosi = np.cos(phas)
+        sine = np.sin(phas)
+        
+        sumstrig[indxfreq, 0] = np.sum(cosi, axis=1)
+        sumstrig[indxfreq, 1] = np.sum(sine, axis=1)
+        sumstrig[indxfreq, 2] = np.sum(cosi**2, axis=1)
+        sumstrig[indxfreq, 3] = np.sum(cosi * sine, axis=1)
+        sumstrig[indxfreq, 4] = cosi @ lcur
+        sumstrig[indxfreq, 5] = sine @ lcur
     
-    return indxitra
+    return sumstrig
 
 
-def srch_boxsperi_work(listperi, listarrytser, listdcyc, listepoc, listduratrantotllevl, boolrebn, pathvisu, i):
+def retr_powrsumslspe(sumstrig, numbtime, sumslcur, sumslcursqua):
+    '''
+    Return the LS power, with a floating mean and the standard normalization, from the sums of the trigonometric terms and of the samples.
+    '''
     
-    numbperi = len(listperi[i])
+    meanlcur = sumslcur / numbtime
     
-    numblevlrebn = len(listduratrantotllevl)
-    indxlevlrebn = np.arange(numblevlrebn)
+    # covariances of the cosine and sine terms after subtracting their means
+    covacc = sumstrig[:, 2] - sumstrig[:, 0]**2 / numbtime
+    covass = numbtime - sumstrig[:, 2] - sumstrig[:, 1]**2 / numbtime
+    covacs = sumstrig[:, 3] - sumstrig[:, 0] * sumstrig[:, 1] / numbtime
     
-    #conschi2 = np.sum(weig * arrytser[:, 1]**2)
-    #listtermchi2 = np.empty(numbperi)
+    # projections of the time-series after subtracting its mean onto the cosine and sine terms
+    projcosi = sumstrig[:, 4] - meanlcur * sumstrig[:, 0]
+    projsine = sumstrig[:, 5] - meanlcur * sumstrig[:, 1]
     
-    rflxitraminm = np.full(numbperi, np.nan)#np.zeros(numbperi) + 1e100
-    dcycmaxm = np.zeros(numbperi)
-    epocmaxm = np.zeros(numbperi)
+    powr = (covass * projcosi**2 + covacc * projsine**2 - 2. * covacs * projcosi * projsine) / (covacc * covass - covacs**2) / (sumslcursqua - sumslcur * meanlcur)
     
-    listphas = [[] for b in indxlevlrebn]
-    for k in tqdm(range(len(listperi[i]))):
-        
-        peri = listperi[i][k]
-        
-        if boolrebn:
-            for b in indxlevlrebn:
-                listphas[b] = (listarrytser[b][:, 0] % peri) / peri
-        else:
-            listphas = (listarrytser[0][:, 0] % peri) / peri
-        
-        cntr = 0
-        for l in range(len(listdcyc[k])):
-            
-            if boolrebn:
-                b = np.digitize(listdcyc[k][l] * peri * 24., listduratrantotllevl) - 1
-                listphastemp = listphas[b]
-                listarrytsertemp = listarrytser[b]
-            else:
-                listphastemp = listphas
-                listarrytsertemp = listarrytser[0]
-            
-            if listphastemp.size == 1:
-                print('listarrytser[b]')
-                summgene(listarrytser[b])
-                raise Exception('')
-
-            dydchalf = listdcyc[k][l] / 2.
+    return powr
 
-            phasdiff = (listepoc[k][l] % peri) / peri
-            
-            #print('listphas[b]')
-            #summgene(listphas[b])
-            #print('')
-            
-            for m in range(len(listepoc[k][l])):
 
-                indxitra = srch_boxsperi_work_loop(m, listphastemp, phasdiff, dydchalf)
-                
-                if indxitra.size == 0:
-                    continue
+def read_acculspe(path):
+    '''
+    Read the accumulator of the incremental LS periodogram.
+    '''
     
-                rflxitra = np.mean(listarrytsertemp[:, 1][indxitra])
-                
-                #print('rflxitra')
-                #print(rflxitra)
-                #print('rflxitraminm[k]')
-                #print(rflxitraminm[k])
-                #print('')
-                #print('')
-                #print('')
+    objtfile = np.load(path)
+    dictaccu = dict()
+    for name in objtfile.files:
+        dictaccu[name] = objtfile[name]
+        if dictaccu[name].ndim == 0:
+            dictaccu[name] = dictaccu[name].item()
+    
+    return dictaccu
 
-                if cntr == 0 or rflxitra < rflxitraminm[k]:
-                    rflxitraminm[k] = rflxitra
-                    dcycmaxm[k] = listdcyc[k][l]
-                    epocmaxm[k] = listepoc[k][l][m]
-                    cntr += 1
-                
-                #raise Exception('')
 
-                if not np.isfinite(rflxitra):
-                    print('b')
-                    print(b)
-                    #print('depttrancomp')
-                    #print(dept)
-                    #print('np.std(rflx[indxitra])')
-                    #summgene(np.std(rflx[indxitra]))
-                    #print('rflx[indxitra]')
-                    #summgene(rflx[indxitra])
-                    raise Exception('')
-                    
-                #timechecloop[0][k, l, m] = modutime.time()
-                #print('pericomp')
-                #print(peri)
-                #print('dcyc')
-                #print(dcyc)
-                #print('epocmtracomp')
-                #print(epoc)
-                #print('phasdiff')
-                #summgene(phasdiff)
-                #print('phasoffs')
-                #summgene(phasoffs)
-                
-                #print('booltemp')
-                #summgene(booltemp)
-                #print('indxitra')
-                #summgene(indxitra)
-                #print('depttrancomp')
-                #print(dept)
-                #print('stdv')
-                #print(stdv)
-                #terr = np.sum(weig[indxitra])
-                #ters = np.sum(weig[indxitra] * rflx[indxitra])
-                #termchi2 = ters**2 / terr / (1. - terr)
-                #print('ters')
-                #print(ters)
-                #print('terr')
-                #print(terr)
-                #print('depttrancomp')
-                #print(dept)
-                #print('indxitra')
-                #summgene(indxitra)
-                #print('s2nr')
-                #print(s2nr)
-                #print('')
-                
-                if pathvisu is not None:
-                    for b in indxlevlrebn:
-                        figr, axis = plt.subplots(2, 1, figsize=(8, 8))
-                        axis[0].plot(listarrytser[b][:, 0], listarrytser[b][:, 1], color='b', ls='', marker='o', rasterized=True, ms=0.3)
-                        axis[0].plot(listarrytser[b][:, 0][indxitra], listarrytser[b][:, 1][indxitra], color='firebrick', ls='', marker='o', ms=2., rasterized=True)
-                        axis[0].axhline(1., ls='-.', alpha=0.3, color='k')
-                        axis[0].set_xlabel('Time [BJD]')
-                        
-                        axis[1].plot(listphas[b], listarrytser[b][:, 1], color='b', ls='', marker='o', rasterized=True, ms=0.3)
-                        axis[1].plot(listphas[b][indxitra], listarrytser[b][:, 1][indxitra], color='firebrick', ls='', marker='o', ms=2., rasterized=True)
-                        axis[1].plot(np.mean(listphas[b][indxitra]), rflxitra, color='g', ls='', marker='o', ms=4., rasterized=True)
-                        axis[1].axhline(1., ls='-.', alpha=0.3, color='k')
-                        axis[1].set_xlabel('Phase')
-                        titl = '$P$=%.3f, $T_0$=%.3f, $q_{tr}$=%.3g, $f$=%.6g' % (peri, listepoc[k][l][m], listdcyc[k][l], rflxitra)
-                        axis[0].set_title(titl, usetex=False)
-                        path = pathvisu + 'rflx_boxsperi_b%03d_%04d%04d.pdf' % (b, l, m)
-                        print('Writing to %s...' % path)
-                        plt.savefig(path, usetex=False)
-                        plt.close()
-        
-    return rflxitraminm, dcycmaxm, epocmaxm
+def writ_acculspe(path, dictaccu):
+    '''
+    Write the accumulator of the incremental LS periodogram.
+    '''
+    
+    print('Writing to %s...' % path)
+    with open(path, 'wb') as objtfile:
+        np.savez(objtfile, **dictaccu)
 
 
-def srch_outlperi( \
-                  # time of samples
-                  time, \
-                  # relative flux of samples
-                  flux, \
-                  # relative flux error of samples
-                  stdvflux, \
-                  # number of outliers to include in the search
-                  numboutl=5, \
-                  # Boolean flag to diagnose
-                  booldiag=True, \
+def exec_lspeincr( \
+                  # time-series, which may contain samples already seen by earlier calls
+                  arrylcur, \
+                  
+                  # path where the accumulator will be stored
+                  pathdata, \
+                  
+                  strgextn='', \
+                  
+                  # factor by which the maximum frequency is compared to the Nyquist frequency of the first time-series
+                  factnyqt=None, \
+                  
+                  # maximum frequency (1/days)
+                  maxmfreq=None, \
+                  
+                  factosam=3., \
+                  
+                  # type of verbosity
+                  ## -1: absolutely no text
+                  ##  0: no text output except critical warnings
+                  ##  1: minimal description of the execution
+                  ##  2: detailed description of the execution
+                  typeverb=1, \
                  ):
     '''
-    Search for periodic outliers in a computationally efficient way
+    Calculate the LS periodogram of a time-series that grows over time, e.g., by a new sector at a time, by updating a persistent accumulator 
+    of the trigonometric sums at each frequency with the samples not seen by earlier calls, which may also fill gaps between them, in time proportional to the new samples. 
+    The frequency grid has a step of the minimum frequency divided by twice the oversampling factor as in exec_lspe. It is extended to the lower minimum frequency 
+    as the baseline grows and is refined by a factor of two when the baseline has doubled, which requires the trigonometric sums of the new frequencies over all samples.
     '''
     
-    # indices of the outliers
-    indxtimesort = np.argsort(flux)[::-1][:numboutl]
-    
-    # the times of the outliers
-    timeoutl = time[indxtimesort]
-    
-    # number of differences between times of outlier samples
-    numbdiff = int(numboutl * (numboutl - 1) / 2)
+    if maxmfreq is not None and factnyqt is not None:
+        raise Exception('')
     
-    # differences between times of outlier samples
-    difftimeoutl = np.empty(numbdiff)
+    timeinit = modutime.time()
     
-    # compute the differences between times of outlier samples
-    listtemp = []
-    c = 0
-    indxoutl = np.arange(numboutl)
-    for a in indxoutl:
-        for b in indxoutl:
-            if a >= b:
-                continue
-            listtemp.append([a, b])
-            difftimeoutl[c] = abs(timeoutl[a] - timeoutl[b])
-            c += 1
+    pathaccu = pathdata + 'LSPeriodogramAccumulator_%s.npz' % strgextn
     
-    # incides that sort the differences between times of outlier samples
-    indxsort = np.argsort(difftimeoutl)
+    time = arrylcur[:, 0]
+    lcur = arrylcur[:, 1]
+    
+    if os.path.exists(pathaccu):
+        if typeverb > 0:
+            print('Reading from %s...' % pathaccu)
+        dictaccu = read_acculspe(pathaccu)
+        
+        # samples not seen so far, which may also be inside the time interval seen so far, e.g., a sector delivered late
+        boolnoww = ~np.isin(time - dictaccu['timerefr'], dictaccu['time'])
+    else:
+        dictaccu = dict()
+        
+        # times and relative fluxes are accumulated with respect to reference values
+        dictaccu['timerefr'] = np.amin(time)
+        dictaccu['lcurrefr'] = np.mean(lcur)
+        
+        dictaccu['time'] = np.empty(0)
+        dictaccu['lcur'] = np.empty(0)
+        dictaccu['sumslcur'] = 0.
+        dictaccu['sumslcursqua'] = 0.
+        
+        delttime = np.amax(time) - np.amin(time)
+        if maxmfreq is None:
+            if factnyqt is None:
+                factnyqt = 1.
+            maxmfreq = factnyqt * time.size / delttime / 2.
+        
+        # the frequencies are integer multiples of the frequency step
+        dictaccu['deltfreq'] = 1. / delttime / factosam / 2.
+        dictaccu['indxfreqinit'] = int(np.ceil(1. / delttime / dictaccu['deltfreq']))
+        dictaccu['indxfreqfinl'] = int(np.floor(maxmfreq / dictaccu['deltfreq']))
+        dictaccu['sumstrig'] = np.zeros((dictaccu['indxfreqfinl'] - dictaccu['indxfreqinit'] + 1, 6))
+        
+        boolnoww = np.ones(time.size, dtype=bool)
+    
+    timenoww = time[boolnoww] - dictaccu['timerefr']
+    lcurnoww = lcur[boolnoww] - dictaccu['lcurrefr']
+    
+    if typeverb > 0:
+        print('Adding %d new samples to the incremental LS periodogram with %d samples...' % (timenoww.size, dictaccu['time'].size))
+    
+    if dictaccu['time'].size > 0 and timenoww.size > 0:
+        delttime = max(np.amax(timenoww), np.amax(dictaccu['time'])) - min(np.amin(timenoww), np.amin(dictaccu['time']))
+        
+        # refine the frequency grid with the sums over the samples seen so far, while the baseline has more than doubled since the last refinement
+        while dictaccu['deltfreq'] > 1. / delttime / factosam:
+            indxfreqodds = np.arange(2 * dictaccu['indxfreqinit'] + 1, 2 * dictaccu['indxfreqfinl'], 2)
+            sumstrigodds = retr_sumstriglspe(dictaccu['time'], dictaccu['lcur'], indxfreqodds * dictaccu['deltfreq'] / 2.)
+            sumstrig = np.empty((2 * dictaccu['sumstrig'].shape[0] - 1, 6))
+            sumstrig[0::2, :] = dictaccu['sumstrig']
+            sumstrig[1::2, :] = sumstrigodds
+            dictaccu['sumstrig'] = sumstrig
+            dictaccu['deltfreq'] /= 2.
+            dictaccu['indxfreqinit'] *= 2
+            dictaccu['indxfreqfinl'] *= 2
+            if typeverb > 0:
+                print('Refined the frequency grid to a step of %g [1/days].' % dictaccu['deltfreq'])
+        
+        # extend the frequency grid to the lower minimum frequency
+        indxfreqinit = int(np.ceil(1. / delttime / dictaccu['deltfreq']))
+        if indxfreqinit < dictaccu['indxfreqinit']:
+            indxfreqextn = np.arange(indxfreqinit, dictaccu['indxfreqinit'])
+            sumstrigextn = retr_sumstriglspe(dictaccu['time'], dictaccu['lcur'], indxfreqextn * dictaccu['deltfreq'])
+            dictaccu['sumstrig'] = np.concatenate((sumstrigextn, dictaccu['sumstrig']), 0)
+            dictaccu['indxfreqinit'] = indxfreqinit
+    
+    # add the new samples at all frequencies
+    freq = np.arange(dictaccu['indxfreqinit'], dictaccu['indxfreqfinl'] + 1) * dictaccu['deltfreq']
+    dictaccu['sumstrig'] += retr_sumstriglspe(timenoww, lcurnoww, freq)
+    dictaccu['sumslcur'] += np.sum(lcurnoww)
+    dictaccu['sumslcursqua'] += np.sum(lcurnoww**2)
+    dictaccu['time'] = np.concatenate((dictaccu['time'], timenoww))
+    dictaccu['lcur'] = np.concatenate((dictaccu['lcur'], lcurnoww))
+    
+    writ_acculspe(pathaccu, dictaccu)
+    
+    powr = retr_powrsumslspe(dictaccu['sumstrig'], dictaccu['time'].size, dictaccu['sumslcur'], dictaccu['sumslcursqua'])
+    peri = 1. / freq
+    indxperimpow = np.argmax(powr)
+    
+    dictlspeoutp = dict()
+    dictlspeoutp['peri'] = peri
+    dictlspeoutp['powr'] = powr
+    dictlspeoutp['perimpow'] = peri[indxperimpow]
+    dictlspeoutp['powrmpow'] = powr[indxperimpow]
+    dictlspeoutp['timecalc'] = modutime.time() - timeinit
+    
+    if typeverb > 0:
+        print('Updating the LS periodogram at %d frequencies took %.3g seconds.' % (freq.size, dictlspeoutp['timecalc']))
+    
+    return dictlspeoutp
+
+
+def retr_cumsphas(phas, rflx, numbbinsphas, weig=None):
+    '''
+    Fold relative flux into a phase histogram and return the cumulative sums of the number of samples and the flux offset from unity, 
+    where the samples are counted with the weights weig, if provided.
+    '''
+    
+    indxbinsphas = np.minimum((phas * numbbinsphas).astype(int), numbbinsphas - 1)
+    
+    cumsnumb = np.zeros(numbbinsphas + 1)
+    cumsnumb[1:] = np.cumsum(np.bincount(indxbinsphas, weights=weig, minlength=numbbinsphas))
+    
+    if weig is None:
+        dflx = rflx - 1.
+    else:
+        dflx = weig * (rflx - 1.)
+    cumsdflx = np.zeros(numbbinsphas + 1)
+    cumsdflx[1:] = np.cumsum(np.bincount(indxbinsphas, weights=dflx, minlength=numbbinsphas))
+    
+    return cumsnumb, cumsdflx
+
+
+def retr_cumsboxsperi(cums, indxbins, numbbinsphas):
+    '''
+    Evaluate the cumulative sums of a phase histogram at bin indices that may wrap around the phase.
+    '''
+    
+    return np.floor_divide(indxbins, numbbinsphas) * cums[-1] + cums[np.mod(indxbins, numbbinsphas)]
+
+
+def retr_rflxitraboxsperi(cumsnumb, cumsdflx, numbbinsphas, peri, dcyc, epoc):
+    '''
+    Return the indices of the trial epochs whose boxes contain samples and the mean in-transit relative flux of these boxes, 
+    evaluated using the cumulative sums of a phase histogram.
+    '''
+    
+    dydchalf = dcyc / 2.
+    
+    phasdiff = (epoc % peri) / peri
+    
+    # first and last (exclusive) phase bins inside the box for each trial epoch
+    indxbinsinit = np.floor((phasdiff - dydchalf) * numbbinsphas + 0.5).astype(int)
+    indxbinsfinl = np.maximum(np.floor((phasdiff + dydchalf) * numbbinsphas + 0.5).astype(int), indxbinsinit + 1)
+    
+    numbitra = retr_cumsboxsperi(cumsnumb, indxbinsfinl, numbbinsphas) - retr_cumsboxsperi(cumsnumb, indxbinsinit, numbbinsphas)
+    
+    indxepocgood = np.where(numbitra > 0)[0]
+    
+    rflxitra = 1. + (retr_cumsboxsperi(cumsdflx, indxbinsfinl[indxepocgood], numbbinsphas) - \
+                     retr_cumsboxsperi(cumsdflx, indxbinsinit[indxepocgood], numbbinsphas)) / numbitra[indxepocgood]
+    
+    return indxepocgood, rflxitra
+
+
+def srch_boxsperi_work(listindxperi, listperi, listarrytser, listdcyc, listdiffepoc, listnumbepoc, minmtime, listduratrantotllevl, boolrebn, numbbinsphasdcyc, i, \
+                                                                                                                                            boolprog=True, dictincr=None):
+    '''
+    Find the box with the lowest in-transit relative flux at each trial period in a chunk, where the time-series is folded once per period 
+    into a phase histogram and every trial box (epoch, duty cycle) is scored in constant time using the cumulative sums of the histogram. 
+    The trial epochs at each period and duty cycle start at minmtime and are generated from their step and number. 
+    If dictincr is provided, the cumulative sums are cached across iterations and, once cached, only updated with the flux changes in dictincr['listarrydelt'].
+    '''
+    
+    numbperi = len(listindxperi[i])
+    
+    numblevlrebn = len(listarrytser)
+    indxlevlrebn = np.arange(numblevlrebn)
+    
+    rflxitraminm = np.full(numbperi, np.nan)
+    dcycmaxm = np.zeros(numbperi)
+    epocmaxm = np.zeros(numbperi)
+    
+    for kk in tqdm(range(numbperi), disable=not boolprog):
+        
+        k = listindxperi[i][kk]
+        
+        if len(listdcyc[k]) == 0:
+            continue
+
+        peri = listperi[k]
+        
+        # number of phase bins such that the shortest trial box spans numbbinsphasdcyc bins
+        numbbinsphas = int(np.ceil(numbbinsphasdcyc / np.amin(listdcyc[k])))
+        
+        # rebinning level to be used for each trial duty cycle
+        if boolrebn:
+            indxlevldcyc = np.digitize(listdcyc[k] * peri * 24., listduratrantotllevl) - 1
+        else:
+            indxlevldcyc = np.zeros(len(listdcyc[k]), dtype=int)
+        
+        # fold once per period and rebinning level
+        listcumsnumb = [[] for b in indxlevlrebn]
+        listcumsdflx = [[] for b in indxlevlrebn]
+        boolcums = dictincr is not None and dictincr['boolcumsperi'][k]
+        for b in np.unique(indxlevldcyc):
+            if dictincr is not None:
+                indxcums = slice(dictincr['indxcumsperilevl'][k, b], dictincr['indxcumsperilevl'][k, b] + numbbinsphas + 1)
+            if boolcums:
+                # update the cached histogram with the flux changes since it was last updated
+                phas = (dictincr['listarrydelt'][b][:, 0] % peri) / peri
+                indxbinsphas = np.minimum((phas * numbbinsphas).astype(int), numbbinsphas - 1)
+                dictincr['cumsdflxconc'][indxcums][1:] += np.cumsum(np.bincount(indxbinsphas, weights=dictincr['listarrydelt'][b][:, 1], minlength=numbbinsphas))
+                listcumsnumb[b] = dictincr['cumsnumbconc'][indxcums]
+                listcumsdflx[b] = dictincr['cumsdflxconc'][indxcums]
+            else:
+                phas = (listarrytser[b][:, 0] % peri) / peri
+                listcumsnumb[b], listcumsdflx[b] = retr_cumsphas(phas, listarrytser[b][:, 1], numbbinsphas)
+                if dictincr is not None:
+                    dictincr['cumsnumbconc'][indxcums] = listcumsnumb[b]
+                    dictincr['cumsdflxconc'][indxcums] = listcumsdflx[b]
+        if dictincr is not None:
+            dictincr['boolcumsperi'][k] = True
+        
+        cntr = 0
+        for l in range(len(listdcyc[k])):
+            
+            b = indxlevldcyc[l]
+            
+            epoc = minmtime + np.arange(listnumbepoc[k][l]) * listdiffepoc[k][l]
+            
+            indxepocgood, rflxitra = retr_rflxitraboxsperi(listcumsnumb[b], listcumsdflx[b], numbbinsphas, peri, listdcyc[k][l], epoc)
+            if indxepocgood.size == 0:
+                continue
+            
+            if not np.isfinite(rflxitra).all():
+                print('b')
+                print(b)
+                print('rflxitra')
+                summgene(rflxitra)
+                raise Exception('')
+            
+            m = np.argmin(rflxitra)
+            
+            if cntr == 0 or rflxitra[m] < rflxitraminm[kk]:
+                rflxitraminm[kk] = rflxitra[m]
+                dcycmaxm[kk] = listdcyc[k][l]
+                epocmaxm[kk] = epoc[indxepocgood[m]]
+                cntr += 1
+        
+    return rflxitraminm, dcycmaxm, epocmaxm
+
+
+def srch_boxsperi_work_join(listindxperi, listperi, listlistarrytser, listlistweig, listdcyc, listdiffepoc, listnumbepoc, minmtime, \
+                                                                                        listlistduratrantotllevl, listboolrebn, numbbinsphasdcyc, i):
+    '''
+    Find the box with the lowest weighted mean in-transit relative flux at each trial period in a chunk, jointly over the time-series of multiple instruments. 
+    The time-series of each instrument is folded at its own rebinning levels into a phase histogram weighted by listlistweig 
+    and the weighted histograms of all instruments are summed before scoring the trial boxes.
+    '''
+    
+    numbperi = len(listindxperi[i])
+    
+    numbinst = len(listlistarrytser)
+    indxinst = np.arange(numbinst)
+    
+    rflxitraminm = np.full(numbperi, np.nan)
+    dcycmaxm = np.zeros(numbperi)
+    epocmaxm = np.zeros(numbperi)
+    
+    for kk in range(numbperi):
+        
+        k = listindxperi[i][kk]
+        
+        if len(listdcyc[k]) == 0:
+            continue
+
+        peri = listperi[k]
+        
+        # number of phase bins such that the shortest trial box spans numbbinsphasdcyc bins
+        numbbinsphas = int(np.ceil(numbbinsphasdcyc / np.amin(listdcyc[k])))
+        
+        # rebinning level of each instrument to be used for each trial duty cycle
+        indxlevldcyc = np.zeros((numbinst, len(listdcyc[k])), dtype=int)
+        for n in indxinst:
+            if listboolrebn[n]:
+                indxlevldcyc[n, :] = np.digitize(listdcyc[k] * peri * 24., listlistduratrantotllevl[n]) - 1
+        
+        # fold each instrument once per period and rebinning level
+        dictcums = dict()
+        for n in indxinst:
+            for b in np.unique(indxlevldcyc[n, :]):
+                phas = (listlistarrytser[n][b][:, 0] % peri) / peri
+                dictcums[(n, b)] = retr_cumsphas(phas, listlistarrytser[n][b][:, 1], numbbinsphas, weig=listlistweig[n][b])
+        
+        # summed histograms for each combination of the rebinning levels of the instruments
+        dictcumsjoin = dict()
+        
+        cntr = 0
+        for l in range(len(listdcyc[k])):
+            
+            strgkeyy = tuple(indxlevldcyc[:, l])
+            if strgkeyy not in dictcumsjoin:
+                cumsnumb = np.zeros(numbbinsphas + 1)
+                cumsdflx = np.zeros(numbbinsphas + 1)
+                for n in indxinst:
+                    cumsnumb += dictcums[(n, strgkeyy[n])][0]
+                    cumsdflx += dictcums[(n, strgkeyy[n])][1]
+                dictcumsjoin[strgkeyy] = cumsnumb, cumsdflx
+            cumsnumb, cumsdflx = dictcumsjoin[strgkeyy]
+            
+            epoc = minmtime + np.arange(listnumbepoc[k][l]) * listdiffepoc[k][l]
+            
+            indxepocgood, rflxitra = retr_rflxitraboxsperi(cumsnumb, cumsdflx, numbbinsphas, peri, listdcyc[k][l], epoc)
+            if indxepocgood.size == 0:
+                continue
+            
+            m = np.argmin(rflxitra)
+            
+            if cntr == 0 or rflxitra[m] < rflxitraminm[kk]:
+                rflxitraminm[kk] = rflxitra[m]
+                dcycmaxm[kk] = listdcyc[k][l]
+                epocmaxm[kk] = epoc[indxepocgood[m]]
+                cntr += 1
+        
+    return rflxitraminm, dcycmaxm, epocmaxm
+
+
+def retr_listweigboxsperi(listarrytser, listduratrantotllevl, factduracade, weig):
+    '''
+    Return the weights of the samples of an instrument at each rebinning level of the joint periodic box search, 
+    where each rebinned sample is weighted by the number of original samples it averages.
+    '''
+    
+    listweig = [np.full(listarrytser[0].shape[0], weig)]
+    for b in range(1, len(listarrytser)):
+        delthalf = listduratrantotllevl[b-1] / 24. / factduracade / 2.
+        numbsamp = np.searchsorted(listarrytser[0][:, 0], listarrytser[b][:, 0] + delthalf) - \
+                   np.searchsorted(listarrytser[0][:, 0], listarrytser[b][:, 0] - delthalf)
+        listweig.append(weig * np.maximum(numbsamp, 1))
+    
+    return listweig
+
+
+def setp_shrdboxsperi(dictarry):
+    '''
+    Copy the inputs of the periodic box search into shared memory blocks, which worker processes can attach to without copying.
+    '''
+    
+    from multiprocessing import shared_memory
+    
+    listobjtshrd = []
+    dictdescshrd = dict()
+    dictarryshrd = dict()
+    for name, arry in dictarry.items():
+        objtshrd = shared_memory.SharedMemory(create=True, size=max(arry.nbytes, 1))
+        dictarryshrd[name] = np.ndarray(arry.shape, dtype=arry.dtype, buffer=objtshrd.buf)
+        dictarryshrd[name][...] = arry
+        dictdescshrd[name] = (objtshrd.name, arry.shape, arry.dtype.str)
+        listobjtshrd.append(objtshrd)
+    
+    return listobjtshrd, dictdescshrd, dictarryshrd
+
+
+def retr_dictarryboxsperi(listlistarrytser, listminmtime, listlistduratrantotllevl, listboolrebn, listindxgrid, \
+                                                                                listlistperi, listlistdcyc, listlistdiffepoc, listlistnumbepoc):
+    '''
+    Flatten the inputs of the periodic box search over one or more targets, each of which uses one of one or more grids of trial periods, 
+    duty cycles and epochs, into a dictionary of contiguous arrays and offsets.
+    '''
+    
+    dictarry = dict()
+    
+    # time-series of all targets at all rebinning levels
+    listarrytserflat = [arrytser for listarrytser in listlistarrytser for arrytser in listarrytser]
+    dictarry['arrytserconc'] = np.concatenate(listarrytserflat, 0)
+    dictarry['indxtimelevl'] = np.concatenate((np.array([0]), np.cumsum([arrytser.shape[0] for arrytser in listarrytserflat])))
+    dictarry['indxlevltarg'] = np.concatenate((np.array([0]), np.cumsum([len(listarrytser) for listarrytser in listlistarrytser])))
+    
+    # transit durations of the rebinning levels of all targets
+    dictarry['duralevlconc'] = np.concatenate([np.asarray(listduratrantotllevl, dtype=float) for listduratrantotllevl in listlistduratrantotllevl] + [np.empty(0)])
+    dictarry['indxduratarg'] = np.concatenate((np.array([0]), np.cumsum([len(listduratrantotllevl) for listduratrantotllevl in listlistduratrantotllevl])))
+    
+    dictarry['minmtimetarg'] = np.asarray(listminmtime, dtype=float)
+    dictarry['boolrebntarg'] = np.asarray(listboolrebn, dtype=bool)
+    dictarry['indxgridtarg'] = np.asarray(listindxgrid, dtype=int)
+    
+    # trial periods of all grids
+    dictarry['periconc'] = np.concatenate([np.asarray(listperi, dtype=float) for listperi in listlistperi])
+    dictarry['indxperigrid'] = np.concatenate((np.array([0]), np.cumsum([len(listperi) for listperi in listlistperi])))
+    
+    # trial duty cycles, epoch steps and numbers of epochs at all periods of all grids
+    listdcycflat = [dcyc for listdcyc in listlistdcyc for dcyc in listdcyc]
+    dictarry['dcycconc'] = np.concatenate([np.asarray(dcyc, dtype=float) for dcyc in listdcycflat])
+    dictarry['diffepocconc'] = np.concatenate([np.asarray(diffepoc, dtype=float) for listdiffepoc in listlistdiffepoc for diffepoc in listdiffepoc])
+    dictarry['numbepocconc'] = np.concatenate([np.asarray(numbepoc, dtype=int) for listnumbepoc in listlistnumbepoc for numbepoc in listnumbepoc])
+    dictarry['indxdcycperi'] = np.concatenate((np.array([0]), np.cumsum([len(dcyc) for dcyc in listdcycflat])))
+    
+    return dictarry
+
+
+def retr_listboxsperishrd(dictarryshrd, indxtarg):
+    '''
+    Reconstruct the inputs of the periodic box search of a target as views onto the flattened arrays.
+    '''
+    
+    indxtimelevl = dictarryshrd['indxtimelevl'][dictarryshrd['indxlevltarg'][indxtarg]:dictarryshrd['indxlevltarg'][indxtarg+1]+1]
+    listarrytser = [dictarryshrd['arrytserconc'][indxtimelevl[b]:indxtimelevl[b+1], :] for b in range(indxtimelevl.size - 1)]
+    
+    listduratrantotllevl = dictarryshrd['duralevlconc'][dictarryshrd['indxduratarg'][indxtarg]:dictarryshrd['indxduratarg'][indxtarg+1]]
+    
+    indxgrid = dictarryshrd['indxgridtarg'][indxtarg]
+    listperi = dictarryshrd['periconc'][dictarryshrd['indxperigrid'][indxgrid]:dictarryshrd['indxperigrid'][indxgrid+1]]
+    indxdcycperi = dictarryshrd['indxdcycperi'][dictarryshrd['indxperigrid'][indxgrid]:dictarryshrd['indxperigrid'][indxgrid+1]+1]
+    listdcyc = [dictarryshrd['dcycconc'][indxdcycperi[k]:indxdcycperi[k+1]] for k in range(indxdcycperi.size - 1)]
+    listdiffepoc = [dictarryshrd['diffepocconc'][indxdcycperi[k]:indxdcycperi[k+1]] for k in range(indxdcycperi.size - 1)]
+    listnumbepoc = [dictarryshrd['numbepocconc'][indxdcycperi[k]:indxdcycperi[k+1]] for k in range(indxdcycperi.size - 1)]
+    
+    return listperi, listarrytser, listdcyc, listdiffepoc, listnumbepoc, dictarryshrd['minmtimetarg'][indxtarg], listduratrantotllevl, \
+                                                                                                            dictarryshrd['boolrebntarg'][indxtarg]
+
+
+# state of a worker process of the periodic box search attached to shared memory
+dictworkboxsperi = dict()
+
+
+def retr_contproc():
+    '''
+    Return the context in which the pools of processes are started, where the processes are started from a server process or a new interpreter 
+    instead of being forked from the current process, since a process forked after the threads of numba's threading layer have started would deadlock.
+    '''
+    
+    import multiprocessing
+    
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        objtcont = multiprocessing.get_context('forkserver')
+    else:
+        objtcont = multiprocessing.get_context('spawn')
+    
+    return objtcont
+
+
+def init_workboxsperi(dictdescshrd):
+    '''
+    Attach a worker process of the periodic box search to the shared memory blocks of the search.
+    '''
+    
+    from multiprocessing import shared_memory
+    
+    dictworkboxsperi['listobjtshrd'] = []
+    dictworkboxsperi['dictarryshrd'] = dict()
+    for name, (nameshrd, shap, strgtype) in dictdescshrd.items():
+        objtshrd = shared_memory.SharedMemory(name=nameshrd)
+        dictworkboxsperi['listobjtshrd'].append(objtshrd)
+        dictworkboxsperi['dictarryshrd'][name] = np.ndarray(shap, dtype=np.dtype(strgtype), buffer=objtshrd.buf)
+    
+    # inputs of the targets reconstructed so far
+    dictworkboxsperi['dictinpttarg'] = dict()
+
+
+def srch_boxsperi_work_shrd(numbbinsphasdcyc, indxtask):
+    '''
+    Run srch_boxsperi_work on a chunk of periods of a target in a worker process attached to the shared memory blocks of the search, 
+    where the task is given by the index of the target, the index of the chunk and the indices of the periods in the chunk, 
+    and return the outputs along with the target and chunk indices, the process ID and the time spent.
+    '''
+    
+    timeinit = modutime.time()
+    
+    indxtarg, i, indxperi = indxtask
+    if indxtarg not in dictworkboxsperi['dictinpttarg']:
+        dictworkboxsperi['dictinpttarg'][indxtarg] = retr_listboxsperishrd(dictworkboxsperi['dictarryshrd'], indxtarg)
+    listperi, listarrytser, listdcyc, listdiffepoc, listnumbepoc, minmtime, listduratrantotllevl, boolrebn = dictworkboxsperi['dictinpttarg'][indxtarg]
+    
+    dictarryshrd = dictworkboxsperi['dictarryshrd']
+    if 'cumsnumbconc' in dictarryshrd:
+        # the incremental search of a single target caches the phase histograms in shared memory
+        dictincr = dict()
+        for name in ['cumsnumbconc', 'cumsdflxconc', 'indxcumsperilevl', 'boolcumsperi']:
+            dictincr[name] = dictarryshrd[name]
+        indxdeltlevl = dictarryshrd['indxdeltlevl']
+        dictincr['listarrydelt'] = [dictarryshrd['arrydeltconc'][indxdeltlevl[b]:indxdeltlevl[b+1], :] for b in range(indxdeltlevl.size - 1)]
+    else:
+        dictincr = None
+    
+    listoutp = srch_boxsperi_work([indxperi], listperi, listarrytser, listdcyc, listdiffepoc, listnumbepoc, minmtime, \
+                                                                            listduratrantotllevl, boolrebn, numbbinsphasdcyc, 0, boolprog=False, dictincr=dictincr)
+    
+    return indxtarg, i, listoutp, os.getpid(), modutime.time() - timeinit
+
+
+def retr_listdcycboxsperi(listperi, minmdcyc, deltlogtdcyc, densstar):
+    '''
+    Return the trial duty cycles of the periodic box search at each trial period.
+    '''
+    
+    listdcyc = [[] for k in range(listperi.size)]
+    listperilogt = np.log10(listperi)
+    
+    # assuming Solar density
+    maxmdcyclogt = -2. / 3. * listperilogt - 1. + deltlogtdcyc
+    if densstar is not None:
+        maxmdcyclogt += -1. / 3. * np.log10(densstar)
+    
+    for k in range(listperi.size):
+        minmdcyclogt = max(np.log10(minmdcyc), maxmdcyclogt[k] - 3. * deltlogtdcyc)
+        if maxmdcyclogt[k] >= minmdcyclogt:
+            listdcyc[k] = np.logspace(minmdcyclogt, maxmdcyclogt[k], 2 + int((maxmdcyclogt[k] - minmdcyclogt) / deltlogtdcyc))
+    
+    return listdcyc
+
+
+def retr_listepocboxsperi(listperi, listdcyc, minmdiffepoc, factdeltepocdura):
+    '''
+    Return the implicit grid of trial epochs of the periodic box search, i.e., the epoch step and the number of epochs 
+    at each trial period and duty cycle, along with the number of trials at each period. 
+    The trial epochs start at the minimum time and extend over one period.
+    '''
+    
+    listdiffepoc = [[] for k in range(listperi.size)]
+    listnumbepoc = [[] for k in range(listperi.size)]
+    for k in range(listperi.size):
+        listdiffepoc[k] = np.maximum(minmdiffepoc, factdeltepocdura * listperi[k] * np.asarray(listdcyc[k], dtype=float))
+        listnumbepoc[k] = np.ceil(listperi[k] / listdiffepoc[k]).astype(int)
+    numbtria = np.array([np.sum(numbepoc) for numbepoc in listnumbepoc], dtype=int)
+    
+    return listdiffepoc, listnumbepoc, numbtria
+
+
+def retr_s2nrboxsperi(listampl, sizekern, listfreq=None, deltfreqkern=None):
+    '''
+    Median-detrend the amplitude spectrum of the periodic box search and normalize it by the noise inside a running window, 
+    which spans sizekern trial frequencies or, if deltfreqkern is provided, sizekern steps of deltfreqkern in the sorted trial frequencies listfreq.
+    '''
+    
+    if deltfreqkern is None:
+        listsgnl = listampl - scipy.ndimage.median_filter(listampl, size=sizekern)
+        liststdvsgnl = retr_stdvwind(listsgnl, sizekern, boolcuttpeak=True)
+    else:
+        listsgnl = listampl - retr_medirunn(listfreq, listampl, sizekern * deltfreqkern)
+        liststdvsgnl = retr_stdvwind(listsgnl, sizekern * deltfreqkern, boolcuttpeak=True, xdat=listfreq)
+    
+    lists2nr = np.zeros_like(listsgnl)
+    indxperigood = np.where(liststdvsgnl > 0)
+    lists2nr[indxperigood] = listsgnl[indxperigood] / liststdvsgnl[indxperigood]
+    
+    return listsgnl, liststdvsgnl, lists2nr
+
+
+def retr_listfreqboxsperi(minmfreq, maxmfreq, factosam, typegridfreq, delttime, factosamdura, densstar):
+    '''
+    Return the trial frequencies of the periodic box search.
+    '''
+    
+    if typegridfreq == 'unif':
+        # uniform grid with factosam trials per frequency resolution
+        listfreq = np.arange(minmfreq, maxmfreq, minmfreq / factosam)
+    
+    elif typegridfreq == 'ofir':
+        # grid of Ofir (2014), where the phase drift across the baseline between neighboring trials is 1 / factosamdura of the expected duty cycle
+        ## expected duty cycle at a period of one day, which scales as frequency^(2/3), making the grid uniform in frequency^(1/3)
+        dcycperiunit = 0.1
+        if densstar is not None:
+            dcycperiunit *= densstar**(-1. / 3.)
+        deltfreqcubr = dcycperiunit / 3. / delttime / factosamdura
+        listfreq = np.arange(minmfreq**(1. / 3.), maxmfreq**(1. / 3.), deltfreqcubr)**3
+        
+        # the grid is not made finer than the uniform grid at long periods, where the expected duty cycle would require a step smaller than minmfreq / factosam, 
+        # so that the duration-aware spacing only removes trials
+        deltfrequnif = minmfreq / factosam
+        freqtran = (deltfrequnif / 3. / deltfreqcubr)**1.5
+        if freqtran > minmfreq:
+            listfreq = np.concatenate((np.arange(minmfreq, min(freqtran, maxmfreq), deltfrequnif), listfreq[listfreq >= min(freqtran, maxmfreq)]))
+    
+    else:
+        raise Exception('Unrecognized typegridfreq: %s' % typegridfreq)
+
+    return listfreq
+
+
+def retr_perifineboxsperi(lists2nrcoar, listfreqcoar, numbpeakfine, listfreq, sizekern, deltfreqkern=None):
+    '''
+    Return the trial periods of the fine pass of the periodic box search as contiguous segments of the full-resolution frequency grid 
+    around the highest peaks of the coarse spectrum.
+    '''
+    
+    # local maxima of the coarse spectrum
+    s2nrpadd = np.full(lists2nrcoar.size + 2, -np.inf)
+    s2nrpadd[1:-1] = np.where(np.isfinite(lists2nrcoar), lists2nrcoar, -np.inf)
+    indxpeak = np.where((s2nrpadd[1:-1] >= s2nrpadd[:-2]) & (s2nrpadd[1:-1] > s2nrpadd[2:]))[0]
+    indxpeak = indxpeak[np.argsort(s2nrpadd[1:-1][indxpeak])[::-1][:numbpeakfine]]
+    
+    # each window covers two coarse frequency steps on both sides of a peak and is wide enough to estimate the baseline and noise 
+    # of the fine spectrum with a kernel of size sizekern, which spans sizekern steps of deltfreqkern if provided
+    deltfreqcoar = np.gradient(listfreqcoar)
+    numbfreq = listfreq.size
+    boolfreqfine = np.zeros(numbfreq, dtype=bool)
+    for indx in indxpeak:
+        indxfreqcntr = np.searchsorted(listfreq, listfreqcoar[indx])
+        if deltfreqkern is None:
+            minmindxfreq = min(np.searchsorted(listfreq, listfreqcoar[indx] - 2. * deltfreqcoar[indx]), indxfreqcntr - sizekern)
+            maxmindxfreq = max(np.searchsorted(listfreq, listfreqcoar[indx] + 2. * deltfreqcoar[indx], side='right'), indxfreqcntr + sizekern + 1)
+        else:
+            deltfreqwind = max(2. * deltfreqcoar[indx], sizekern * deltfreqkern)
+            minmindxfreq = np.searchsorted(listfreq, listfreqcoar[indx] - deltfreqwind)
+            maxmindxfreq = np.searchsorted(listfreq, listfreqcoar[indx] + deltfreqwind, side='right')
+        boolfreqfine[max(0, minmindxfreq):min(numbfreq, maxmindxfreq)] = True
+    
+    # split the selected frequencies into contiguous segments
+    indxfreqfine = np.where(boolfreqfine)[0]
+    listindxfreqfine = np.split(indxfreqfine, np.where(np.diff(indxfreqfine) > 1)[0] + 1)
+    listperifine = [1. / listfreq[indxfreq] for indxfreq in listindxfreqfine]
+    
+    return listperifine
+
+
+def retr_flatboxsperi(listarrytser, listdcyc, listdiffepoc, listnumbepoc):
+    '''
+    Flatten the rebinned time-series, trial duty cycles, epoch steps and numbers of epochs of the periodic box search into contiguous arrays and offsets.
+    '''
+    
+    # time-series at all rebinning levels
+    indxtimelevl = np.concatenate((np.array([0]), np.cumsum([arrytser.shape[0] for arrytser in listarrytser])))
+    timeconc = np.concatenate([arrytser[:, 0] for arrytser in listarrytser])
+    rflxconc = np.concatenate([arrytser[:, 1] for arrytser in listarrytser])
+    
+    # trial duty cycles at all periods
+    indxdcycperi = np.concatenate((np.array([0]), np.cumsum([len(dcyc) for dcyc in listdcyc])))
+    dcycconc = np.concatenate([np.asarray(dcyc, dtype=float) for dcyc in listdcyc])
+    
+    # epoch steps and numbers of epochs at all periods and duty cycles
+    diffepocconc = np.concatenate([np.asarray(diffepoc, dtype=float) for diffepoc in listdiffepoc])
+    numbepocconc = np.concatenate([np.asarray(numbepoc, dtype=int) for numbepoc in listnumbepoc])
+    
+    return timeconc, rflxconc, indxtimelevl, dcycconc, indxdcycperi, diffepocconc, numbepocconc
+
+
+def srch_boxsperi_work_numbchun(listindxperi, listperi, listarrytser, listdcyc, listdiffepoc, listnumbepoc, minmtime, listduratrantotllevl, boolrebn, numbbinsphasdcyc, i):
+    '''
+    Find the box with the lowest in-transit relative flux at each trial period in a chunk using the compiled periodic box search.
+    '''
+    
+    indxperi = np.asarray(listindxperi[i])
+    numbperi = indxperi.size
+    
+    return srch_boxsperi_work_numb(listperi[indxperi], *retr_flatboxsperi(listarrytser, [listdcyc[k] for k in indxperi], [listdiffepoc[k] for k in indxperi], \
+                                                                                            [listnumbepoc[k] for k in indxperi]), minmtime, \
+                                   np.asarray(listduratrantotllevl, dtype=float), boolrebn, numbbinsphasdcyc, False, np.zeros(0), np.zeros(0), \
+                                   np.zeros((numbperi, 0), dtype=int), np.zeros(numbperi, dtype=bool), np.zeros(0), np.zeros(0), np.zeros(1, dtype=int))
+
+
+def srch_boxsperi_work_astr(listindxperi, listperi, listarrytser, listdcyc, listdiffepoc, listnumbepoc, minmtime, listduratrantotllevl, boolrebn, numbbinsphasdcyc, i):
+    '''
+    Find the box with the highest likelihood at each trial period in a chunk using astropy's box least squares over the same trial duty cycles, 
+    and return its in-transit relative flux, duty cycle and epoch.
+    '''
+    
+    import astropy.timeseries
+    
+    numbperi = len(listindxperi[i])
+    
+    rflxitraminm = np.full(numbperi, np.nan)
+    dcycmaxm = np.zeros(numbperi)
+    epocmaxm = np.zeros(numbperi)
+    
+    arrytser = listarrytser[0]
+    rflxmedi = np.median(arrytser[:, 1])
+    objtboxs = astropy.timeseries.BoxLeastSquares(arrytser[:, 0], arrytser[:, 1])
+    for kk in range(numbperi):
+        k = listindxperi[i][kk]
+        if len(listdcyc[k]) == 0:
+            continue
+        
+        objtresu = objtboxs.power(np.array([listperi[k]]), listdcyc[k] * listperi[k], objective='likelihood', oversample=numbbinsphasdcyc)
+        
+        rflxitraminm[kk] = rflxmedi - objtresu.depth[0]
+        dcycmaxm[kk] = objtresu.duration[0] / listperi[k]
+        epocmaxm[kk] = objtresu.transit_time[0]
+    
+    return rflxitraminm, dcycmaxm, epocmaxm
+
+
+def retr_delttimeffatboxsperi(listperi, listdcyc, numbbinsphasdcyc):
+    '''
+    Return the sampling interval of the evenly resampled time-series folded by the fast-folding transform at each trial period, 
+    which is constant within each octave of trial periods such that the shortest trial box in the octave spans at least numbbinsphasdcyc samples.
+    '''
+    
+    minmperi = np.amin(listperi)
+    indxoctvperi = np.floor(np.log2(listperi / minmperi)).astype(int)
+    
+    listdelttime = np.empty(listperi.size)
+    for a in np.unique(indxoctvperi):
+        indxperioctv = np.where(indxoctvperi == a)[0]
+        listminmdcyc = [np.amin(listdcyc[k]) for k in indxperioctv if len(listdcyc[k]) > 0]
+        if len(listminmdcyc) > 0:
+            numbbinsphas = max(int(np.ceil(numbbinsphasdcyc / min(listminmdcyc))), 2)
+        else:
+            numbbinsphas = max(int(np.ceil(numbbinsphasdcyc)), 2)
+        listdelttime[indxperioctv] = minmperi * 2.**a / numbbinsphas
+    
+    return listdelttime
+
+
+def retr_ffatboxsperi(arry):
+    '''
+    Return the fast-folding transform of a time-series cut into rows of a base period, whose number must be a power of two. 
+    Row s of the output is the sum of the input rows, each shifted by s / (number of rows - 1) samples more than the previous one, 
+    which is the folded profile at the base period plus s / (number of rows - 1) samples.
+    '''
+    
+    numbrows, numbbins = arry.shape
+    indxbins = np.arange(numbbins)
+    
+    # merge pairs of neighbouring groups of rows, whose profiles are already summed over the rows of each group, until a single group is left
+    arryffat = arry.reshape((numbrows, 1, numbbins))
+    numbrowsgrup = 1
+    while numbrowsgrup < numbrows:
+        indxshft = np.arange(2 * numbrowsgrup)
+        indxrowsinpt = indxshft // 2
+        indxbinsshft = (indxbins[None, :] + ((indxshft + 1) // 2)[:, None]) % numbbins
+        arryffat = arryffat[0::2, indxrowsinpt, :] + arryffat[1::2, indxrowsinpt[:, None], indxbinsshft]
+        numbrowsgrup *= 2
+    
+    return arryffat[0]
+
+
+def srch_boxsperi_work_ffat(listindxperi, listperi, listarrytser, listdcyc, listdiffepoc, listnumbepoc, minmtime, listduratrantotllevl, boolrebn, numbbinsphasdcyc, i):
+    '''
+    Find the box with the lowest in-transit relative flux at each trial period in a chunk, where the first time-series in listarrytser is evenly resampled 
+    and the phase histograms of all trial periods sharing the same integer number of samples per period are computed at once by the fast-folding transform. 
+    Every trial box (epoch, duty cycle) is then scored using the cumulative sums of the histogram as in srch_boxsperi_work.
+    '''
+    
+    numbperi = len(listindxperi[i])
+    
+    arrytser = listarrytser[0]
+    
+    # sampling intervals of the resampled time-series, which depend on the whole period grid
+    listdelttime = retr_delttimeffatboxsperi(listperi, listdcyc, numbbinsphasdcyc)
+    
+    rflxitraminm = np.full(numbperi, np.nan)
+    dcycmaxm = np.zeros(numbperi)
+    epocmaxm = np.zeros(numbperi)
+    
+    listindxperichun = np.asarray(listindxperi[i])
+    
+    for delttime in np.unique(listdelttime[listindxperichun]):
+        
+        # evenly resampled number of samples and flux offset from unity
+        indxsamp = np.floor((arrytser[:, 0] - minmtime) / delttime).astype(int)
+        numbsamp = np.amax(indxsamp) + 1
+        numbsampresa = np.bincount(indxsamp, minlength=numbsamp).astype(float)
+        dflxsampresa = np.bincount(indxsamp, weights=arrytser[:, 1] - 1., minlength=numbsamp)
+        
+        # times of the nonempty resampled samples with respect to the first sample
+        indxsampgood = np.where(numbsampresa > 0)[0]
+        timesampgood = indxsampgood * delttime
+        
+        indxperidelt = np.where(listdelttime[listindxperichun] == delttime)[0]
+        
+        # integer number of samples per period
+        numbbinsperi = np.floor(listperi[listindxperichun[indxperidelt]] / delttime).astype(int)
+        
+        for numbbins in np.unique(numbbinsperi):
+            
+            indxperibins = indxperidelt[numbbinsperi == numbbins]
+            
+            # cut the resampled time-series into a power of two rows of the base period
+            numbrows = 2**int(np.ceil(np.log2(max(2, int(np.ceil(numbsamp / numbbins))))))
+            
+            # the transform costs as much as folding the time-series once per row of the transform
+            boolffat = indxperibins.size > np.log2(numbrows)
+            if boolffat:
+                arrynumb = np.zeros(numbrows * numbbins)
+                arrynumb[:numbsamp] = numbsampresa
+                arrydflx = np.zeros(numbrows * numbbins)
+                arrydflx[:numbsamp] = dflxsampresa
+                
+                histnumb = retr_ffatboxsperi(arrynumb.reshape((numbrows, numbbins)))
+                histdflx = retr_ffatboxsperi(arrydflx.reshape((numbrows, numbbins)))
+            
+            for kk in indxperibins:
+                
+                k = listindxperichun[kk]
+                
+                if len(listdcyc[k]) == 0:
+                    continue
+                
+                peri = listperi[k]
+                
+                cumsnumb = np.zeros(numbbins + 1)
+                cumsdflx = np.zeros(numbbins + 1)
+                if boolffat:
+                    # row of the transform closest to the trial period
+                    indxrows = int(np.round((peri / delttime - numbbins) * (numbrows - 1)))
+                    cumsnumb[1:] = np.cumsum(histnumb[indxrows, :])
+                    cumsdflx[1:] = np.cumsum(histdflx[indxrows, :])
+                else:
+                    # fold the resampled time-series directly
+                    indxbinsphas = np.minimum((timesampgood % peri / peri * numbbins).astype(int), numbbins - 1)
+                    cumsnumb[1:] = np.cumsum(np.bincount(indxbinsphas, weights=numbsampresa[indxsampgood], minlength=numbbins))
+                    cumsdflx[1:] = np.cumsum(np.bincount(indxbinsphas, weights=dflxsampresa[indxsampgood], minlength=numbbins))
+                
+                cntr = 0
+                for l in range(len(listdcyc[k])):
+                    
+                    epoc = minmtime + np.arange(listnumbepoc[k][l]) * listdiffepoc[k][l]
+                    
+                    # position of the trial epochs and half width of the box in units of phase bins
+                    posiepoc = ((epoc - minmtime) % peri) / peri * numbbins
+                    sizehalf = listdcyc[k][l] * numbbins / 2.
+                    
+                    # first and last (exclusive) phase bins inside the box for each trial epoch
+                    indxbinsinit = np.floor(posiepoc - sizehalf + 0.5).astype(int)
+                    indxbinsfinl = np.maximum(np.floor(posiepoc + sizehalf + 0.5).astype(int), indxbinsinit + 1)
+                    
+                    numbitra = retr_cumsboxsperi(cumsnumb, indxbinsfinl, numbbins) - retr_cumsboxsperi(cumsnumb, indxbinsinit, numbbins)
+                    
+                    indxepocgood = np.where(numbitra > 0)[0]
+                    if indxepocgood.size == 0:
+                        continue
+                    
+                    rflxitra = 1. + (retr_cumsboxsperi(cumsdflx, indxbinsfinl[indxepocgood], numbbins) - \
+                                     retr_cumsboxsperi(cumsdflx, indxbinsinit[indxepocgood], numbbins)) / numbitra[indxepocgood]
+                    
+                    m = np.argmin(rflxitra)
+                    
+                    if cntr == 0 or rflxitra[m] < rflxitraminm[kk]:
+                        rflxitraminm[kk] = rflxitra[m]
+                        dcycmaxm[kk] = listdcyc[k][l]
+                        epocmaxm[kk] = epoc[indxepocgood[m]]
+                        cntr += 1
+    
+    return rflxitraminm, dcycmaxm, epocmaxm
+
+
+@jit(nopython=True, parallel=True)
+def srch_boxsperi_work_numb(listperi, timeconc, rflxconc, indxtimelevl, dcycconc, indxdcycperi, diffepocconc, numbepocconc, minmtime, \
+                                                                                            listduratrantotllevl, boolrebn, numbbinsphasdcyc, \
+                            boolincr, cumsnumbconc, cumsdflxconc, indxcumsperilevl, boolcumsperi, timedeltconc, dflxdeltconc, indxdeltlevl):
+    '''
+    Compiled counterpart of srch_boxsperi_work, parallelized over the trial periods, that yields bit-identical outputs. 
+    If boolincr is True, the cumulative sums are cached across iterations as in srch_boxsperi_work, where the flux changes at each level are given by 
+    the flattened timedeltconc and dflxdeltconc with offsets indxdeltlevl.
+    '''
+    
+    numbperi = listperi.size
+    numblevlrebn = indxtimelevl.size - 1
+    
+    rflxitraminm = np.full(numbperi, np.nan)
+    dcycmaxm = np.zeros(numbperi)
+    epocmaxm = np.zeros(numbperi)
+    
+    for k in prange(numbperi):
+        
+        if indxdcycperi[k+1] == indxdcycperi[k]:
+            continue
+        
+        peri = listperi[k]
+        dcyc = dcycconc[indxdcycperi[k]:indxdcycperi[k+1]]
+        
+        numbbinsphas = int(np.ceil(numbbinsphasdcyc / np.amin(dcyc)))
+        
+        if boolrebn:
+            indxlevldcyc = np.searchsorted(listduratrantotllevl, dcyc * peri * 24., side='right') - 1
+        else:
+            indxlevldcyc = np.zeros(dcyc.size, dtype=np.int64)
+        
+        # fold once per period and rebinning level
+        boolfold = np.zeros(numblevlrebn, dtype=np.bool_)
+        cumsnumb = np.zeros((numblevlrebn, numbbinsphas + 1))
+        cumsdflx = np.zeros((numblevlrebn, numbbinsphas + 1))
+        boolcums = boolincr and boolcumsperi[k]
+        for l in range(dcyc.size):
+            b = indxlevldcyc[l]
+            if boolfold[b]:
+                continue
+            boolfold[b] = True
+            if boolcums:
+                # update the cached histogram with the flux changes since it was last updated
+                indxcums = indxcumsperilevl[k, b]
+                sumsdflx = np.zeros(numbbinsphas)
+                for n in range(indxdeltlevl[b], indxdeltlevl[b+1]):
+                    phas = (timedeltconc[n] % peri) / peri
+                    indxbinsphas = min(int(phas * numbbinsphas), numbbinsphas - 1)
+                    sumsdflx[indxbinsphas] += dflxdeltconc[n]
+                cumssumsdflx = 0.
+                for a in range(numbbinsphas):
+                    cumssumsdflx += sumsdflx[a]
+                    cumsdflxconc[indxcums+a+1] += cumssumsdflx
+                cumsnumb[b, :] = cumsnumbconc[indxcums:indxcums+numbbinsphas+1]
+                cumsdflx[b, :] = cumsdflxconc[indxcums:indxcums+numbbinsphas+1]
+            else:
+                numbsamp = np.zeros(numbbinsphas)
+                sumsdflx = np.zeros(numbbinsphas)
+                for n in range(indxtimelevl[b], indxtimelevl[b+1]):
+                    phas = (timeconc[n] % peri) / peri
+                    indxbinsphas = min(int(phas * numbbinsphas), numbbinsphas - 1)
+                    numbsamp[indxbinsphas] += 1.
+                    sumsdflx[indxbinsphas] += rflxconc[n] - 1.
+                for a in range(numbbinsphas):
+                    cumsnumb[b, a+1] = cumsnumb[b, a] + numbsamp[a]
+                    cumsdflx[b, a+1] = cumsdflx[b, a] + sumsdflx[a]
+                if boolincr:
+                    indxcums = indxcumsperilevl[k, b]
+                    cumsnumbconc[indxcums:indxcums+numbbinsphas+1] = cumsnumb[b, :]
+                    cumsdflxconc[indxcums:indxcums+numbbinsphas+1] = cumsdflx[b, :]
+        if boolincr:
+            boolcumsperi[k] = True
+        
+        cntr = 0
+        for l in range(dcyc.size):
+            
+            b = indxlevldcyc[l]
+            
+            dydchalf = dcyc[l] / 2.
+            
+            indxdcyc = indxdcycperi[k] + l
+            for m in range(numbepocconc[indxdcyc]):
+                
+                epoc = minmtime + m * diffepocconc[indxdcyc]
+                
+                phasdiff = (epoc % peri) / peri
+                
+                indxbinsinit = int(np.floor((phasdiff - dydchalf) * numbbinsphas + 0.5))
+                indxbinsfinl = max(int(np.floor((phasdiff + dydchalf) * numbbinsphas + 0.5)), indxbinsinit + 1)
+                
+                numbitra = ((indxbinsfinl // numbbinsphas) * cumsnumb[b, numbbinsphas] + cumsnumb[b, indxbinsfinl % numbbinsphas]) - \
+                           ((indxbinsinit // numbbinsphas) * cumsnumb[b, numbbinsphas] + cumsnumb[b, indxbinsinit % numbbinsphas])
+                
+                if numbitra <= 0:
+                    continue
+                
+                rflxitra = 1. + (((indxbinsfinl // numbbinsphas) * cumsdflx[b, numbbinsphas] + cumsdflx[b, indxbinsfinl % numbbinsphas]) - \
+                                 ((indxbinsinit // numbbinsphas) * cumsdflx[b, numbbinsphas] + cumsdflx[b, indxbinsinit % numbbinsphas])) / numbitra
+                
+                if cntr == 0 or rflxitra < rflxitraminm[k]:
+                    rflxitraminm[k] = rflxitra
+                    dcycmaxm[k] = dcyc[l]
+                    epocmaxm[k] = epoc
+                    cntr += 1
+        
+    return rflxitraminm, dcycmaxm, epocmaxm
+
+
+def retr_listarryrebnboxsperi(arry, minmduratrantotl, maxmduratrantotl, factduracade, numblevlrebn, typeverb=1):
+    '''
+    Return the transit durations of the rebinning levels of the periodic box search and the time-series rebinned at each level.
+    '''
+    
+    # list of transit durations when rebinned data sets will be used
+    listduratrantotllevl = np.linspace(minmduratrantotl, maxmduratrantotl, numblevlrebn)
+    
+    if typeverb > 0:
+        print('factduracade')
+        print(factduracade)
+    # the levels of the same time-series are cached, e.g., for repeated searches of the same time-series, whose content is hashed once for all levels
+    strghasharry = retr_strghasharry(arry)
+    listarryrebn = []
+    for b in range(numblevlrebn):
+        delt = listduratrantotllevl[b] / 24. / factduracade
+        arryrebn = rebn_tser(arry, delt=delt, boolcach=True, strghasharry=strghasharry)
+        indx = np.where(np.isfinite(arryrebn[:, 1]))[0]
+        if typeverb > 0:
+            print('Transit duration for the level: %g [hour]' % listduratrantotllevl[b])
+            print('Number of data points in rebinned to a delta time of %g [min]: %d' % (delt * 24. * 60., arryrebn.shape[0]))
+            print('Number of finite data points in rebinned to a delta time of %g [min]: %d' % (delt * 24. * 60., indx.size))
+            print('')
+        listarryrebn.append(arryrebn[indx, :])
+    
+    return listduratrantotllevl, listarryrebn
+
+
+def retr_indxcumsboxsperi(listperi, listdcyc, listduratrantotllevl, boolrebn, numblevlrebn, numbbinsphasdcyc):
+    '''
+    Return the offsets of the cumulative phase histograms of each trial period and rebinning level in the flattened cache 
+    of the incremental periodic box search, where unused levels have an offset of -1, along with the size of the cache.
+    '''
+    
+    indxcumsperilevl = np.full((listperi.size, numblevlrebn), -1, dtype=int)
+    numbcums = 0
+    for k in range(listperi.size):
+        if len(listdcyc[k]) == 0:
+            continue
+        numbbinsphas = int(np.ceil(numbbinsphasdcyc / np.amin(listdcyc[k])))
+        if boolrebn:
+            indxlevlfold = np.unique(np.digitize(listdcyc[k] * listperi[k] * 24., listduratrantotllevl) - 1)
+        else:
+            indxlevlfold = [0]
+        for b in indxlevlfold:
+            indxcumsperilevl[k, b] = numbcums
+            numbcums += numbbinsphas + 1
+    
+    return indxcumsperilevl, numbcums
+
+
+def retr_costboxsperi(listperi, listdcyc, numbtria, listarrytser, listduratrantotllevl, boolrebn):
+    '''
+    Return the estimated cost of each trial period of the periodic box search, given by the number of trial boxes and the number of samples folded.
+    '''
+    
+    costperi = np.copy(numbtria)
+    for k in range(listperi.size):
+        if len(listdcyc[k]) == 0:
+            continue
+        if boolrebn:
+            indxlevlfold = np.unique(np.digitize(listdcyc[k] * listperi[k] * 24., listduratrantotllevl) - 1)
+        else:
+            indxlevlfold = [0]
+        for b in indxlevlfold:
+            costperi[k] += listarrytser[b].shape[0]
+    
+    return costperi
+
+
+def retr_chunboxsperi(costperi, numbchun):
+    '''
+    Cut the period grid of the periodic box search into contiguous chunks of similar cost.
+    '''
+    
+    numbperi = costperi.size
+    numbchun = max(1, min(numbperi, numbchun))
+    cumscost = np.cumsum(costperi)
+    indxchunperi = np.floor(numbchun * (cumscost - costperi) / cumscost[-1]).astype(int)
+    listindxperichun = np.split(np.arange(numbperi), np.where(np.diff(indxchunperi) != 0)[0] + 1)
+    
+    return listindxperichun
+
+
+def retr_hashboxsperi(listarrytser, listperi, listdcyc, listdiffepoc, listnumbepoc, minmtime, listduratrantotllevl, boolrebn, numbbinsphasdcyc, typecalc='native'):
+    '''
+    Return a hash of all inputs that determine the outputs of the periodic box search over a period grid.
+    '''
+    
+    objthash = hashlib.sha1()
+    for arry in listarrytser:
+        objthash.update(np.ascontiguousarray(arry[:, :2], dtype=float).tobytes())
+    objthash.update(np.asarray(listperi, dtype=float).tobytes())
+    for k in range(listperi.size):
+        objthash.update(np.asarray(listdcyc[k], dtype=float).tobytes())
+        objthash.update(np.asarray(listdiffepoc[k], dtype=float).tobytes())
+        objthash.update(np.asarray(listnumbepoc[k], dtype=int).tobytes())
+    objthash.update(np.asarray(listduratrantotllevl, dtype=float).tobytes())
+    objthash.update(np.array([minmtime, boolrebn, numbbinsphasdcyc], dtype=float).tobytes())
+    objthash.update(typecalc.encode())
+    
+    return objthash.hexdigest()
+
+
+def read_chkpboxsperi(path, numbperi):
+    '''
+    Read the outputs of the completed trial periods of the periodic box search from a checkpoint file, if it exists, or initialize them otherwise.
+    '''
+    
+    if path is not None and os.path.exists(path):
+        print('Resuming the periodic box search from %s...' % path)
+        objtfile = np.load(path)
+        return objtfile['boolperidone'], objtfile['listrflxitra'], objtfile['listdcycmaxm'], objtfile['listepocmaxm']
+    
+    return np.zeros(numbperi, dtype=bool), np.full(numbperi, np.nan), np.zeros(numbperi), np.zeros(numbperi)
+
+
+def writ_chkpboxsperi(path, boolperidone, listrflxitra, listdcycmaxm, listepocmaxm):
+    '''
+    Write the outputs of the completed trial periods of the periodic box search to a checkpoint file.
+    '''
+    
+    # write to a temporary file first so that an interruption never leaves a corrupt checkpoint behind
+    pathtemp = path + '.temp'
+    with open(pathtemp, 'wb') as objtfile:
+        np.savez(objtfile, boolperidone=boolperidone, listrflxitra=listrflxitra, listdcycmaxm=listdcycmaxm, listepocmaxm=listepocmaxm)
+    os.replace(pathtemp, path)
+
+
+def retr_peakboxsperi(listampl, indxsegm, sizekern, listperi=None, deltfreqkern=None):
+    '''
+    Return the signal, its standard deviation and the S/N of a periodic box search spectrum along with the index of its peak. 
+    Each segment of contiguous trial periods is normalized separately and the peak is picked from the segments with nonnegative indices. 
+    If deltfreqkern is provided, the baseline and noise are estimated inside a window of sizekern steps of deltfreqkern in the frequencies of the trial periods listperi, 
+    which are sorted in the order of increasing frequency.
+    '''
+    
+    listsgnl = np.empty_like(listampl)
+    liststdvsgnl = np.empty_like(listampl)
+    lists2nr = np.empty_like(listampl)
+    for n in np.unique(indxsegm):
+        indxperisegm = np.where(indxsegm == n)[0]
+        if deltfreqkern is None:
+            # a segment may have fewer trial periods than the kernel size
+            listsgnl[indxperisegm], liststdvsgnl[indxperisegm], lists2nr[indxperisegm] = \
+                                                retr_s2nrboxsperi(listampl[indxperisegm], min(sizekern, 2 * ((indxperisegm.size - 1) // 2) + 1))
+        else:
+            listsgnl[indxperisegm], liststdvsgnl[indxperisegm], lists2nr[indxperisegm] = \
+                                                retr_s2nrboxsperi(listampl[indxperisegm], sizekern, 1. / listperi[indxperisegm], deltfreqkern)
+    
+    indxpericand = np.where(indxsegm >= 0)[0]
+    indxperimpow = indxpericand[np.nanargmax(lists2nr[indxpericand])]
+    
+    return listsgnl, liststdvsgnl, lists2nr, indxperimpow
+
+
+def retr_boolspecboxsperi(listdictspec, sizekern, thrss2nr, maxmnumbboxsperi):
+    '''
+    Return whether the stored spectra of the periodic box search suffice to reproduce its detections given the kernel size, 
+    detection threshold and maximum number of detections.
+    '''
+    
+    for j in range(len(listdictspec)):
+        
+        lists2nr, indxperimpow = retr_peakboxsperi(listdictspec[j]['listampl'], listdictspec[j]['indxsegm'], sizekern, \
+                                                                        listdictspec[j]['listperi'], listdictspec[j]['deltfreqkern'])[2:]
+        
+        if lists2nr[indxperimpow] < thrss2nr or indxperimpow == lists2nr.size - 1:
+            return True
+        
+        if maxmnumbboxsperi is not None and j + 1 >= maxmnumbboxsperi:
+            return True
+        
+        # the spectrum of the next iteration is only valid if it was computed after masking the same detection
+        if indxperimpow != listdictspec[j]['indxperimpow']:
+            return False
+    
+    return False
+
+
+def read_specboxsperi(path):
+    '''
+    Read the spectra of the periodic box search at each iteration along with the hash of the inputs and the parameters used to detect their peaks.
+    '''
+    
+    objtfile = np.load(path)
+    
+    listdictspec = []
+    for j in range(int(objtfile['numbiter'])):
+        dictspec = dict()
+        for name in ['listperi', 'listampl', 'listsgnl', 'liststdvsgnl', 'lists2nr', 'listepoc', 'listdura', 'indxsegm', 'indxperimpow']:
+            dictspec[name] = objtfile['%s%d' % (name, j)]
+        
+        # frequency step of the kernel, which is not finite when the kernel spans a number of trial periods
+        dictspec['deltfreqkern'] = None
+        if 'deltfreqkern%d' % j in objtfile and np.isfinite(objtfile['deltfreqkern%d' % j]):
+            dictspec['deltfreqkern'] = float(objtfile['deltfreqkern%d' % j])
+        listdictspec.append(dictspec)
+    
+    dictpara = dict()
+    dictpara['strghash'] = str(objtfile['strghash'])
+    dictpara['sizekern'] = int(objtfile['sizekern'])
+    dictpara['thrss2nr'] = float(objtfile['thrss2nr'])
+    dictpara['maxmnumbboxsperi'] = int(objtfile['maxmnumbboxsperi'])
+    if dictpara['maxmnumbboxsperi'] < 0:
+        dictpara['maxmnumbboxsperi'] = None
+    
+    return listdictspec, dictpara
+
+
+def writ_specboxsperi(path, strghash, listdictspec, sizekern, thrss2nr, maxmnumbboxsperi):
+    '''
+    Write the spectra of the periodic box search at each iteration along with the parameters used to detect their peaks.
+    '''
+    
+    dictarry = dict()
+    for j, dictspec in enumerate(listdictspec):
+        for name in dictspec:
+            if name == 'deltfreqkern' and dictspec[name] is None:
+                dictarry['%s%d' % (name, j)] = np.nan
+            else:
+                dictarry['%s%d' % (name, j)] = dictspec[name]
+    
+    if maxmnumbboxsperi is None:
+        maxmnumbboxsperi = -1
+    
+    print('Writing to %s...' % path)
+    with open(path, 'wb') as objtfile:
+        np.savez(objtfile, strghash=strghash, numbiter=len(listdictspec), sizekern=sizekern, thrss2nr=thrss2nr, maxmnumbboxsperi=maxmnumbboxsperi, **dictarry)
+
+
+def srch_outlperi( \
+                  # time of samples
+                  time, \
+                  # relative flux of samples
+                  flux, \
+                  # relative flux error of samples
+                  stdvflux, \
+                  # number of outliers to include in the search
+                  numboutl=5, \
+                  # Boolean flag to diagnose
+                  booldiag=True, \
+                 ):
+    '''
+    Search for periodic outliers in a computationally efficient way
+    '''
+    
+    # indices of the outliers
+    indxtimesort = np.argsort(flux)[::-1][:numboutl]
+    
+    # the times of the outliers
+    timeoutl = time[indxtimesort]
+    
+    # number of differences between times of outlier samples
+    numbdiff = int(numboutl * (numboutl - 1) / 2)
+    
+    # differences between times of outlier samples
+    difftimeoutl = np.empty(numbdiff)
+    
+    # compute the differences between times of outlier samples
+    listtemp = []
+    c = 0
+    indxoutl = np.arange(numboutl)
+    for a in indxoutl:
+        for b in indxoutl:
+            if a >= b:
+                continue
+            listtemp.append([a, b])
+            difftimeoutl[c] = abs(timeoutl[a] - timeoutl[b])
+            c += 1
+    
+    # incides that sort the differences between times of outlier samples
+    indxsort = np.argsort(difftimeoutl)
     
     # sorted differences between times of outlier samples
     difftimeoutlsort = difftimeoutl[indxsort]
@@ -5279,7 +6824,30 @@ def srch_outlperi( \
     return dictoutp
 
 
-def srch_boxsperi(arry, \
+# backends of the periodic box search, which take the trial period grid and the index i of the chunk of trial periods listindxperi[i] to be searched 
+# and return the lowest in-transit relative flux, and the duty cycle and epoch of the corresponding box at each trial period in the chunk
+dictbackboxsperi = dict()
+
+
+def setp_backboxsperi(typecalc, funcsrch):
+    '''
+    Register a backend of the periodic box search, which can then be selected by typecalc in srch_boxsperi.
+    '''
+    
+    dictbackboxsperi[typecalc] = funcsrch
+
+
+setp_backboxsperi('native', partial(srch_boxsperi_work, boolprog=False))
+setp_backboxsperi('numba', srch_boxsperi_work_numbchun)
+setp_backboxsperi('ffa', srch_boxsperi_work_ffat)
+setp_backboxsperi('astropy', srch_boxsperi_work_astr)
+
+
+def srch_boxsperi( \
+              
+              # time-series data or a list of time-series data from different instruments to be searched jointly, 
+              # where each instrument is folded at its own cadence and rebinning levels
+              arry, \
               
               # Boolean flag to search for positive boxes
               boolsrchposi=False, \
@@ -5291,7 +6859,14 @@ def srch_boxsperi(arry, \
               
               dicttlsqinpt=None, \
               
-              # temp: move this out of srch_boxsperi
+              # type of calculation
+              ## 'native': prefix sums of phase histograms in numpy
+              ## 'numba': compiled version of 'native', parallelized over periods with threads
+              ## 'ffa': fast-folding transform of the evenly resampled time-series, which computes the phase histograms of neighbouring trial periods at once 
+              ##        and is the fastest at long trial periods
+              ## 'astropy': astropy's box least squares over the same trial periods and duty cycles
+              ## 'TLS': transit least squares over its own period grid
+              ## or any other backend registered with setp_backboxsperi
               typecalc='native', \
               
               # minimum period
@@ -5306,6 +6881,26 @@ def srch_boxsperi(arry, \
               # factor by which to oversample the frequency grid
               factosam=10., \
               
+              # type of the frequency grid
+              ## 'unif': uniform in frequency with a step of the minimum frequency divided by factosam
+              ## 'ofir': uniform in frequency^(1/3) with a step set by the phase smearing of the duration expected at each period (Ofir 2014), 
+              ##         except at long periods, where it is not made finer than 'unif'
+              typegridfreq='unif', \
+              
+              # number of trial frequencies per phase drift of one expected duty cycle across the baseline when typegridfreq is 'ofir'
+              factosamdura=0.5, \
+              
+              # Boolean flag to search a coarse frequency grid over the coarsest rebinned time-series first 
+              # and then search the full-resolution time-series densely around the highest peaks
+              boolcoarfine=False, \
+              
+              # factor by which to oversample the coarse frequency grid, which defaults to a quarter of factosam 
+              # (when typegridfreq is 'ofir', factosamdura is scaled by factosamcoar / factosam)
+              factosamcoar=None, \
+              
+              # number of peaks in the coarse spectrum to be refined in the fine pass
+              numbpeakfine=5, \
+              
               # differential logarithm of duty cycle
               deltlogtdcyc=0.1, \
               
@@ -5317,15 +6912,27 @@ def srch_boxsperi(arry, \
 
               # epoc steps divided by trial duration
               factdeltepocdura=0.5, \
+              
+              # number of phase bins spanned by the shortest trial duty cycle when folding into a phase histogram
+              numbbinsphasdcyc=10, \
 
+              # Boolean flag to cache the phase histograms of all trial periods and, when searching for additional boxes, 
+              # only update them with the masked in-transit samples of the previous detection instead of folding the time-series again
+              ## this requires memory proportional to the number of trial periods times the number of phase bins
+              boolincr=False, \
+              
               # detection threshold
               thrss2nr=7.1, \
               
               # number of processes
               numbproc=None, \
               
-              # Boolean flag to enable multiprocessing
-              boolprocmult=True, \
+              # Boolean flag to enable multiprocessing, which defaults to True except in the joint search over multiple instruments, 
+              ## which always runs in a single process
+              boolprocmult=None, \
+              
+              # number of period chunks per process to be handed out to idle processes during multiprocessing
+              numbchunproc=20, \
               
               # string extension to output files
               strgextn='', \
@@ -5333,8 +6940,19 @@ def srch_boxsperi(arry, \
               # path where the output data will be stored
               pathdata=None, \
               
+              # Boolean flag to periodically write the outputs of the completed period chunks to a checkpoint file under pathdata, 
+              # from which a search interrupted before completion resumes when rerun with the same inputs
+              boolchkp=True, \
+              
+              # minimum time between two consecutive checkpoints [seconds]
+              timechkp=60., \
+              
               # Boolean flag to rebin the time-series
               boolchecrebn=True, \
+              
+              # weights of the samples of each instrument when searching the time-series of multiple instruments jointly,
+              # which default to the inverse variance of the relative flux of each instrument
+              listweiginst=None, \
 
               # plotting
               ## path where the output visuals will be written
@@ -5368,8 +6986,44 @@ def srch_boxsperi(arry, \
              ):
     '''
     Search for periodic boxes in time-series data.
+    When arry is a list, the weighted box statistics of the instruments are summed at each trial box, 
+    so that the time-series of each instrument is rebinned and folded at its own cadence rather than at the finest cadence of all instruments.
     '''
     
+    if typecalc != 'TLS' and typecalc not in dictbackboxsperi:
+        print('typecalc')
+        print(typecalc)
+        raise Exception('Unknown backend of the periodic box search.')
+    
+    # Boolean flag to search the time-series of multiple instruments jointly
+    booljoin = isinstance(arry, list)
+    if boolprocmult is None:
+        boolprocmult = not booljoin
+    
+    if booljoin:
+        if typecalc != 'native':
+            print('typecalc')
+            print(typecalc)
+            raise Exception('The joint periodic box search over multiple instruments is only implemented for the native backend.')
+
+        if boolprocmult:
+            print('Warning! The joint periodic box search over multiple instruments does not use a pool of processes. Ignoring boolprocmult...')
+        boolprocmult = False
+        if boolincr:
+            print('Warning! The joint periodic box search over multiple instruments does not update cached phase histograms incrementally. Ignoring boolincr...')
+
+        # time-series of each instrument sorted in time
+        listarryinst = [arryinst[np.argsort(arryinst[:, 0], kind='stable'), :] for arryinst in arry]
+        numbinst = len(listarryinst)
+        indxinst = np.arange(numbinst)
+        listnumbtimeinst = [arryinst.shape[0] for arryinst in listarryinst]
+        
+        # all samples, which are used to derive the period grid, to estimate the amplitudes and for the plots
+        arry = np.concatenate(listarryinst, 0)
+        arry = arry[np.argsort(arry[:, 0], kind='stable'), :]
+    else:
+        listnumbtimeinst = None
+    
     boolproc = False
     listnameplot = ['ampl', 'sgnl', 'stdvsgnl', 's2nr', 'rflx', 'pcur']
     if pathdata is None:
@@ -5382,6 +7036,27 @@ def srch_boxsperi(arry, \
         if not os.path.exists(pathsave):
             boolproc = True
         
+        # spectra of the periodic box search stored by an earlier run, which are reused if computed from the same inputs
+        pathspec = pathsave[:-4] + '_spec.npz'
+        objthash = hashlib.sha1(np.ascontiguousarray(arry, dtype=float).tobytes())
+        if boolcoarfine:
+            sizekernhash = sizekern
+        else:
+            sizekernhash = None
+        objthash.update(repr([boolsrchposi, typecalc, minmperi, maxmperi, factduracade, factosam, typegridfreq, factosamdura, boolcoarfine, factosamcoar, \
+                                            numbpeakfine, deltlogtdcyc, densstar, sizekernhash, factdeltepocdura, numbbinsphasdcyc, boolchecrebn, \
+                                            listnumbtimeinst, listweiginst]).encode())
+        strghashspec = objthash.hexdigest()
+        listdictspec = None
+        if os.path.exists(pathspec):
+            listdictspec, dictparaspec = read_specboxsperi(pathspec)
+            # the stored outputs are outdated if the inputs or the parameters of the detection have changed
+            if dictparaspec['strghash'] != strghashspec or dictparaspec['sizekern'] != sizekern or dictparaspec['thrss2nr'] != thrss2nr or \
+                                                                                                dictparaspec['maxmnumbboxsperi'] != maxmnumbboxsperi:
+                boolproc = True
+            if dictparaspec['strghash'] != strghashspec or not retr_boolspecboxsperi(listdictspec, sizekern, thrss2nr, maxmnumbboxsperi):
+                listdictspec = None
+        
         dictpathplot = dict()
         for strg in listnameplot:
             dictpathplot[strg] = []
@@ -5417,7 +7092,19 @@ def srch_boxsperi(arry, \
             for name in listnameplot:
                 dictboxsperioutp['listpathplot%s' % name] = []
     
-        print('Searching for periodic boxes in time-series data...')
+        # Boolean flag to reproduce the detections from the stored spectra instead of searching
+        boolreadspec = pathdata is not None and listdictspec is not None and typecalc in dictbackboxsperi
+        
+        # Boolean flag to use a pool of processes
+        boolpool = typecalc == 'native' and boolprocmult and not boolreadspec and not booljoin
+        
+        # spectra at each iteration
+        listdictspecwrit = []
+
+        if boolreadspec:
+            print('Reading the spectra of the periodic box search from %s...' % pathspec)
+        else:
+            print('Searching for periodic boxes in time-series data...')
         
         print('factosam')
         print(factosam)
@@ -5434,6 +7121,8 @@ def srch_boxsperi(arry, \
         liststrgvarbsave = ['peri', 'epoc', 'ampl', 'dura', 's2nr']
         for strg in liststrgvarbsave:
             dictboxsperioutp[strg] = []
+        if typecalc == 'TLS':
+            dictboxsperioutp['prfp'] = []
         
         if booldiag:
             if (abs(arry[:, 1]) > 1e10).any():
@@ -5443,6 +7132,16 @@ def srch_boxsperi(arry, \
         arrysrch = np.copy(arry)
         if boolsrchposi:
             arrysrch[:, 1] = 2. - arrysrch[:, 1]
+        
+        if booljoin:
+            listarrysrchinst = [np.copy(arryinst) for arryinst in listarryinst]
+            for n in indxinst:
+                if listarrysrchinst[n].shape[0] < 2:
+                    print('n')
+                    print(n)
+                    raise Exception('The time-series of each instrument should have at least two samples.')
+                if boolsrchposi:
+                    listarrysrchinst[n][:, 1] = 2. - listarrysrchinst[n][:, 1]
 
         j = 0
         
@@ -5460,7 +7159,11 @@ def srch_boxsperi(arry, \
         difftime = arrysrch[1:, 0] - arrysrch[:-1, 0]
         #arrysrch[:, 0] -= minmtime
 
-        minmdifftime = np.amin(difftime)
+        if booljoin:
+            # the time-series of different instruments may overlap, so the minimum time difference is taken within each instrument
+            minmdifftime = min([np.amin(np.diff(arryinst[:, 0])) for arryinst in listarrysrchinst])
+        else:
+            minmdifftime = np.amin(difftime)
         
         print('Initial:')
         print('minmperi')
@@ -5479,11 +7182,16 @@ def srch_boxsperi(arry, \
         else:
             maxmfreq = 1. / minmperi
 
-        deltfreq = minmfreq / factosam
-        
-        listfreq = np.arange(minmfreq, maxmfreq, deltfreq)
+        listfreq = retr_listfreqboxsperi(minmfreq, maxmfreq, factosam, typegridfreq, maxmtime - minmtime, factosamdura, densstar)
         listperi = 1. / listfreq
         
+        # frequency step of the kernel that detrends the spectrum, which spans sizekern steps of the uniform grid on any other grid, 
+        # so that its width in frequency does not depend on the local density of trial frequencies
+        if typegridfreq == 'unif':
+            deltfreqkern = None
+        else:
+            deltfreqkern = minmfreq / factosam
+        
         # cadence
         cade = minmdifftime * 24. * 3600. # [seconds]
         print('Cadence: %g [seconds]' % cade)
@@ -5510,23 +7218,15 @@ def srch_boxsperi(arry, \
         print('maxmperi')
         print(maxmperi)
         
-        listdcyc = [[] for k in indxperi]
-        listperilogt = np.log10(listperi)
-        
         if deltlogtdcyc is None:
             deltlogtdcyc = np.log10(2.)
         
-        # assuming Solar density
-        maxmdcyclogt = -2. / 3. * listperilogt - 1. + deltlogtdcyc
-        if densstar is not None:
-            maxmdcyclogt += -1. / 3. * np.log10(densstar)
+        listdcyc = retr_listdcycboxsperi(listperi, minmdcyc, deltlogtdcyc, densstar)
         
         listduratrantotl = []
         for k in indxperi:
-            minmdcyclogt = max(np.log10(minmdcyc), maxmdcyclogt[k] - 3. * deltlogtdcyc)
-            if maxmdcyclogt[k] >= minmdcyclogt:
-                listdcyc[k] = np.logspace(minmdcyclogt, maxmdcyclogt[k], 2 + int((maxmdcyclogt[k] - minmdcyclogt) / deltlogtdcyc))
-                listduratrantotl.append(listdcyc[k] * listperi[k])
+            if len(listdcyc[k]) > 0:
+                listduratrantotl.append(listdcyc[k] * listperi[k] * 24.) # [hours]
         listduratrantotl = np.concatenate(listduratrantotl)
         
         if booldiag:
@@ -5582,42 +7282,84 @@ def srch_boxsperi(arry, \
         print('arrysrch[:, 2]')
         summgene(arrysrch[:, 2])
 
-        # Boolean flag to rebin the time-series
-        boolrebn = boolchecrebn and meancade < 0.5 * minmduratrantotl
+        # Boolean flag to rebin the time-series, which is done separately for each instrument in the joint search
+        boolrebn = boolchecrebn and meancade < 0.5 * minmduratrantotl * 3600. and not booljoin
         
-        if boolrebn:
+        if boolrebn and not boolreadspec:
             numblevlrebn = 10
             indxlevlrebn = np.arange(numblevlrebn)
-            # list of transit durations when rebinned data sets will be used
-            listduratrantotllevl = np.linspace(minmduratrantotl, maxmduratrantotl, numblevlrebn)
-            
-            print('factduracade')
-            print(factduracade)
-            for b in indxlevlrebn:
-                print('Transit duration for the level: %g [hour]' % listduratrantotllevl[b])
-                delt = listduratrantotllevl[b] / 24. / factduracade
-                arryrebn = rebn_tser(arrysrch, delt=delt)
-                print('Number of data points in rebinned to a delta time of %g [min]: %d' % (delt * 24. * 60., arryrebn.shape[0]))
-                indx = np.where(np.isfinite(arryrebn[:, 1]))[0]
-                arryrebn = arryrebn[indx, :]
-                print('Number of finite data points in rebinned to a delta time of %g [min]: %d' % (delt * 24. * 60., arryrebn.shape[0]))
-                print('')
-                listarrysrch.append(arryrebn)
+            listduratrantotllevl, listarryrebn = retr_listarryrebnboxsperi(arrysrch, minmduratrantotl, maxmduratrantotl, factduracade, numblevlrebn)
+            listarrysrch += listarryrebn
         else:
             print('Not rebinning the time-series...')
             listduratrantotllevl = []
             #numblevlrebn = 1
             indxlevlrebn = np.arange(1)
-
-        listepoc = [[[] for l in range(len(listdcyc[k]))] for k in indxperi]
-        numbtria = np.zeros(numbperi, dtype=int)
-        for k in indxperi:
-            if len(listdcyc[k]) > 0:
-                for l in range(len(listdcyc[k])):
-                    diffepoc = max(cade / 24., factdeltepocdura * listperi[k] * listdcyc[k][l])
-                    listepoc[k][l] = np.arange(minmtime, minmtime + listperi[k], diffepoc)
-                    numbtria[k] += len(listepoc[k][l])
-                
+        
+        # cadence of the finest time-series searched at the shortest trial duration
+        cadefine = cade
+        
+        if booljoin:
+            # time-series of each instrument at its own rebinning levels, along with the weights of their samples
+            listlistarrysrchinst = []
+            listlistduratrantotllevlinst = []
+            listboolrebninst = []
+            listlistweiginst = []
+            listrflxmediinst = []
+            listcadeinst = np.empty(numbinst)
+            for n in indxinst:
+                difftimeinst = np.diff(listarrysrchinst[n][:, 0])
+                
+                # the time-series of the instrument is rebinned if its own cadence is short compared to the shortest trial duration
+                boolrebninst = boolchecrebn and np.mean(difftimeinst) * 24. * 3600. < 0.5 * minmduratrantotl * 3600.
+                if boolrebninst and not boolreadspec:
+                    listduratrantotllevlinst, listarryrebn = retr_listarryrebnboxsperi(listarrysrchinst[n], minmduratrantotl, maxmduratrantotl, \
+                                                                                                                        factduracade, 10, typeverb=0)
+                    listcadeinst[n] = listduratrantotllevlinst[0] / factduracade * 3600. # [seconds]
+                else:
+                    boolrebninst = False
+                    listduratrantotllevlinst = []
+                    listarryrebn = []
+                    listcadeinst[n] = np.amin(difftimeinst) * 24. * 3600. # [seconds]
+                
+                if listweiginst is None:
+                    # inverse variance of the relative flux from the uncertainties or, if these are not available, from the point-to-point scatter
+                    stdvrflx = listarrysrchinst[n][:, 2]
+                    stdvrflx = stdvrflx[np.isfinite(stdvrflx) & (stdvrflx > 0)]
+                    if stdvrflx.size > 0:
+                        stdvrflx = np.median(stdvrflx)
+                    else:
+                        stdvrflx = np.std(np.diff(listarrysrchinst[n][:, 1])) / np.sqrt(2.)
+                    weig = 1. / stdvrflx**2
+                else:
+                    weig = listweiginst[n]
+                
+                listlistarrysrchinst.append([listarrysrchinst[n]] + listarryrebn)
+                listlistduratrantotllevlinst.append(listduratrantotllevlinst)
+                listboolrebninst.append(boolrebninst)
+                listlistweiginst.append(retr_listweigboxsperi(listlistarrysrchinst[n], listduratrantotllevlinst, factduracade, weig))
+                listrflxmediinst.append(np.median(listarrysrchinst[n][:, 1]))
+                
+                print('Instrument %d: %d samples with a cadence of %g [seconds], searched at %d rebinning levels with a weight of %g...' % \
+                                                        (n, listarrysrchinst[n].shape[0], np.amin(difftimeinst) * 24. * 3600., len(listarryrebn), weig))
+            
+            # the trial epochs are spaced by the cadence of the finest time-series among the instruments at their own rebinning levels
+            cadefine = np.amin(listcadeinst)
+
+        if boolcoarfine:
+            # the coarse pass searches a coarser frequency grid, where each trial duration is folded at its matching rebinning level 
+            # and the epoch step is set by the trial duration as in the single pass
+            if factosamcoar is None:
+                factosamcoar = factosam / 4.
+            listperi = 1. / retr_listfreqboxsperi(minmfreq, maxmfreq, factosamcoar, typegridfreq, maxmtime - minmtime, \
+                                                                                    factosamdura * factosamcoar / factosam, densstar)
+            numbperi = listperi.size
+            indxperi = np.arange(numbperi)
+            listdcyc = retr_listdcycboxsperi(listperi, minmdcyc, deltlogtdcyc, densstar)
+            print('Coarse pass over %d trial periods...' % numbperi)
+        
+        listdiffepoc, listnumbepoc, numbtria = retr_listepocboxsperi(listperi, listdcyc, cadefine / 3600. / 24., factdeltepocdura)
+        
         dflx = arrysrch[:, 1] - 1.
         stdvdflx = arrysrch[:, 2]
         varidflx = stdvdflx**2
@@ -5626,6 +7368,87 @@ def srch_boxsperi(arry, \
         print('Number of trial computations for the smallest period: %d...' % numbtria[-1])
         print('Number of trial computations for the largest period: %d...' % numbtria[0])
         print('Total number of trial computations: %d...' % np.sum(numbtria))
+        
+        # number of trial computations in the fine passes
+        numbtriafinetotl = 0
+
+        # median relative flux, which replaces the in-transit samples of each detection
+        rflxmedi = np.median(arrysrch[:, 1])
+        
+        # flux changes of the samples at each rebinning level since the previous iteration
+        listarrydelt = [np.empty((0, 2)) for b in range(len(listarrysrch))]
+        
+        boolincr = boolincr and (typecalc == 'native' or typecalc == 'numba') and not boolreadspec and not booljoin
+        if boolincr:
+            # cache of the cumulative phase histograms of all trial periods and rebinning levels
+            indxcumsperilevl, numbcums = retr_indxcumsboxsperi(listperi, listdcyc, listduratrantotllevl, boolrebn, len(listarrysrch), numbbinsphasdcyc)
+            print('Caching the phase histograms of the trial periods in %.3g MB...' % (2e-6 * numbcums * 8.))
+            cumsnumbconc = np.zeros(numbcums)
+            cumsdflxconc = np.zeros(numbcums)
+        else:
+            indxcumsperilevl = np.zeros((numbperi, 0), dtype=int)
+            cumsnumbconc = np.zeros(0)
+            cumsdflxconc = np.zeros(0)
+        # Boolean flag indicating whether the cached histograms of each trial period are up to date before the flux changes
+        boolcumsperi = np.zeros(numbperi, dtype=bool)
+        
+        if boolpool:
+            
+            import multiprocessing
+
+            if numbproc is None:
+                #numbproc = multiprocessing.cpu_count() - 1
+                numbproc = max(1, int(0.8 * multiprocessing.cpu_count()))
+            
+            # place the inputs in shared memory once per search
+            dictarryshrd = retr_dictarryboxsperi([listarrysrch], [minmtime], [listduratrantotllevl], [boolrebn], [0], \
+                                                                                                    [listperi], [listdcyc], [listdiffepoc], [listnumbepoc])
+            if boolincr:
+                dictarryshrd['cumsnumbconc'] = cumsnumbconc
+                dictarryshrd['cumsdflxconc'] = cumsdflxconc
+                dictarryshrd['indxcumsperilevl'] = indxcumsperilevl
+                dictarryshrd['boolcumsperi'] = boolcumsperi
+                dictarryshrd['arrydeltconc'] = np.zeros((dictarryshrd['arrytserconc'].shape[0], 2))
+                dictarryshrd['indxdeltlevl'] = np.zeros(len(listarrysrch) + 1, dtype=int)
+            listobjtshrd, dictdescshrd, dictarryshrd = setp_shrdboxsperi(dictarryshrd)
+            if boolincr:
+                # the cache is updated by the worker processes
+                cumsnumbconc = dictarryshrd['cumsnumbconc']
+                cumsdflxconc = dictarryshrd['cumsdflxconc']
+                boolcumsperi = dictarryshrd['boolcumsperi']
+            
+            # generate the worker processes once per search
+            print('Generating %d processes...' % numbproc)
+            objtpool = retr_contproc().Pool(numbproc, initializer=init_workboxsperi, initargs=(dictdescshrd,))
+            numbproc = objtpool._processes
+            indxproc = np.arange(numbproc)
+
+            # time spent by each process and the total time spent in the pool
+            dicttimeproc = dict()
+            dictnumbchunproc = dict()
+            timepool = 0.
+
+        if typecalc in dictbackboxsperi and not boolreadspec:
+            # cut the period grid into chunks of similar cost, which are handed out to the processes as they become idle during multiprocessing 
+            # and after each of which the outputs can be checkpointed
+            if boolpool:
+                numbchun = numbchunproc * numbproc
+            else:
+                numbchun = numbchunproc
+            if booljoin:
+                costperi = np.copy(numbtria)
+                for n in indxinst:
+                    costperi += retr_costboxsperi(listperi, listdcyc, numbtria, listlistarrysrchinst[n], listlistduratrantotllevlinst[n], \
+                                                                                                                            listboolrebninst[n]) - numbtria
+            else:
+                costperi = retr_costboxsperi(listperi, listdcyc, numbtria, listarrysrch, listduratrantotllevl, boolrebn)
+            listindxperichun = retr_chunboxsperi(costperi, numbchun)
+            numbchun = len(listindxperichun)
+            indxchun = np.arange(numbchun)
+            print('Cutting %d trial periods into %d chunks of similar cost...' % (numbperi, numbchun))
+        
+        # paths to the checkpoint files written during the search
+        listpathchkp = []
 
         while True:
             
@@ -5634,25 +7457,34 @@ def srch_boxsperi(arry, \
             
             # mask out the detected transit
             if j > 0:
-                ## remove previously detected periodic box from the rebinned data
-                pericomp = [dictboxsperioutp['peri'][j]]
-                epocmtracomp = [dictboxsperioutp['epoc'][j]]
-                radicomp = [dictfact['rsre'] * np.sqrt(dictboxsperioutp['depttrancomp'][j] * 1e-3)]
-                cosicomp = [0]
-                rsmacomp = [nicomedia.retr_rsmacomp(dictboxsperioutp['pericomp'][j], dictboxsperioutp['duracomp'][j], cosicomp[0])]
-                    
-                for b in indxlevlrebn:
-                    ## evaluate model at all resolutions
-                    dictoutp = eval_modl(listarrysrch[b][:, 0], 'PlanetarySystem', pericomp=pericomp, epocmtracomp=epocmtracomp, \
-                                                                                        rsmacomp=rsmacomp, cosicomp=cosicomp, rratcomp=rratcomp)
-                    ## subtract it from data
-                    listarrysrch[b][:, 1] -= (dictoutp['rflx'][b] - 1.)
-                
-                    if (dictboxsperiinte['rflx'][b] == 1.).all():
-                        raise Exception('')
+                ## replace the in-transit samples of the previously detected periodic box by the median relative flux at all resolutions
+                listarrydelt = []
+                for b in range(len(listarrysrch)):
+                    indxtimetran = retr_indxtimetran(listarrysrch[b][:, 0], dictboxsperioutp['epoc'][j-1], dictboxsperioutp['peri'][j-1], \
+                                                                                                            dictboxsperioutp['dura'][j-1]).astype(int)
+                    arrydelt = np.empty((indxtimetran.size, 2))
+                    arrydelt[:, 0] = listarrysrch[b][indxtimetran, 0]
+                    arrydelt[:, 1] = rflxmedi - listarrysrch[b][indxtimetran, 1]
+                    listarrysrch[b][indxtimetran, 1] = rflxmedi
+                    listarrydelt.append(arrydelt)
+                
+                if booljoin:
+                    ## replace the in-transit samples by the median relative flux of each instrument at all of its resolutions
+                    for n in indxinst:
+                        for arrysrchinst in listlistarrysrchinst[n]:
+                            indxtimetran = retr_indxtimetran(arrysrchinst[:, 0], dictboxsperioutp['epoc'][j-1], dictboxsperioutp['peri'][j-1], \
+                                                                                                            dictboxsperioutp['dura'][j-1]).astype(int)
+                            arrysrchinst[indxtimetran, 1] = listrflxmediinst[n]
+                
+                if boolpool:
+                    ## update the time-series and the flux changes in shared memory
+                    dictarryshrd['arrytserconc'][:, 1] = np.concatenate(listarrysrch, 0)[:, 1]
+                    if boolincr:
+                        dictarryshrd['indxdeltlevl'][:] = np.concatenate((np.array([0]), np.cumsum([arrydelt.shape[0] for arrydelt in listarrydelt])))
+                        dictarryshrd['arrydeltconc'][:dictarryshrd['indxdeltlevl'][-1], :] = np.concatenate(listarrydelt, 0)
 
             if typecalc == 'TLS':
-                objtmodltlsq = transitleastsquares.transitleastsquares(arrysrch[:, 0], lcurboxsperimeta)
+                objtmodltlsq = transitleastsquares.transitleastsquares(arrysrch[:, 0], arrysrch[:, 1], arrysrch[:, 2])
                 objtresu = objtmodltlsq.power(\
                                               # temp
                                               #u=ab, \
@@ -5666,11 +7498,15 @@ def srch_boxsperi(arry, \
                 
                 dictboxsperioutp['peri'].append(objtresu.period)
                 dictboxsperioutp['epoc'].append(objtresu.T0)
-                dictboxsperioutp['dura'].append(objtresu.duration)
-                dictboxsperioutp['ampl'].append(-objtresu.depth * 1e3)
+                dictboxsperioutp['dura'].append(objtresu.duration * 24.) # [hours]
+                dictboxsperioutp['ampl'].append((1. - objtresu.depth) * 1e3) # [ppt]
                 dictboxsperioutp['s2nr'].append(objtresu.SDE)
                 dictboxsperioutp['prfp'].append(objtresu.FAP)
                 
+                s2nr = objtresu.SDE
+                lists2nr = objtresu.power
+                indxperimpow = np.argmax(lists2nr)
+                
                 if objtresu.SDE < thrss2nr:
                     break
                 
@@ -5684,72 +7520,184 @@ def srch_boxsperi(arry, \
                     dictboxsperiinte['phasdata'] = objtresu.folded_phase
                     dictboxsperiinte['rflxpserdata'] = objtresu.folded_y
 
-            elif typecalc == 'astropy':
-
-                model = astropy.timeseries.BoxLeastSquares(arrysrch[:, 0] * astropy.units.day, lcurboxsperimeta)#, dy=)
-                periodogram = model.autopower(0.2)
-                plt.plot(periodogram.period, periodogram.power)
-                model = BoxLeastSquares(t * u.day, y, dy=0.01)
-                periodogram = model.autopower(0.2, objective="snr")
-
-
-            elif typecalc == 'native':
+            else:
                 
-                if boolprocmult:
+                if boolreadspec:
+                    # spectrum of this iteration computed by an earlier search with the same inputs
+                    listperispec = listdictspec[j]['listperi']
+                    listampl = listdictspec[j]['listampl']
+                    listepocspec = listdictspec[j]['listepoc']
+                    listduraspec = listdictspec[j]['listdura']
+                    indxsegm = listdictspec[j]['indxsegm']
+                    deltfreqkern = listdictspec[j]['deltfreqkern']
+                else:
+                    # outputs of the trial periods completed by an earlier run with the same inputs
+                    if boolchkp and pathdata is not None:
+                        if booljoin:
+                            # combine the hashes of the instruments and their weights
+                            objthash = hashlib.sha1()
+                            for n in indxinst:
+                                objthash.update(retr_hashboxsperi(listlistarrysrchinst[n], listperi, listdcyc, listdiffepoc, listnumbepoc, minmtime, \
+                                                                    listlistduratrantotllevlinst[n], listboolrebninst[n], numbbinsphasdcyc, typecalc='join').encode())
+                                for weig in listlistweiginst[n]:
+                                    objthash.update(np.asarray(weig, dtype=float).tobytes())
+                            strghash = objthash.hexdigest()
+                        else:
+                            strghash = retr_hashboxsperi(listarrysrch, listperi, listdcyc, listdiffepoc, listnumbepoc, minmtime, listduratrantotllevl, \
+                                                                                                        boolrebn, numbbinsphasdcyc, typecalc=typecalc)
+                        pathchkp = pathdata + 'boxsperi_chkp_%s.npz' % strghash
+                        listpathchkp.append(pathchkp)
+                    else:
+                        pathchkp = None
+                    boolperidone, listrflxitra, listdcycmaxm, listepocmaxm = read_chkpboxsperi(pathchkp, numbperi)
                     
-                    import multiprocessing
-
-                    if numbproc is None:
-                        #numbproc = multiprocessing.cpu_count() - 1
-                        numbproc = int(0.8 * multiprocessing.cpu_count())
+                    # the histograms of the periods read from the checkpoint have not been updated in this iteration
+                    boolcumsperi[boolperidone] = False
+                
+                    # chunks that remain to be searched
+                    indxchunrema = [i for i in indxchun if not boolperidone[listindxperichun[i]].all()]
+                    if len(indxchunrema) < numbchun:
+                        print('%d out of %d chunks have already been searched.' % (numbchun - len(indxchunrema), numbchun))
+                
+                    if booljoin:
+                        print('Searching the time-series of %d instruments jointly...' % numbinst)
+                        objtiter = ((i, srch_boxsperi_work_join(listindxperichun, listperi, listlistarrysrchinst, listlistweiginst, listdcyc, listdiffepoc, \
+                                                listnumbepoc, minmtime, listlistduratrantotllevlinst, listboolrebninst, numbbinsphasdcyc, i)) for i in indxchunrema)
+                    elif typecalc == 'numba':
                     
-                    print('Generating %d processes...' % numbproc)
+                        if numbproc is not None:
+                            set_num_threads(numbproc)
                     
-                    objtpool = multiprocessing.Pool(numbproc)
-                    numbproc = objtpool._processes
-                    indxproc = np.arange(numbproc)
-
-                    listperiproc = [[] for i in indxproc]
+                        print('Using the compiled periodic box search with %d threads...' % get_num_threads())
+                        timeconc, rflxconc, indxtimelevl, dcycconc, indxdcycperi, diffepocconc, numbepocconc = \
+                                                                                retr_flatboxsperi(listarrysrch, listdcyc, listdiffepoc, listnumbepoc)
+                        arrydeltconc = np.concatenate(listarrydelt, 0)
+                        indxdeltlevl = np.concatenate((np.array([0]), np.cumsum([arrydelt.shape[0] for arrydelt in listarrydelt])))
+                        objtiter = ((i, srch_boxsperi_work_numb(listperi[listindxperichun[i][0]:listindxperichun[i][-1]+1], timeconc, rflxconc, indxtimelevl, \
+                                                                dcycconc, indxdcycperi[listindxperichun[i][0]:listindxperichun[i][-1]+2], diffepocconc, numbepocconc, minmtime, \
+                                                                np.asarray(listduratrantotllevl, dtype=float), boolrebn, numbbinsphasdcyc, \
+                                                                boolincr, cumsnumbconc, cumsdflxconc, indxcumsperilevl[listindxperichun[i][0]:listindxperichun[i][-1]+1], \
+                                                                boolcumsperi[listindxperichun[i][0]:listindxperichun[i][-1]+1], \
+                                                                np.ascontiguousarray(arrydeltconc[:, 0]), np.ascontiguousarray(arrydeltconc[:, 1]), indxdeltlevl)) \
+                                                                                                                                                for i in indxchunrema)
+                    elif boolpool:
+                        objtiter = (outp[1:] for outp in objtpool.imap_unordered(partial(srch_boxsperi_work_shrd, numbbinsphasdcyc), \
+                                                                                            [(0, i, listindxperichun[i]) for i in indxchunrema]))
+                    elif typecalc != 'native':
+                        print('Using the %s backend for the periodic box search...' % typecalc)
+                        objtiter = ((i, dictbackboxsperi[typecalc](listindxperichun, listperi, listarrysrch, listdcyc, listdiffepoc, listnumbepoc, minmtime, \
+                                                                                    listduratrantotllevl, boolrebn, numbbinsphasdcyc, i)) for i in indxchunrema)
+                    else:
+                        print('Using a single process for the periodic box search...')
+                        if boolincr:
+                            dictincr = dict()
+                            dictincr['cumsnumbconc'] = cumsnumbconc
+                            dictincr['cumsdflxconc'] = cumsdflxconc
+                            dictincr['indxcumsperilevl'] = indxcumsperilevl
+                            dictincr['boolcumsperi'] = boolcumsperi
+                            dictincr['listarrydelt'] = listarrydelt
+                        else:
+                            dictincr = None
+                        objtiter = ((i, srch_boxsperi_work(listindxperichun, listperi, listarrysrch, listdcyc, listdiffepoc, listnumbepoc, minmtime, \
+                                                        listduratrantotllevl, boolrebn, numbbinsphasdcyc, i, boolprog=False, dictincr=dictincr)) for i in indxchunrema)
+                
+                    timeinitpool = modutime.time()
+                    timechkplast = timeinitpool
+                    for outp in tqdm(objtiter, total=len(indxchunrema)):
                     
-                    binsperiproc = tdpy.icdf_powr(np.linspace(0., 1., numbproc + 1)[1:-1], np.amin(listperi), np.amax(listperi), 1.97)
-                    binsperiproc = np.concatenate((np.array([-np.inf]), binsperiproc, np.array([np.inf])))
-                    indxprocperi = np.digitize(listperi, binsperiproc, right=False) - 1
-                    for i in indxproc:
-                        indx = np.where(indxprocperi == i)[0]
-                        listperiproc[i] = listperi[indx]
-                    data = objtpool.map(partial(srch_boxsperi_work, listperiproc, listarrysrch, listdcyc, listepoc, listduratrantotllevl, boolrebn), indxproc)
-                    listrflxitra = np.concatenate([data[k][0] for k in indxproc])
-                    listamplmaxm = np.concatenate([data[k][1] for k in indxproc])
-                    listdcycmaxm = np.concatenate([data[k][2] for k in indxproc])
-                    listepocmaxm = np.concatenate([data[k][3] for k in indxproc])
-                else:
-                    print('Using a single process for the periodic box search...')
-                    listrflxitra, listdcycmaxm, listepocmaxm = srch_boxsperi_work([listperi], listarrysrch, listdcyc, listepoc, listduratrantotllevl, boolrebn, pathvisu, 0)
+                        # place the outputs of the chunk back onto the period grid
+                        i, listoutp = outp[0], outp[1]
+                        listrflxitra[listindxperichun[i]] = listoutp[0]
+                        listdcycmaxm[listindxperichun[i]] = listoutp[1]
+                        listepocmaxm[listindxperichun[i]] = listoutp[2]
+                        boolperidone[listindxperichun[i]] = True
+                    
+                        if boolpool:
+                            indxproc, timeproc = outp[2], outp[3]
+                            if indxproc not in dicttimeproc:
+                                dicttimeproc[indxproc] = 0.
+                                dictnumbchunproc[indxproc] = 0
+                            dicttimeproc[indxproc] += timeproc
+                            dictnumbchunproc[indxproc] += 1
+                    
+                        if pathchkp is not None and modutime.time() - timechkplast > timechkp:
+                            writ_chkpboxsperi(pathchkp, boolperidone, listrflxitra, listdcycmaxm, listepocmaxm)
+                            timechkplast = modutime.time()
                 
-                if booldiag:
-                    if (~np.isfinite(listrflxitra)).all():
-                        print('')
-                        print('')
-                        print('')
-                        print('listrflxitra')
-                        summgene(listrflxitra)
-                        print('listrflxitra')
-                        summgene(listrflxitra)
-                        print('listarrysrch[0][:, 1]')
-                        summgene(listarrysrch[0][:, 1])
-                        raise Exception('')
-
-                listampl = (np.median(listarrysrch[0][:, 1]) - listrflxitra) * 1e3 # [ppt])
+                    if boolpool:
+                        timepool += modutime.time() - timeinitpool
+                
+                    if pathchkp is not None:
+                        writ_chkpboxsperi(pathchkp, boolperidone, listrflxitra, listdcycmaxm, listepocmaxm)
                 
-                listsgnl = listampl - scipy.ndimage.median_filter(listampl, size=sizekern)
+                    if booldiag:
+                        if (~np.isfinite(listrflxitra)).all():
+                            print('')
+                            print('')
+                            print('')
+                            print('listrflxitra')
+                            summgene(listrflxitra)
+                            print('listrflxitra')
+                            summgene(listrflxitra)
+                            print('listarrysrch[0][:, 1]')
+                            summgene(listarrysrch[0][:, 1])
+                            raise Exception('')
+
+                    listampl = (np.median(listarrysrch[0][:, 1]) - listrflxitra) * 1e3 # [ppt])
+                    
+                    # index of the segment of contiguous trial periods each entry of the spectrum belongs to
+                    indxsegm = np.zeros(listperi.size, dtype=int)
+                    listperispec = listperi
+                    
+                    if boolcoarfine:
+                        lists2nr = retr_peakboxsperi(listampl, indxsegm, sizekern, listperi, deltfreqkern)[2]
+                        
+                        # fine pass over the full-resolution time-series in windows around the highest peaks of the coarse spectrum
+                        listperifineseg = retr_perifineboxsperi(lists2nr, 1. / listperi, numbpeakfine, listfreq, sizekern, deltfreqkern)
+                        listperifine = np.concatenate(listperifineseg)
+                        listdcycfine = retr_listdcycboxsperi(listperifine, minmdcyc, deltlogtdcyc, densstar)
+                        listdiffepocfine, listnumbepocfine, numbtriafine = retr_listepocboxsperi(listperifine, listdcycfine, cadefine / 3600. / 24., factdeltepocdura)
+                        numbtriafinetotl += np.sum(numbtriafine)
+                        print('Fine pass over %d trial periods around the %d highest peaks of the coarse spectrum...' % (listperifine.size, numbpeakfine))
+                        
+                        if booljoin:
+                            listrflxitrafine, listdcycmaxmfine, listepocmaxmfine = srch_boxsperi_work_join([np.arange(listperifine.size)], listperifine, \
+                                                        listlistarrysrchinst, listlistweiginst, listdcycfine, listdiffepocfine, listnumbepocfine, minmtime, \
+                                                        listlistduratrantotllevlinst, listboolrebninst, numbbinsphasdcyc, 0)
+                        else:
+                            listrflxitrafine, listdcycmaxmfine, listepocmaxmfine = dictbackboxsperi[typecalc]([np.arange(listperifine.size)], listperifine, listarrysrch, \
+                                                        listdcycfine, listdiffepocfine, listnumbepocfine, minmtime, listduratrantotllevl, boolrebn, numbbinsphasdcyc, 0)
+                        listamplfine = (np.median(listarrysrch[0][:, 1]) - listrflxitrafine) * 1e3 # [ppt]
+                        
+                        # the coarse spectrum is not searched for the peak and each segment of the fine spectrum is normalized by its own baseline and noise
+                        indxsegm = np.concatenate((np.full(listperi.size, -1), np.repeat(np.arange(len(listperifineseg)), [perifineseg.size for perifineseg in listperifineseg])))
+                        
+                        # merge the coarse and fine spectra in the order of increasing frequency
+                        indxsort = np.argsort(np.concatenate((1. / listperi, 1. / listperifine)), kind='stable')
+                        indxsegm = indxsegm[indxsort]
+                        listperispec = np.concatenate((listperi, listperifine))[indxsort]
+                        listampl = np.concatenate((listampl, listamplfine))[indxsort]
+                        listdcycmaxm = np.concatenate((listdcycmaxm, listdcycmaxmfine))[indxsort]
+                        listepocmaxm = np.concatenate((listepocmaxm, listepocmaxmfine))[indxsort]
+                    
+                    listduraspec = 24. * listdcycmaxm * listperispec # [hours]
+                    listepocspec = listepocmaxm
                 
-                liststdvsgnl = retr_stdvwind(listsgnl, sizekern, boolcuttpeak=True)
                 
-                lists2nr = np.zeros_like(listsgnl)
-                indxperigood = np.where(liststdvsgnl > 0)
-                lists2nr[indxperigood] = listsgnl[indxperigood] / liststdvsgnl[indxperigood]
+                listsgnl, liststdvsgnl, lists2nr, indxperimpow = retr_peakboxsperi(listampl, indxsegm, sizekern, listperispec, deltfreqkern)
                 
-                indxperimpow = np.nanargmax(lists2nr)
+                dictspec = dict()
+                dictspec['listperi'] = listperispec
+                dictspec['listampl'] = listampl
+                dictspec['listsgnl'] = listsgnl
+                dictspec['liststdvsgnl'] = liststdvsgnl
+                dictspec['lists2nr'] = lists2nr
+                dictspec['listepoc'] = listepocspec
+                dictspec['listdura'] = listduraspec
+                dictspec['indxsegm'] = indxsegm
+                dictspec['indxperimpow'] = indxperimpow
+                dictspec['deltfreqkern'] = deltfreqkern
+                listdictspecwrit.append(dictspec)
                 
                 s2nr = lists2nr[indxperimpow]
                 
@@ -5786,13 +7734,13 @@ def srch_boxsperi(arry, \
                     print('Warning! Amplitude at maximum SNR period is negative! Double check what is going on!')
 
                 dictboxsperioutp['s2nr'].append(s2nr)
-                dictboxsperioutp['peri'].append(listperi[indxperimpow])
-                dictboxsperioutp['dura'].append(24. * listdcycmaxm[indxperimpow] * listperi[indxperimpow]) # [hours]
-                dictboxsperioutp['epoc'].append(listepocmaxm[indxperimpow])
+                dictboxsperioutp['peri'].append(listperispec[indxperimpow])
+                dictboxsperioutp['dura'].append(listduraspec[indxperimpow]) # [hours]
+                dictboxsperioutp['epoc'].append(listepocspec[indxperimpow])
                 dictboxsperioutp['ampl'].append(listampl[indxperimpow])
                 
                 # best-fit orbit
-                dictboxsperiinte['listperi'] = listperi
+                dictboxsperiinte['listperi'] = listperispec
                 
                 print('temp: assuming power is SNR')
                 dictboxsperiinte['listampl'] = listampl
@@ -5950,21 +7898,431 @@ def srch_boxsperi(arry, \
             if s2nr < thrss2nr or indxperimpow == lists2nr.size - 1:
                 break
         
+        if boolpool:
+            objtpool.close()
+            objtpool.join()
+            
+            if typeverb > 0:
+                print('Utilization of the processes over %.3g seconds in the pool:' % timepool)
+                for indxproc in sorted(dicttimeproc.keys()):
+                    print('Process %d: %.3g percent busy, %d chunks' % (indxproc, 100. * dicttimeproc[indxproc] / timepool, dictnumbchunproc[indxproc]))
+            
+            # release the shared memory
+            del dictarryshrd
+            for objtshrd in listobjtshrd:
+                objtshrd.close()
+                objtshrd.unlink()
+
         # make the BLS features arrays
         for name in dictboxsperioutp.keys():
             dictboxsperioutp[name] = np.array(dictboxsperioutp[name])
         
-        pd.DataFrame.from_dict(dictboxsperioutp).to_csv(pathsave, index=False)
+        if pathdata is not None:
+            pd.DataFrame.from_dict(dictboxsperioutp).to_csv(pathsave, index=False)
+            
+            if len(listdictspecwrit) > 0:
+                writ_specboxsperi(pathspec, strghashspec, listdictspecwrit, sizekern, thrss2nr, maxmnumbboxsperi)
+            
+            # the checkpoints are no longer needed once the search is complete
+            for pathchkp in listpathchkp:
+                if os.path.exists(pathchkp):
+                    os.remove(pathchkp)
                 
         timefinl = modutime.time()
         timetotl = timefinl - timeinit
-        timeredu = timetotl / numbtime / np.sum(numbtria)
+        timeredu = timetotl / numbtime / (np.sum(numbtria) + numbtriafinetotl)
         
         print('srch_boxsperi() took %.3g seconds in total and %g ns per observation and trial.' % (timetotl, timeredu * 1e9))
 
     return dictboxsperioutp
 
 
+def srch_boxsperi_mult(listarry, \
+              
+              # Boolean flag to search for positive boxes
+              boolsrchposi=False, \
+
+              # minimum period
+              minmperi=None, \
+
+              # maximum period
+              maxmperi=None, \
+
+              # oversampling factor (wrt to transit duration) when rebinning data to decrease the time resolution
+              factduracade=2., \
+
+              # factor by which to oversample the frequency grid
+              factosam=10., \
+              
+              # type of the frequency grid
+              typegridfreq='unif', \
+              
+              # number of trial frequencies per phase drift of one expected duty cycle across the baseline when typegridfreq is 'ofir'
+              factosamdura=0.5, \
+              
+              # differential logarithm of duty cycle
+              deltlogtdcyc=0.1, \
+              
+              # density of the stars, either the same for all targets or a list with one value per target
+              densstar=None, \
+              
+              # size of the kernel that will be used to median-detrend the signal spectrum and estimate noise inside a window
+              sizekern = 51, \
+
+              # epoc steps divided by trial duration
+              factdeltepocdura=0.5, \
+              
+              # number of phase bins spanned by the shortest trial duty cycle when folding into a phase histogram
+              numbbinsphasdcyc=10, \
+
+              # number of processes
+              numbproc=None, \
+              
+              # Boolean flag to enable multiprocessing
+              boolprocmult=True, \
+              
+              # number of period chunks per process to be handed out to idle processes during multiprocessing
+              numbchunproc=20, \
+              
+              # Boolean flag to rebin the time-series
+              boolchecrebn=True, \
+
+              # type of verbosity
+              ## -1: absolutely no text
+              ##  0: no text output except critical warnings
+              ##  1: minimal description of the execution
+              ##  2: detailed description of the execution
+              typeverb=1, \
+              
+             ):
+    '''
+    Search for periodic boxes in the time-series data of many targets at once. The grid of trial periods, duty cycles and epochs is shared among 
+    the targets with the same frequency range, cadence and stellar density, and the chunks of trial periods of all targets are run on a single pool of processes. 
+    Returns a list of dictionaries with the same contents as those returned by srch_boxsperi with maxmnumbboxsperi=1, one for each target, 
+    i.e., only the highest peak of the spectrum of each target is returned and no additional boxes are searched for after masking it.
+    '''
+    
+    timeinit = modutime.time()
+
+    numbtarg = len(listarry)
+    indxtarg = np.arange(numbtarg)
+    
+    if densstar is None or np.isscalar(densstar):
+        listdensstar = [densstar for t in indxtarg]
+    else:
+        listdensstar = densstar
+    
+    if deltlogtdcyc is None:
+        deltlogtdcyc = np.log10(2.)
+    
+    # grids of trial periods, duty cycles and epochs, which are shared among the targets
+    dictindxgrid = dict()
+    listlistperi = []
+    listlistdcyc = []
+    listlistdiffepoc = []
+    listlistnumbepoc = []
+    listnumbtria = []
+    
+    # inputs of the search of each target
+    listlistarrysrch = []
+    listminmtime = []
+    listlistduratrantotllevl = []
+    listboolrebn = []
+    listindxgrid = []
+    listcostperi = []
+    listdeltfreqkern = []
+    for t in indxtarg:
+        
+        arrysrch = np.copy(listarry[t])
+        if boolsrchposi:
+            arrysrch[:, 1] = 2. - arrysrch[:, 1]
+        
+        numbtime = arrysrch[:, 0].size
+        minmdcyc = 2. / numbtime
+        minmtime = np.amin(arrysrch[:, 0])
+        maxmtime = np.amax(arrysrch[:, 0])
+        difftime = arrysrch[1:, 0] - arrysrch[:-1, 0]
+        
+        if np.amin(difftime) < 0:
+            raise Exception('The time array of target %d is not sorted.' % t)
+        
+        if maxmperi is None:
+            minmfreq = 1. / (maxmtime - minmtime)
+        else:
+            minmfreq = 1. / maxmperi
+        if minmperi is None:
+            maxmfreq = 0.5 / np.amin(difftime)
+        else:
+            maxmfreq = 1. / minmperi
+        
+        # cadence, rounded to a millisecond so that targets observed at the same cadence share the grid of trial epochs
+        cade = np.round(np.amin(difftime) * 24. * 3600., 3) # [seconds]
+        
+        # the minimum duty cycle only changes the grid if it exceeds the shortest trial duty cycle at the longest period
+        maxmdcyclogt = -2. / 3. * np.log10(1. / minmfreq) - 1. + deltlogtdcyc
+        if listdensstar[t] is not None:
+            maxmdcyclogt += -1. / 3. * np.log10(listdensstar[t])
+        if np.log10(minmdcyc) > maxmdcyclogt - 3. * deltlogtdcyc:
+            minmdcycgrid = minmdcyc
+        else:
+            minmdcycgrid = None
+        
+        if typegridfreq == 'ofir':
+            delttime = maxmtime - minmtime
+        else:
+            delttime = None
+        
+        strggrid = repr([minmfreq, maxmfreq, delttime, minmdcycgrid, cade, listdensstar[t]])
+        
+        # frequency step of the kernel that detrends the spectrum, as in srch_boxsperi
+        if typegridfreq == 'unif':
+            listdeltfreqkern.append(None)
+        else:
+            listdeltfreqkern.append(minmfreq / factosam)
+        if not strggrid in dictindxgrid:
+            dictindxgrid[strggrid] = len(listlistperi)
+            listperi = 1. / retr_listfreqboxsperi(minmfreq, maxmfreq, factosam, typegridfreq, maxmtime - minmtime, factosamdura, listdensstar[t])
+            listdcyc = retr_listdcycboxsperi(listperi, minmdcyc, deltlogtdcyc, listdensstar[t])
+            listdiffepoc, listnumbepoc, numbtria = retr_listepocboxsperi(listperi, listdcyc, cade / 3600. / 24., factdeltepocdura)
+            listlistperi.append(listperi)
+            listlistdcyc.append(listdcyc)
+            listlistdiffepoc.append(listdiffepoc)
+            listlistnumbepoc.append(listnumbepoc)
+            listnumbtria.append(numbtria)
+        indxgrid = dictindxgrid[strggrid]
+        listperi = listlistperi[indxgrid]
+        listdcyc = listlistdcyc[indxgrid]
+        
+        listduratrantotl = np.concatenate([listdcyc[k] * listperi[k] * 24. for k in range(listperi.size) if len(listdcyc[k]) > 0]) # [hours]
+        minmduratrantotl = np.amin(listduratrantotl)
+        maxmduratrantotl = np.amax(listduratrantotl)
+        
+        meancade = np.mean(difftime) * 24. * 3600. # [seconds]
+        
+        listarrysrch = [arrysrch]
+        boolrebn = boolchecrebn and meancade < 0.5 * minmduratrantotl * 3600.
+        if boolrebn:
+            listduratrantotllevl, listarryrebn = retr_listarryrebnboxsperi(arrysrch, minmduratrantotl, maxmduratrantotl, factduracade, 10, typeverb=typeverb-1)
+            listarrysrch += listarryrebn
+        else:
+            listduratrantotllevl = []
+        
+        listlistarrysrch.append(listarrysrch)
+        listminmtime.append(minmtime)
+        listlistduratrantotllevl.append(listduratrantotllevl)
+        listboolrebn.append(boolrebn)
+        listindxgrid.append(indxgrid)
+        listcostperi.append(retr_costboxsperi(listperi, listdcyc, listnumbtria[indxgrid], listarrysrch, listduratrantotllevl, boolrebn))
+    
+    numbgrid = len(listlistperi)
+    if typeverb > 0:
+        print('Searching for periodic boxes in the time-series data of %d targets using %d grids of trial periods...' % (numbtarg, numbgrid))
+    
+    if boolprocmult:
+        import multiprocessing
+        if numbproc is None:
+            numbproc = max(1, int(0.8 * multiprocessing.cpu_count()))
+        numbchuntotl = numbchunproc * numbproc
+    else:
+        numbchuntotl = numbtarg
+    
+    # cut the period grid of each target into a number of chunks proportional to its cost
+    costtarg = np.array([np.sum(costperi) for costperi in listcostperi], dtype=float)
+    listlistindxperichun = []
+    listtask = []
+    listcosttask = []
+    for t in indxtarg:
+        listindxperichun = retr_chunboxsperi(listcostperi[t], int(np.ceil(numbchuntotl * costtarg[t] / np.sum(costtarg))))
+        listlistindxperichun.append(listindxperichun)
+        for i in range(len(listindxperichun)):
+            listtask.append((t, i, listindxperichun[i]))
+            listcosttask.append(np.sum(listcostperi[t][listindxperichun[i]]))
+    
+    # hand out the most expensive chunks first so that the processes finish at similar times
+    listtask = [listtask[a] for a in np.argsort(listcosttask, kind='stable')[::-1]]
+    
+    listlistrflxitra = [np.full(listlistperi[listindxgrid[t]].size, np.nan) for t in indxtarg]
+    listlistdcycmaxm = [np.zeros(listlistperi[listindxgrid[t]].size) for t in indxtarg]
+    listlistepocmaxm = [np.zeros(listlistperi[listindxgrid[t]].size) for t in indxtarg]
+    
+    if boolprocmult:
+        
+        # place the inputs of all targets in shared memory
+        dictarryshrd = retr_dictarryboxsperi(listlistarrysrch, listminmtime, listlistduratrantotllevl, listboolrebn, listindxgrid, \
+                                                                                            listlistperi, listlistdcyc, listlistdiffepoc, listlistnumbepoc)
+        listobjtshrd, dictdescshrd, dictarryshrd = setp_shrdboxsperi(dictarryshrd)
+        
+        if typeverb > 0:
+            print('Running %d chunks on %d processes...' % (len(listtask), numbproc))
+        objtpool = retr_contproc().Pool(numbproc, initializer=init_workboxsperi, initargs=(dictdescshrd,))
+        objtiter = objtpool.imap_unordered(partial(srch_boxsperi_work_shrd, numbbinsphasdcyc), listtask)
+    else:
+        objtiter = ((t, i, srch_boxsperi_work([indxperi], listlistperi[listindxgrid[t]], listlistarrysrch[t], listlistdcyc[listindxgrid[t]], \
+                            listlistdiffepoc[listindxgrid[t]], listlistnumbepoc[listindxgrid[t]], listminmtime[t], listlistduratrantotllevl[t], \
+                                                                    listboolrebn[t], numbbinsphasdcyc, 0, boolprog=False)) for t, i, indxperi in listtask)
+    
+    for outp in tqdm(objtiter, total=len(listtask), disable=typeverb < 1):
+        t, i, listoutp = outp[0], outp[1], outp[2]
+        listlistrflxitra[t][listlistindxperichun[t][i]] = listoutp[0]
+        listlistdcycmaxm[t][listlistindxperichun[t][i]] = listoutp[1]
+        listlistepocmaxm[t][listlistindxperichun[t][i]] = listoutp[2]
+    
+    if boolprocmult:
+        objtpool.close()
+        objtpool.join()
+        
+        # release the shared memory
+        del dictarryshrd
+        for objtshrd in listobjtshrd:
+            objtshrd.close()
+            objtshrd.unlink()
+    
+    # detect the highest peak in the spectrum of each target
+    listdictboxsperioutp = []
+    for t in indxtarg:
+        listperi = listlistperi[listindxgrid[t]]
+        listampl = (np.median(listlistarrysrch[t][0][:, 1]) - listlistrflxitra[t]) * 1e3 # [ppt]
+        lists2nr, indxperimpow = retr_peakboxsperi(listampl, np.zeros(listperi.size, dtype=int), sizekern, listperi, listdeltfreqkern[t])[2:]
+        
+        dictboxsperioutp = dict()
+        dictboxsperioutp['s2nr'] = np.array([lists2nr[indxperimpow]])
+        dictboxsperioutp['peri'] = np.array([listperi[indxperimpow]])
+        dictboxsperioutp['dura'] = np.array([24. * listlistdcycmaxm[t][indxperimpow] * listperi[indxperimpow]]) # [hours]
+        dictboxsperioutp['epoc'] = np.array([listlistepocmaxm[t][indxperimpow]])
+        dictboxsperioutp['ampl'] = np.array([listampl[indxperimpow]])
+        listdictboxsperioutp.append(dictboxsperioutp)
+    
+    if typeverb > 0:
+        timetotl = modutime.time() - timeinit
+        print('srch_boxsperi_mult() took %.3g seconds in total and %.3g seconds per target.' % (timetotl, timetotl / numbtarg))
+    
+    return listdictboxsperioutp
+
+
+def exec_benchboxsperi( \
+                      
+                      # list of backends of the periodic box search to be benchmarked, which defaults to all registered backends 
+                      # ('TLS' is not registered since it searches over its own period grid)
+                      listtypecalc=None, \
+                      
+                      # number of synthetic time-series with an injected periodic box
+                      numbinje=5, \
+                      
+                      # baseline of the synthetic time-series [days]
+                      timebase=27., \
+                      
+                      # cadence of the synthetic time-series [minutes]
+                      cade=10., \
+                      
+                      # standard deviation of the white noise in the relative flux
+                      stdvrflx=1e-3, \
+                      
+                      # signal-to-noise ratio of the injected boxes over the baseline
+                      s2nrinje=15., \
+                      
+                      # minimum trial period [days]
+                      minmperi=1., \
+                      
+                      # maximum trial period [days], which defaults to the baseline such that, as in srch_boxsperi, 
+                      # the step of the frequency grid is the inverse of the baseline divided by factosam
+                      maxmperi=None, \
+                      
+                      # maximum period of the injected boxes [days], which defaults to a third of the baseline so that at least three boxes are observed
+                      maxmperiinje=None, \
+                      
+                      # factor by which to oversample the frequency grid
+                      factosam=10., \
+                      
+                      # number of phase bins spanned by the shortest trial duty cycle when folding into a phase histogram
+                      numbbinsphasdcyc=10, \
+                      
+                      # maximum fractional period error of a recovered box
+                      tolrperi=1e-2, \
+                      
+                      # seed of the random number generator
+                      seed=0, \
+                     ):
+    '''
+    Benchmark the backends of the periodic box search on identical synthetic time-series with injected periodic boxes and 
+    return, for each backend, the wall time, the time per observation and trial, and the fractional error of the period of the highest peak. 
+    Since the backends choose the box at each trial period by different objectives and return spectra on different scales, 
+    the peak is picked for all backends as the highest S/N of the chosen boxes, i.e., their depth over its uncertainty.
+    '''
+    
+    if listtypecalc is None:
+        listtypecalc = list(dictbackboxsperi.keys())
+    
+    if maxmperi is None:
+        maxmperi = timebase
+    
+    if maxmperiinje is None:
+        maxmperiinje = timebase / 3.
+    
+    objtrand = np.random.default_rng(seed)
+    
+    time = np.arange(0., timebase, cade / 60. / 24.)
+    numbtime = time.size
+    
+    # trial grid shared by all backends
+    listperi = 1. / retr_listfreqboxsperi(1. / maxmperi, 1. / minmperi, factosam, 'unif', timebase, 2., None)
+    numbperi = listperi.size
+    listdcyc = retr_listdcycboxsperi(listperi, 2. / numbtime, 0.1, None)
+    listdiffepoc, listnumbepoc, numbtria = retr_listepocboxsperi(listperi, listdcyc, cade / 60. / 24., 0.5)
+    numbtriatotl = np.sum(numbtria)
+    print('Benchmarking %d backends of the periodic box search over %d trial periods, %d trials and %d time-series with %d samples...' % \
+                                                                                        (len(listtypecalc), numbperi, numbtriatotl, numbinje, numbtime))
+    
+    # compile the backends, if necessary, before timing them
+    for typecalc in listtypecalc:
+        dictbackboxsperi[typecalc]([np.arange(2)], listperi, [np.stack([time, np.ones(numbtime), np.full(numbtime, stdvrflx)], axis=1)], \
+                                                    listdcyc, listdiffepoc, listnumbepoc, time[0], [], False, numbbinsphasdcyc, 0)
+    
+    dictbenc = dict()
+    for typecalc in listtypecalc:
+        dictbenc[typecalc] = dict()
+        for name in ['timewall', 'timeredu', 'perireco', 'errrperi']:
+            dictbenc[typecalc][name] = np.empty(numbinje)
+    dictbenc['periinje'] = np.empty(numbinje)
+    
+    for n in range(numbinje):
+        
+        # inject a periodic box with a duration of 2% of the period, whose depth yields s2nrinje over the baseline
+        periinje = np.exp(objtrand.uniform(np.log(minmperi), np.log(min(maxmperi, maxmperiinje))))
+        epocinje = time[0] + objtrand.uniform(0., periinje)
+        durainje = 0.02 * periinje
+        deptinje = s2nrinje * stdvrflx / np.sqrt(numbtime * durainje / periinje)
+        
+        arry = np.empty((numbtime, 3))
+        arry[:, 0] = time
+        arry[:, 1] = 1. + stdvrflx * objtrand.standard_normal(numbtime)
+        arry[:, 2] = stdvrflx
+        arry[np.abs(((time - epocinje) / periinje + 0.5) % 1. - 0.5) < durainje / periinje / 2., 1] -= deptinje
+        dictbenc['periinje'][n] = periinje
+        
+        for typecalc in listtypecalc:
+            timeinit = modutime.time()
+            listrflxitra, listdcycmaxm, listepocmaxm = dictbackboxsperi[typecalc]([np.arange(numbperi)], listperi, [arry], listdcyc, listdiffepoc, listnumbepoc, \
+                                                                                                                            time[0], [], False, numbbinsphasdcyc, 0)
+            timewall = modutime.time() - timeinit
+            
+            # S/N of the box chosen at each trial period
+            lists2nr = (np.median(arry[:, 1]) - listrflxitra) / stdvrflx * np.sqrt(numbtime * listdcycmaxm)
+            indxperimpow = np.nanargmax(lists2nr)
+            
+            dictbenc[typecalc]['timewall'][n] = timewall
+            dictbenc[typecalc]['timeredu'][n] = timewall / numbtime / numbtriatotl
+            dictbenc[typecalc]['perireco'][n] = listperi[indxperimpow]
+            dictbenc[typecalc]['errrperi'][n] = abs(listperi[indxperimpow] - periinje) / periinje
+    
+    print('%10s %15s %25s %25s %15s' % ('Backend', 'Wall time [s]', 'Time per obs. & trial [ns]', 'Median fractional error', 'Recovery rate'))
+    for typecalc in listtypecalc:
+        dictbenc[typecalc]['fracreco'] = np.mean(dictbenc[typecalc]['errrperi'] < tolrperi)
+        print('%10s %15.3g %25.3g %25.3g %15.3g' % (typecalc, np.mean(dictbenc[typecalc]['timewall']), 1e9 * np.mean(dictbenc[typecalc]['timeredu']), \
+                                                                    np.median(dictbenc[typecalc]['errrperi']), dictbenc[typecalc]['fracreco']))
+    
+    return dictbenc
+
+
 def anim_tmptdete(timefull, lcurfull, meantimetmpt, lcurtmpt, pathvisu, listindxtimeposimaxm, corrprod, corr, strgextn='', \
                   ## file type of the plot
                   typefileplot='png', \
@@ -6650,11 +9008,166 @@ def retr_gradlliknegagpro(listparagpro, lcur, objtgpro):
     return -objtgpro.grad_log_likelihood(lcur)[1]
 
 
+def retr_lliknegagprojoin(listparagpro, listlcur, listobjtgpro):
+    '''
+    Compute the negative loglikelihood of the GP models of multiple regions sharing the same parameters
+    '''
+    
+    lliknega = 0.
+    for i in range(len(listobjtgpro)):
+        lliknega += retr_lliknegagpro(listparagpro, listlcur[i], listobjtgpro[i])
+    
+    return lliknega
+
+
+def retr_gradlliknegagprojoin(listparagpro, listlcur, listobjtgpro):
+    '''
+    Compute the gradient of the negative loglikelihood of the GP models of multiple regions sharing the same parameters
+    '''
+    
+    gradlliknega = np.zeros(len(listparagpro))
+    for i in range(len(listobjtgpro)):
+        gradlliknega += retr_gradlliknegagpro(listparagpro, listlcur[i], listobjtgpro[i])
+    
+    return gradlliknega
+
+
+# cache of GP models whose covariance matrices have been computed, shared by all callers of retr_objtgpro, ordered from the least to the most recently used
+dictcachgpro = {'dictobjt': dict(), 'maxmnumb': 100, 'numbhits': 0, 'numbmiss': 0}
+
+
+def setp_cachgpro(maxmnumb=None, boolclea=False):
+    '''
+    Set the maximum number of GP models in the cache of computed GP models and optionally clear the cache.
+    '''
+    
+    if boolclea:
+        dictcachgpro['dictobjt'] = dict()
+        dictcachgpro['numbhits'] = 0
+        dictcachgpro['numbmiss'] = 0
+    
+    if maxmnumb is not None:
+        dictcachgpro['maxmnumb'] = maxmnumb
+    
+    # evict the least recently used GP models
+    while len(dictcachgpro['dictobjt']) > dictcachgpro['maxmnumb']:
+        dictcachgpro['dictobjt'].pop(next(iter(dictcachgpro['dictobjt'])), None)
+
+
+def retr_parainitgpro(lcur, timescalbdtr):
+    '''
+    Return the initial parameters, log_sigma and log_rho, of the Matern 3/2 kernel of the GP baseline.
+    '''
+    
+    paragpro = np.array([np.log(np.std(4. * lcur)), np.log(timescalbdtr)])
+    
+    return paragpro
+
+
+def retr_objtgpro( \
+                  # times of the samples
+                  time, \
+                  
+                  # standard-deviations of the samples
+                  stdvlcur, \
+                  
+                  # parameters, log_sigma and log_rho, of the Matern 3/2 kernel
+                  paragpro, \
+                  
+                  # mean of the GP model
+                  meanlcur, \
+                  
+                  # Boolean flag to look up and store the GP model in the cache of computed GP models
+                  boolcach=True, \
+                 ):
+    '''
+    Return a GP model with a Matern 3/2 kernel whose covariance matrix has been computed at the given times.
+    '''
+    
+    if boolcach:
+        objthash = hashlib.sha1()
+        objthash.update(np.ascontiguousarray(time, dtype=float).view(np.uint8))
+        objthash.update(np.ascontiguousarray(stdvlcur, dtype=float).view(np.uint8))
+        objthash.update(np.ascontiguousarray(paragpro, dtype=float).view(np.uint8))
+        objthash.update(repr(float(meanlcur)).encode())
+        strgkeyy = objthash.hexdigest()
+        
+        # move the GP model to the most recently used end of the cache
+        objtgpro = dictcachgpro['dictobjt'].pop(strgkeyy, None)
+        
+        # the key is the hash of the times, standard-deviations and parameters computed here, so the cached GP model matches the times and 
+        ## standard-deviations of the key as long as the callers do not compute it again at other times
+        # the cached GP model is shared with the callers that received it earlier, which may have changed its parameters, 
+        ## so it is only reused if its parameters still match the key
+        if objtgpro is not None and objtgpro.computed and \
+                        np.array_equal(objtgpro.get_parameter_vector(include_frozen=True), np.array([paragpro[0], paragpro[1], meanlcur], dtype=float)):
+            dictcachgpro['dictobjt'][strgkeyy] = objtgpro
+            dictcachgpro['numbhits'] += 1
+            return objtgpro
+        
+        dictcachgpro['numbmiss'] += 1
+    
+    ## construct the kernel object
+    objtkern = celerite.terms.Matern32Term(log_sigma=paragpro[0], log_rho=paragpro[1])
+    
+    ## construct the GP model object
+    objtgpro = celerite.GP(objtkern, mean=meanlcur)
+    
+    # compute the covariance matrix
+    objtgpro.compute(time, yerr=stdvlcur)
+    
+    if boolcach:
+        dictcachgpro['dictobjt'][strgkeyy] = objtgpro
+        setp_cachgpro()
+    
+    return objtgpro
+
+
+def retr_paragproopti(listtime, listlcur, liststdvlcur, timescalbdtr, typeverb=1):
+    '''
+    Return the parameters of the Matern 3/2 kernel that maximize the joint likelihood of the GP models of multiple regions sharing the parameters, 
+    where the GP model of each region is constructed once and only its parameters are updated during the minimization.
+    '''
+    
+    # regions with enough samples to constrain the GP model
+    listindxregi = [i for i in range(len(listtime)) if listtime[i].size > 1]
+    
+    if len(listindxregi) == 0:
+        return None
+    
+    # initial parameters as the median over the regions
+    parainit = np.median(np.array([retr_parainitgpro(listlcur[i], timescalbdtr) for i in listindxregi]), axis=0)
+    
+    listobjtgpro = [retr_objtgpro(listtime[i], liststdvlcur[i], parainit, np.mean(listlcur[i]), boolcach=False) for i in listindxregi]
+    listlcurregi = [listlcur[i] for i in listindxregi]
+    
+    # bounds on the GP model parameters, where the time scale is kept within a factor of 2 of the time scale of the detrending
+    limtparagpro = [(None, None), (np.log(timescalbdtr / 2.), np.log(2. * timescalbdtr))]
+    
+    # the gradient of the loglikelihood requires autograd, without which it is evaluated numerically
+    try:
+        retr_gradlliknegagpro(parainit, listlcurregi[0], listobjtgpro[0])
+        funcgrad = retr_gradlliknegagprojoin
+    except ImportError:
+        funcgrad = None
+    
+    # minimize the negative loglikelihood
+    objtmini = scipy.optimize.minimize(retr_lliknegagprojoin, parainit, jac=funcgrad, method='L-BFGS-B', bounds=limtparagpro, \
+                                                                                                            args=(listlcurregi, listobjtgpro))
+    
+    if typeverb > 0:
+        print('GP Matern 3/2 parameters with maximum likelihood over %d regions: sigma = %.3g, rho = %.3g days' % \
+                                                                                (len(listindxregi), np.exp(objtmini.x[0]), np.exp(objtmini.x[1])))
+    
+    return objtmini.x
+
+
 def bdtr_tser( \
               # times in days at which the time-series data have been collected
               time, \
               
               # time-series data to be detrended
+              ## or a 2D array of the time-series data of multiple channels sharing the same times, where the second axis indexes the channels
               lcur, \
               
               # standard-deviation of the time-series data to be detrended
@@ -6697,6 +9210,16 @@ def bdtr_tser( \
               # time scale of the median detrending
               timescalbdtrmedi=None, \
               
+              # dictionary that keeps the detrended regions across calls, where a region whose samples are unchanged since the previous call is not fitted again, 
+              # as when only a few samples are removed by sigma-clipping between the calls
+              dictwarm=None, \
+              
+              # pool of processes or threads (e.g., from retr_poolbdtr) over which the regions are detrended in parallel
+              objtpool=None, \
+              
+              # Boolean flag to optimize the parameters of the GP model, which are shared by all regions, over the joint likelihood of the regions
+              booloptigpro=False, \
+              
               # type of verbosity
               ## -1: absolutely no text
               ##  0: no text output except critical warnings
@@ -6709,9 +9232,100 @@ def bdtr_tser( \
     Detrend input time-series data.
     '''
     
+    typebdtr, timebrekregi, ordrspln, timescalbdtr, timescalbdtrmedi = retr_parabdtr(typebdtr, boolbrekregi, timebrekregi, ordrspln, timescalbdtr, timescalbdtrmedi)
+    
+    # Boolean flag to detrend multiple channels at once
+    boolmult = lcur.ndim == 2
+    if boolmult and typebdtr == 'GaussianProcess':
+        raise Exception('Gaussian process detrending of multiple channels at once is not supported.')
+    
+    if typebdtr == 'Spline' or typebdtr == 'GaussianProcess':
+        timescal = timescalbdtr
+    else:
+        timescal = timescalbdtrmedi
+    if typeverb > 0:
+        print('Detrending the light curve with at a time scale of %.g days...' % timescal)
+        if epocmask is not None:
+            print('Using a specific ephemeris to mask out transits while detrending...')
+    
+    timeedge, indxtimeregi, indxtimeregioutt = retr_regibdtr(time, lcur, epocmask, perimask, duramask, boolbrekregi, timeedge, timebrekregi, \
+                                                                                                                booladdddiscbdtr, timescal, typeverb)
+    numbregi = len(indxtimeregi)
+    indxregi = np.arange(numbregi)
+    lcurbdtrregi = [[] for i in indxregi]
+    listobjtspln = [[] for i in indxregi]
+    
+    # parameters of the detrending that must match for a region stored in dictwarm to be reused
+    parawarm = [typebdtr, ordrspln, timescalbdtr, timescalbdtrmedi, booloptigpro]
+    numbregiwarm = 0
+    
+    # inputs of the regions to be fitted
+    listindxregifitt = []
+    listinpt = []
+    for i in indxregi:
+        timeregi = time[indxtimeregi[i]]
+        lcurregi = lcur[indxtimeregi[i]]
+        stdvlcurregi = stdvlcur[indxtimeregi[i]]
+        
+        # reuse the region detrended by an earlier call if its samples and mask have not changed
+        if dictwarm is not None and i in dictwarm and dictwarm[i]['para'] == parawarm and \
+                                                            np.array_equal(dictwarm[i]['timeregi'], timeregi) and \
+                                                            np.array_equal(dictwarm[i]['lcurregi'], lcurregi) and \
+                                                            np.array_equal(dictwarm[i]['stdvlcurregi'], stdvlcurregi) and \
+                                                            np.array_equal(dictwarm[i]['indxtimeregioutt'], indxtimeregioutt[i]):
+            lcurbdtrregi[i] = np.copy(dictwarm[i]['lcurbdtrregi'])
+            listobjtspln[i] = dictwarm[i]['objtspln']
+            numbregiwarm += 1
+            continue
+        
+        listindxregifitt.append(i)
+        listinpt.append((timeregi, lcurregi, stdvlcurregi, indxtimeregioutt[i], typebdtr, ordrspln, timescalbdtr, timescalbdtrmedi, typeverb))
+    
+    if typebdtr == 'GaussianProcess' and booloptigpro and len(listinpt) > 0:
+        # parameters of the GP model optimized over all regions, which are kept across the calls sharing dictwarm
+        if dictwarm is not None and 'paragpro' in dictwarm and dictwarm['paragpro'][0] == parawarm:
+            paragpro = dictwarm['paragpro'][1]
+        else:
+            paragpro = retr_paragproopti([time[indxtimeregi[i]][indxtimeregioutt[i]] for i in indxregi], \
+                                         [lcur[indxtimeregi[i]][indxtimeregioutt[i]] for i in indxregi], \
+                                         [stdvlcur[indxtimeregi[i]][indxtimeregioutt[i]] for i in indxregi], timescalbdtr, typeverb=typeverb)
+            if dictwarm is not None:
+                dictwarm['paragpro'] = [parawarm, paragpro]
+        listinpt = [inpt + (paragpro,) for inpt in listinpt]
+    
+    listoutp = exec_bdtrregi(listinpt, objtpool=objtpool)
+    
+    for ii, i in enumerate(listindxregifitt):
+        lcurbdtrregi[i], listobjtspln[i] = listoutp[ii]
+        
+        if dictwarm is not None:
+            dictwarm[i] = dict()
+            dictwarm[i]['para'] = parawarm
+            dictwarm[i]['timeregi'] = listinpt[ii][0]
+            dictwarm[i]['lcurregi'] = listinpt[ii][1]
+            dictwarm[i]['stdvlcurregi'] = listinpt[ii][2]
+            dictwarm[i]['indxtimeregioutt'] = indxtimeregioutt[i]
+            dictwarm[i]['lcurbdtrregi'] = np.copy(lcurbdtrregi[i])
+            dictwarm[i]['objtspln'] = listobjtspln[i]
+    
+    if typebdtr == 'medi':
+        listobjtspln = None
+
+    if dictwarm is not None and typeverb > 0:
+        print('%d out of %d regions were unchanged since the previous detrending and have not been fitted again.' % (numbregiwarm, numbregi))
+    
+    lcurbdtr = np.concatenate(lcurbdtrregi)
+
+    return lcurbdtr, lcurbdtrregi, indxtimeregi, indxtimeregioutt, listobjtspln, timeedge
+
+
+def retr_parabdtr(typebdtr, boolbrekregi, timebrekregi, ordrspln, timescalbdtr, timescalbdtrmedi):
+    '''
+    Return the parameters of the baseline detrending, where those not provided are set to their defaults.
+    '''
+    
     if typebdtr is None:
         typebdtr = 'Spline'
-    
     if boolbrekregi and timebrekregi is None:
         timebrekregi = 0.1 # [day]
     if ordrspln is None:
@@ -6721,14 +9335,14 @@ def bdtr_tser( \
     if timescalbdtrmedi is None:
         timescalbdtrmedi = 0.5 # [days]
     
-    if typebdtr == 'Spline' or typebdtr == 'GaussianProcess':
-        timescal = timescalbdtr
-    else:
-        timescal = timescalbdtrmedi
-    if typeverb > 0:
-        print('Detrending the light curve with at a time scale of %.g days...' % timescal)
-        if epocmask is not None:
-            print('Using a specific ephemeris to mask out transits while detrending...')
+    return typebdtr, timebrekregi, ordrspln, timescalbdtr, timescalbdtrmedi
+
+
+def retr_regibdtr(time, lcur, epocmask, perimask, duramask, boolbrekregi, timeedge, timebrekregi, booladdddiscbdtr, timescal, typeverb):
+    '''
+    Return the times at the edges of the regions into which the time-series is broken before detrending, 
+    along with the indices of the times inside each region and, within each region, the indices of the out-of-transit times to be fitted.
+    '''
     
     if timeedge is not None and len(timeedge) > 2 and not boolbrekregi:
         raise Exception('')
@@ -6736,7 +9350,11 @@ def bdtr_tser( \
     if boolbrekregi:
         # determine the times at which the light curve will be broken into pieces
         if timeedge is None:
-            timeedge = retr_timeedge(time, lcur, timebrekregi, booladdddiscbdtr, timescal)
+            if lcur.ndim == 2:
+                # the discontinuities are searched for in the first channel
+                timeedge = retr_timeedge(time, lcur[:, 0], timebrekregi, booladdddiscbdtr, timescal)
+            else:
+                timeedge = retr_timeedge(time, lcur, timebrekregi, booladdddiscbdtr, timescal)
         numbedge = len(timeedge)
         numbregi = numbedge - 1
     else:
@@ -6751,18 +9369,14 @@ def bdtr_tser( \
         print(timeedge)
 
     indxregi = np.arange(numbregi)
-    lcurbdtrregi = [[] for i in indxregi]
     indxtimeregi = [[] for i in indxregi]
     indxtimeregioutt = [[] for i in indxregi]
-    listobjtspln = [[] for i in indxregi]
     for i in indxregi:
         if typeverb > 1:
             print('Region %d' % i)
         # find times inside the region
         indxtimeregi[i] = np.where((time >= timeedge[i]) & (time <= timeedge[i+1]))[0]
         timeregi = time[indxtimeregi[i]]
-        lcurregi = lcur[indxtimeregi[i]]
-        stdvlcurregi = stdvlcur[indxtimeregi[i]]
         
         # mask out the transits
         if epocmask is not None and len(epocmask) > 0 and duramask is not None and perimask is not None:
@@ -6778,168 +9392,555 @@ def bdtr_tser( \
             indxtimeregioutt[i] = np.arange(timeregi.size)
             
         if typeverb > 1:
-            print('lcurregi[indxtimeregioutt[i]]')
-            summgene(lcurregi[indxtimeregioutt[i]])
-        
-        if typebdtr == 'medi':
-            listobjtspln = None
-            size = int(timescalbdtrmedi / np.amin(timeregi[1:] - timeregi[:-1]))
-            if size == 0:
-                print('timescalbdtrmedi')
-                print(timescalbdtrmedi)
-                print('np.amin(timeregi[1:] - timeregi[:-1])')
-                print(np.amin(timeregi[1:] - timeregi[:-1]))
-                print('lcurregi')
-                summgene(lcurregi)
-                raise Exception('')
-            lcurbdtrregi[i] = 1. + lcurregi - scipy.ndimage.median_filter(lcurregi, size=size)
-        
-        if typebdtr == 'GaussianProcess':
-            # fit a Gaussian Process (GP) model to the data as baseline
-            ## construct the kernel object
-            objtkern = celerite.terms.Matern32Term(log_sigma=np.log(np.std(4. * lcurregi[indxtimeregioutt[i]])), log_rho=np.log(timescalbdtr))
+            print('lcur[indxtimeregi[i]][indxtimeregioutt[i]]')
+            summgene(lcur[indxtimeregi[i]][indxtimeregioutt[i]])
+    
+    return timeedge, indxtimeregi, indxtimeregioutt
+
+
+def bdtr_regi(timeregi, lcurregi, stdvlcurregi, indxtimeregioutt, typebdtr, ordrspln, timescalbdtr, timescalbdtrmedi, typeverb, paragpro=None):
+    '''
+    Detrend a region of a time-series by fitting its out-of-transit times and return the detrended region along with the fitted spline or GP model.
+    '''
+    
+    boolmult = lcurregi.ndim == 2
+    objtspln = None
+    
+    if typebdtr == 'medi':
+        # running median inside a time window of width timescalbdtrmedi, which only includes the out-of-transit samples
+        boolfitt = np.zeros(timeregi.size, dtype=bool)
+        boolfitt[indxtimeregioutt] = True
+        if boolmult:
+            lcurtren = np.stack([retr_medirunn(timeregi, lcurregi[:, e], timescalbdtrmedi, boolfitt=boolfitt) for e in range(lcurregi.shape[1])], 1)
+        else:
+            lcurtren = retr_medirunn(timeregi, lcurregi, timescalbdtrmedi, boolfitt=boolfitt)
+        lcurbdtrregi = 1. + lcurregi - lcurtren
+
+    if typebdtr == 'GaussianProcess':
+        # fit a Gaussian Process (GP) model to the data as baseline
+        if paragpro is None:
+            paragpro = retr_parainitgpro(lcurregi[indxtimeregioutt], timescalbdtr)
+        if typeverb > 1:
             print('sigma for GP')
-            print(np.std(lcurregi[indxtimeregioutt[i]]))
+            print(np.exp(paragpro[0]))
             print('rho for GP [days]')
-            print(timescalbdtr)
+            print(np.exp(paragpro[1]))
+        
+        ## GP model whose covariance matrix has been computed, which is reused if the same region has been computed with the same parameters before
+        objtgpro = retr_objtgpro(timeregi[indxtimeregioutt], stdvlcurregi[indxtimeregioutt], paragpro, np.mean(lcurregi[indxtimeregioutt]))
+        
+        # get the GP model mean baseline
+        lcurbase = objtgpro.predict(lcurregi[indxtimeregioutt], t=timeregi, return_cov=False, return_var=False)#[0]
 
-            ## construct the GP model object
-            objtgpro = celerite.GP(objtkern, mean=np.mean(lcurregi[indxtimeregioutt[i]]))
-            
-            # compute the covariance matrix
-            objtgpro.compute(timeregi[indxtimeregioutt[i]], yerr=stdvlcurregi[indxtimeregioutt[i]])
-            
-            # get the initial parameters of the GP model
-            #parainit = objtgpro.get_parameter_vector()
-            
-            # get the bounds on the GP model parameters
-            #limtparagpro = objtgpro.get_parameter_bounds()
-            
-            # minimize the negative loglikelihood
-            #objtmini = scipy.optimize.minimize(retr_lliknegagpro, parainit, jac=retr_gradlliknegagpro, method="L-BFGS-B", bounds=limtparagpro, args=(lcurregi[indxtimeregioutt[i]], objtgpro))
-            
-            #print('GP Matern 3/2 parameters with maximum likelihood:')
-            #print(objtmini.x)
-
-            # update the GP model with the parameters that minimize the negative loglikelihood
-            #objtgpro.set_parameter_vector(objtmini.x)
-            
-            # get the GP model mean baseline
-            lcurbase = objtgpro.predict(lcurregi[indxtimeregioutt[i]], t=timeregi, return_cov=False, return_var=False)#[0]
-            
-            # subtract the baseline from the data
-            lcurbdtrregi[i] = 1. + lcurregi - lcurbase
-
-            listobjtspln[i] = objtgpro
-        if typebdtr == 'Spline':
-            # fit the spline
-            if lcurregi[indxtimeregioutt[i]].size > 0:
-                if timeregi[indxtimeregioutt[i]].size < 4:
-                    print('Warning! Only %d points available for spline! This will result in a trivial baseline-detrended light curve (all 1s).' \
-                                                                                                                % timeregi[indxtimeregioutt[i]].size)
-                    print('numbregi')
-                    print(numbregi)
-                    print('indxtimeregioutt[i]')
-                    summgene(indxtimeregioutt[i])
-                    for ii in indxregi:
-                        print('indxtimeregioutt[ii]')
-                        summgene(indxtimeregioutt[ii])
-                        
-                    #raise Exception('')
+        # subtract the baseline from the data
+        lcurbdtrregi = 1. + lcurregi - lcurbase
 
-                    listobjtspln[i] = None
-                    lcurbdtrregi[i] = np.ones_like(lcurregi)
+        objtspln = objtgpro
+    if typebdtr == 'Spline':
+        # fit the spline
+        if lcurregi[indxtimeregioutt].size > 0:
+            if timeregi[indxtimeregioutt].size < 4:
+                print('Warning! Only %d points available for spline! This will result in a trivial baseline-detrended light curve (all 1s).' \
+                                                                                                            % timeregi[indxtimeregioutt].size)
+                print('indxtimeregioutt')
+                summgene(indxtimeregioutt)
+
+                #raise Exception('')
+
+                objtspln = None
+                lcurbdtrregi = np.ones_like(lcurregi)
+            else:
+
+                minmtime = np.amin(timeregi[indxtimeregioutt])
+                maxmtime = np.amax(timeregi[indxtimeregioutt])
+                numbknot = int((maxmtime - minmtime) / timescalbdtr) + 1
+
+                timeknot = np.linspace(minmtime, maxmtime, numbknot)
+                timeknot = timeknot[1:-1]
+                numbknot = timeknot.size
+
+                indxknotregi = np.digitize(timeregi[indxtimeregioutt], timeknot) - 1
+
+                if typeverb > 1:
+                    print('minmtime')
+                    print(minmtime)
+                    print('maxmtime')
+                    print(maxmtime)
+                    print('timescalbdtr')
+                    print(timescalbdtr)
+                    print('%d knots used (exclduing the end points).' % (numbknot))
+                    if numbknot > 1:
+                        print('Knot separation: %.3g hours' % (24 * (timeknot[1] - timeknot[0])))
+
+                if numbknot > 0:
+                    try:
+                        if boolmult:
+                            objtspln = retr_objtsplnmult(timeregi[indxtimeregioutt], lcurregi[indxtimeregioutt], timeknot, ordrspln)
+                        else:
+                            objtspln = scipy.interpolate.LSQUnivariateSpline(timeregi[indxtimeregioutt], lcurregi[indxtimeregioutt], timeknot, k=ordrspln)
+                    except:
+                        print('')
+                        print('')
+                        print('')
+                        print('timeknot')
+                        print(timeknot)
+                        print('ordrspln')
+                        print(ordrspln)
+                        raise Exception('scipy.interpolate.LSQUnivariateSpline() failed.')
+                    lcurbdtrregi = lcurregi - objtspln(timeregi) + 1.
                 else:
-                    
-                    minmtime = np.amin(timeregi[indxtimeregioutt[i]])
-                    maxmtime = np.amax(timeregi[indxtimeregioutt[i]])
-                    numbknot = int((maxmtime - minmtime) / timescalbdtr) + 1
-                    
-                    timeknot = np.linspace(minmtime, maxmtime, numbknot)
-                    timeknot = timeknot[1:-1]
-                    numbknot = timeknot.size
-
-                    indxknotregi = np.digitize(timeregi[indxtimeregioutt[i]], timeknot) - 1
-
-                    if typeverb > 1:
-                        print('minmtime')
-                        print(minmtime)
-                        print('maxmtime')
-                        print(maxmtime)
-                        print('timescalbdtr')
-                        print(timescalbdtr)
-                        print('%d knots used (exclduing the end points).' % (numbknot))
-                        if numbknot > 1:
-                            print('Knot separation: %.3g hours' % (24 * (timeknot[1] - timeknot[0])))
-                    
-                    if numbknot > 0:
-                        try:
-                            objtspln = scipy.interpolate.LSQUnivariateSpline(timeregi[indxtimeregioutt[i]], lcurregi[indxtimeregioutt[i]], timeknot, k=ordrspln)
-                        except:
-                            print('')
-                            print('')
-                            print('')
-                            print('timeknot')
-                            print(timeknot)
-                            print('ordrspln')
-                            print(ordrspln)
-                            raise Exception('scipy.interpolate.LSQUnivariateSpline() failed.')
-                        lcurbdtrregi[i] = lcurregi - objtspln(timeregi) + 1.
-                        listobjtspln[i] = objtspln
-                    else:
-                        lcurbdtrregi[i] = lcurregi - np.median(lcurregi) + 1.
-                        listobjtspln[i] = None
-                    
+                    lcurbdtrregi = lcurregi - np.median(lcurregi, axis=0) + 1.
+                    objtspln = None
+
+        else:
+            lcurbdtrregi = lcurregi
+            objtspln = None
+
+        if typeverb > 1:
+            print('lcurbdtrregi')
+            summgene(lcurbdtrregi)
+            print('')
+    
+    return lcurbdtrregi, objtspln
+
+
+def exec_bdtrregi(listinpt, objtpool=None):
+    '''
+    Detrend the regions whose arguments to bdtr_regi are given in listinpt, either sequentially or over a pool of processes or threads, 
+    and return their outputs in the order of listinpt, which makes the outputs independent of the pool.
+    '''
+    
+    boolpool = objtpool is not None and len(listinpt) > 1
+    
+    # Gaussian process objects cannot be passed between processes
+    if boolpool and any([inpt[4] == 'GaussianProcess' for inpt in listinpt]):
+        import multiprocessing.pool
+        boolpool = isinstance(objtpool, multiprocessing.pool.ThreadPool)
+        if not boolpool:
+            print('Warning! Gaussian process models cannot be passed between processes. Detrending the regions serially. Use a pool of threads instead...')
+    
+    if boolpool:
+        listoutp = objtpool.starmap(bdtr_regi, listinpt)
+    else:
+        listoutp = [bdtr_regi(*inpt) for inpt in listinpt]
+    
+    return listoutp
+
+
+def retr_poolbdtr(numbproc, typepool='thrd'):
+    '''
+    Return a pool of numbproc threads ('thrd') or processes ('proc') over which the regions of time-series are detrended.
+    '''
+    
+    import multiprocessing.pool
+    
+    if typepool == 'thrd':
+        objtpool = multiprocessing.pool.ThreadPool(numbproc)
+    elif typepool == 'proc':
+        # processes are not forked, since forking after numba has started its threading layer can deadlock
+        objtpool = retr_contproc().Pool(numbproc)
+    else:
+        print('typepool')
+        print(typepool)
+        raise Exception('Unknown type of pool.')
+    
+    return objtpool
+
+
+def bdtr_listtser( \
+                  # list of times of the time-series
+                  listtime, \
+                  
+                  # list of time-series data to be detrended
+                  listlcur, \
+                  
+                  # list of standard-deviations of the time-series data
+                  liststdvlcur, \
+                  
+                  # list of time scales of the detrending [days]
+                  listtimescalbdtr, \
+                  
+                  # number of processes or threads
+                  numbproc=None, \
+                  
+                  # type of the pool: 'thrd' for threads or 'proc' for processes
+                  typepool='thrd', \
+                  
+                  # masking before detrending, as in bdtr_tser
+                  epocmask=None, \
+                  perimask=None, \
+                  duramask=None, \
+                  
+                  # regions, as in bdtr_tser
+                  boolbrekregi=True, \
+                  timebrekregi=None, \
+                  booladdddiscbdtr=True, \
+                  
+                  # type of baseline detrending, as in bdtr_tser
+                  typebdtr=None, \
+                  ordrspln=None, \
+                  timescalbdtrmedi=None, \
+                  
+                  # Boolean flag to optimize the parameters of the GP model over the regions of each time-series and time scale, as in bdtr_tser
+                  booloptigpro=False, \
+                  
+                  # type of verbosity
+                  typeverb=1, \
+                 ):
+    '''
+    Detrend multiple time-series (e.g., of different instruments and chunks) at multiple time scales, where the regions of all time-series and time scales 
+    are fitted as independent work items over a single pool and reassembled into the detrended time-series of each time-series and time scale.
+    '''
+    
+    numbtser = len(listtime)
+    indxtser = np.arange(numbtser)
+    numbtimescal = len(listtimescalbdtr)
+    indxtimescal = np.arange(numbtimescal)
+    
+    # work items over all time-series, time scales and regions
+    listinpt = []
+    listindxtimeregi = [[[] for z in indxtimescal] for n in indxtser]
+    for n in indxtser:
+        for z in indxtimescal:
+            typebdtrtemp, timebrekregitemp, ordrsplntemp, timescalbdtr, timescalbdtrmeditemp = retr_parabdtr(typebdtr, boolbrekregi, timebrekregi, ordrspln, \
+                                                                                                                    listtimescalbdtr[z], timescalbdtrmedi)
+            if typebdtrtemp == 'medi':
+                timescal = timescalbdtrmeditemp
             else:
-                lcurbdtrregi[i] = lcurregi
-                listobjtspln[i] = None
-            
-            if typeverb > 1:
-                print('lcurbdtrregi[i]')
-                summgene(lcurbdtrregi[i])
-                print('')
+                timescal = timescalbdtr
+            timeedge, listindxtimeregi[n][z], indxtimeregioutt = retr_regibdtr(listtime[n], listlcur[n], epocmask, perimask, duramask, boolbrekregi, None, \
+                                                                                                        timebrekregitemp, booladdddiscbdtr, timescal, typeverb)
+            numbregi = len(listindxtimeregi[n][z])
+            listinptregi = []
+            for i in range(numbregi):
+                listinptregi.append((listtime[n][listindxtimeregi[n][z][i]], listlcur[n][listindxtimeregi[n][z][i]], liststdvlcur[n][listindxtimeregi[n][z][i]], \
+                                    indxtimeregioutt[i], typebdtrtemp, ordrsplntemp, timescalbdtr, timescalbdtrmeditemp, typeverb))
+            if typebdtrtemp == 'GaussianProcess' and booloptigpro and numbregi > 0:
+                paragpro = retr_paragproopti([inpt[0][inpt[3]] for inpt in listinptregi], [inpt[1][inpt[3]] for inpt in listinptregi], \
+                                                                        [inpt[2][inpt[3]] for inpt in listinptregi], timescalbdtr, typeverb=typeverb)
+                listinptregi = [inpt + (paragpro,) for inpt in listinptregi]
+            listinpt += listinptregi
     
-    lcurbdtr = np.concatenate(lcurbdtrregi)
+    if typeverb > 0:
+        print('Detrending %d regions of %d time-series at %d time scales...' % (len(listinpt), numbtser, numbtimescal))
+    
+    if numbproc is not None and numbproc > 1:
+        objtpool = retr_poolbdtr(numbproc, typepool=typepool)
+        listoutp = exec_bdtrregi(listinpt, objtpool=objtpool)
+        objtpool.close()
+        objtpool.join()
+    else:
+        listoutp = exec_bdtrregi(listinpt)
+    
+    # reassemble the regions in the order of the work items
+    listlcurbdtr = [[[] for z in indxtimescal] for n in indxtser]
+    listlistobjtspln = [[[] for z in indxtimescal] for n in indxtser]
+    cntr = 0
+    for n in indxtser:
+        for z in indxtimescal:
+            numbregi = len(listindxtimeregi[n][z])
+            listlcurbdtr[n][z] = np.concatenate([listoutp[cntr+i][0] for i in range(numbregi)], 0)
+            listlistobjtspln[n][z] = [listoutp[cntr+i][1] for i in range(numbregi)]
+            cntr += numbregi
+    
+    return listlcurbdtr, listlistobjtspln
 
-    return lcurbdtr, lcurbdtrregi, indxtimeregi, indxtimeregioutt, listobjtspln, timeedge
 
+def retr_objtsplnmult(time, lcur, timeknot, ordrspln):
+    '''
+    Return the least-squares spline with the given interior knots fitted to the time-series of multiple channels sharing the same times, 
+    where the B-spline design matrix is built and factorized once and the channels are solved for as the right-hand sides of a single least-squares problem.
+    '''
+    
+    # knots including the boundary knots, which are repeated as in scipy.interpolate.LSQUnivariateSpline
+    timeknottotl = np.concatenate((np.full(ordrspln + 1, time[0]), timeknot, np.full(ordrspln + 1, time[-1])))
+    
+    matrdesi = scipy.interpolate.BSpline.design_matrix(time, timeknottotl, ordrspln).toarray()
+    
+    coef = np.linalg.lstsq(matrdesi, lcur, rcond=None)[0]
+    
+    objtspln = scipy.interpolate.BSpline(timeknottotl, coef, ordrspln)
+
+    return objtspln
 
-def retr_stdvwind(ydat, sizewind, boolcuttpeak=True):
+
+def retr_medirunn(time, ydat, timewind, boolfitt=None):
     '''
-    Return the standard deviation of a series inside a running windown.
+    Return the running median of a series sampled at sorted, but possibly irregular, times inside a time window of width timewind centered on each sample, 
+    where only the samples for which boolfitt is True (e.g., out-of-transit samples) enter the windows. 
+    The running median at times whose window contains no such samples is linearly interpolated from the neighbouring times.
     '''
     
-    numbdata = ydat.size
+    time = np.asarray(time, dtype=float)
+    ydat = np.asarray(ydat, dtype=float)
     
-    if sizewind % 2 != 1 or sizewind > numbdata:
-        raise Exception('')
+    if (np.diff(time) < 0).any():
+        raise Exception('The times of the running median should be sorted.')
+    
+    if boolfitt is None:
+        indxfitt = np.arange(time.size)
+    else:
+        indxfitt = np.where(boolfitt)[0]
+    
+    if indxfitt.size == 0:
+        return np.full(time.size, np.median(ydat))
+    
+    # rank of each sample among the samples entering the windows
+    indxsort = np.argsort(ydat[indxfitt], kind='stable')
+    rank = np.empty(indxfitt.size, dtype=np.int64)
+    rank[indxsort] = np.arange(indxfitt.size)
+    
+    medi = retr_medirunn_work(time, time[indxfitt], ydat[indxfitt][indxsort], rank, timewind / 2.)
+    
+    boolfini = np.isfinite(medi)
+    if not boolfini.all():
+        medi[~boolfini] = np.interp(time[~boolfini], time[boolfini], medi[boolfini])
+    
+    return medi
 
-    sizewindhalf = int((sizewind - 1) / 2)
+
+@jit(nopython=True, cache=True)
+def retr_medirunn_work(time, timefitt, ydatsort, rank, timewindhalf):
+    '''
+    Compiled worker of retr_medirunn that slides the time window with two pointers and keeps the samples inside the window in a Fenwick tree over their ranks, 
+    so that each insertion, removal and order-statistic query takes logarithmic time.
+    '''
+    
+    numbtime = time.size
+    numbfitt = timefitt.size
+    
+    # Fenwick tree of the number of samples inside the window at each rank
+    tree = np.zeros(numbfitt + 1, dtype=np.int64)
+    
+    # largest power of two not exceeding the number of samples
+    stepmaxm = 1
+    while 2 * stepmaxm <= numbfitt:
+        stepmaxm *= 2
+    
+    medi = np.empty(numbtime)
+    
+    # samples inside the window are those in [indxinit, indxfinl)
+    indxinit = 0
+    indxfinl = 0
+    for i in range(numbtime):
+        
+        # add the samples entering the window
+        while indxfinl < numbfitt and timefitt[indxfinl] <= time[i] + timewindhalf:
+            k = rank[indxfinl] + 1
+            while k <= numbfitt:
+                tree[k] += 1
+                k += k & (-k)
+            indxfinl += 1
+        
+        # remove the samples leaving the window
+        while indxinit < indxfinl and timefitt[indxinit] < time[i] - timewindhalf:
+            k = rank[indxinit] + 1
+            while k <= numbfitt:
+                tree[k] -= 1
+                k += k & (-k)
+            indxinit += 1
+        
+        numbwind = indxfinl - indxinit
+        if numbwind == 0:
+            medi[i] = np.nan
+            continue
+        
+        # ranks of the lower and upper middle samples inside the window
+        sumsmidd = 0.
+        for kthr in [(numbwind + 1) // 2, numbwind // 2 + 1]:
+            # descend the tree to the smallest rank whose cumulative count reaches kthr
+            indxrank = 0
+            step = stepmaxm
+            kthrrema = kthr
+            while step > 0:
+                if indxrank + step <= numbfitt and tree[indxrank+step] < kthrrema:
+                    indxrank += step
+                    kthrrema -= tree[indxrank]
+                step //= 2
+            sumsmidd += ydatsort[indxrank]
+        medi[i] = sumsmidd / 2.
+    
+    return medi
+
+
+def retr_stdvwind(ydat, sizewind, boolcuttpeak=True, xdat=None):
+    '''
+    Return the standard deviation of a series inside a running windown, which spans sizewind data points or, if xdat is provided, 
+    the data points whose sorted xdat are within a window of width sizewind centered on each data point.
+    '''
     
-    indxdata = np.arange(numbdata)
+    numbdata = ydat.size
     
-    stdv = np.empty_like(ydat)
-    for k in indxdata:
+    if xdat is None:
+        if sizewind % 2 != 1 or sizewind > numbdata:
+            raise Exception('')
         
+        sizewindhalf = int((sizewind - 1) / 2)
+        indxdata = np.arange(numbdata)
+        listminmindx = np.maximum(0, indxdata - sizewindhalf)
+        listmaxmindx = np.minimum(numbdata - 1, indxdata + sizewindhalf)
+    else:
+        xdat = np.asarray(xdat, dtype=float)
+        if (np.diff(xdat) < 0).any():
+            raise Exception('xdat of the running window should be sorted.')
+        listminmindx = np.searchsorted(xdat, xdat - sizewind / 2., side='left')
+        listmaxmindx = np.searchsorted(xdat, xdat + sizewind / 2., side='right') - 1
+    
+    stdv = retr_stdvwind_work(np.asarray(ydat, dtype=float), listminmindx, listmaxmindx, boolcuttpeak)
+    
+    return stdv.astype(np.asarray(ydat).dtype, copy=False)
 
 
-        minmindx = max(0, k - sizewindhalf)
-        maxmindx = min(numbdata - 1, k + sizewindhalf)
-        
+@jit(nopython=True, cache=True)
+def retr_stdvwind_work(ydat, listminmindx, listmaxmindx, boolcuttpeak):
+    '''
+    Compiled worker of retr_stdvwind that updates the number, mean and sum of squared deviations from the mean of the data points 
+    inside the window [listminmindx[k], listmaxmindx[k]], whose ends are nondecreasing, as data points enter and leave the window (Welford 1962), 
+    and keeps track of the maximum inside the window (along with its number of occurrences) using a monotonic queue, 
+    which makes the computation linear in the size of the series.
+    '''
+    
+    numbdata = ydat.size
+    
+    stdv = np.empty(numbdata)
+    
+    # a sum of squared deviations obtained by subtracting a term larger than itself by more than this factor has a relative round-off error 
+    # of about the machine precision times this factor, i.e., 1e-8, and is therefore recomputed from scratch in two passes over the window
+    factcanc = 1e8
+    
+    # monotonically decreasing queue of the distinct values inside the window and their number of occurrences
+    listvalumono = np.empty(numbdata)
+    listnumbmono = np.empty(numbdata, dtype=np.int64)
+    indxmonoinit = 0
+    indxmonofinl = 0
+    
+    # number, mean and sum of squared deviations from the mean inside the window [minmindxsums, maxmindx], 
+    # where the mean is taken relative to a reference, which is reset to the mean of the window whenever the statistics are recomputed, 
+    # so that the deviations are accurate even when the series has a large offset compared to its variations
+    refr = ydat[0]
+    numbsums = 0
+    meansums = 0.
+    sumssquadevi = 0.
+    minmindxsums = 0
+    maxmindx = -1
+    
+    # number of data points added since the running statistics were last recomputed
+    numbaddd = 0
+    for k in range(numbdata):
+        
+        minmindx = listminmindx[k]
+        
+        # remove the data points leaving the window
+        boolreco = False
+        while minmindxsums < minmindx:
+            valu = ydat[minmindxsums] - refr
+            numbsums -= 1
+            if numbsums == 0:
+                meansums = 0.
+                sumssquadevi = 0.
+            else:
+                diff = valu - meansums
+                meansums -= diff / numbsums
+                term = diff * (valu - meansums)
+                sumssquadevi -= term
+                if sumssquadevi * factcanc < term:
+                    boolreco = True
+            if boolcuttpeak and ydat[minmindxsums] == listvalumono[indxmonoinit]:
+                listnumbmono[indxmonoinit] -= 1
+                if listnumbmono[indxmonoinit] == 0:
+                    indxmonoinit += 1
+            minmindxsums += 1
+        
+        # add the data points entering the window
+        while maxmindx < listmaxmindx[k]:
+            maxmindx += 1
+            numbaddd += 1
+            valu = ydat[maxmindx] - refr
+            numbsums += 1
+            diff = valu - meansums
+            meansums += diff / numbsums
+            sumssquadevi += diff * (valu - meansums)
+            if boolcuttpeak:
+                valu = ydat[maxmindx]
+                while indxmonofinl > indxmonoinit and listvalumono[indxmonofinl-1] < valu:
+                    indxmonofinl -= 1
+                if indxmonofinl > indxmonoinit and listvalumono[indxmonofinl-1] == valu:
+                    listnumbmono[indxmonofinl-1] += 1
+                else:
+                    listvalumono[indxmonofinl] = valu
+                    listnumbmono[indxmonofinl] = 1
+                    indxmonofinl += 1
+        
+        # recompute the running statistics from scratch once per window, which keeps the accumulated round-off errors bounded, 
+        # and after a cancellation when a data point dominating the window leaves it
+        if numbaddd > maxmindx - minmindx or boolreco:
+            numbaddd = 0
+            numbsums = maxmindx - minmindx + 1
+            refr = 0.
+            for n in range(minmindx, maxmindx + 1):
+                refr += ydat[n]
+            refr /= numbsums
+            meansums = 0.
+            for n in range(minmindx, maxmindx + 1):
+                meansums += ydat[n] - refr
+            meansums /= numbsums
+            sumssquadevi = 0.
+            for n in range(minmindx, maxmindx + 1):
+                sumssquadevi += (ydat[n] - refr - meansums)**2
+        
+        # statistics of the window after excluding data points
+        numbwind = numbsums
+        meanwind = meansums
+        sumssquadeviwind = sumssquadevi
+        boolrecowind = False
         if boolcuttpeak:
-            indxdatawind = np.arange(minmindx, maxmindx+1)
-            #indxdatawind = indxdatawind[np.where(ydat[indxdatawind] < np.percentile(ydat[indxdatawind], 99.999))]
-            indxdatawind = indxdatawind[np.where(ydat[indxdatawind] != np.amax(ydat[indxdatawind]))]
-        
+            # exclude all occurrences of the maximum inside the window
+            valu = listvalumono[indxmonoinit]
+            numb = listnumbmono[indxmonoinit]
+            if numbwind > numb:
+                diff = valu - refr - meanwind
+                term = numb * numbwind / (numbwind - numb) * diff**2
+                meanwind -= numb * diff / (numbwind - numb)
+                sumssquadeviwind -= term
+                if sumssquadeviwind * factcanc < term:
+                    boolrecowind = True
+            numbwind -= numb
         else:
-            if k > minmindx and k+1 < maxmindx:
-                indxdatawind = np.concatenate((np.arange(minmindx, k), np.arange(k+1, maxmindx+1)))
-            elif k > minmindx:
-                indxdatawind = np.arange(minmindx, k)
-            elif k+1 < maxmindx:
-                indxdatawind = np.arange(k+1, maxmindx+1)
-
-        stdv[k] = np.std(ydat[indxdatawind])
+            # exclude the data point itself and, near the end of the series, the data point following it
+            for m in range(2):
+                if m == 0:
+                    n = k
+                elif k + 1 == maxmindx:
+                    n = maxmindx
+                else:
+                    continue
+                valu = ydat[n] - refr
+                numbwind -= 1
+                if numbwind > 0:
+                    diff = valu - meanwind
+                    meanwind -= diff / numbwind
+                    term = diff * (valu - meanwind)
+                    sumssquadeviwind -= term
+                    if sumssquadeviwind * factcanc < term:
+                        boolrecowind = True
+        
+        if numbwind > 0:
+            if boolrecowind:
+                meanwind = 0.
+                for n in range(minmindx, maxmindx + 1):
+                    if boolcuttpeak and ydat[n] == valu or not boolcuttpeak and (n == k or n == maxmindx and k + 1 == maxmindx):
+                        continue
+                    meanwind += ydat[n]
+                meanwind /= numbwind
+                sumssquadeviwind = 0.
+                for n in range(minmindx, maxmindx + 1):
+                    if boolcuttpeak and ydat[n] == valu or not boolcuttpeak and (n == k or n == maxmindx and k + 1 == maxmindx):
+                        continue
+                    sumssquadeviwind += (ydat[n] - meanwind)**2
+            
+            stdv[k] = np.sqrt(max(0., sumssquadeviwind / numbwind))
+        else:
+            stdv[k] = np.nan
     
     return stdv
 
@@ -7923,6 +10924,12 @@ def init( \
          timescalbdtrmedi=2., \
          #### time scale for spline baseline detrending [days]
          listtimescalbdtr=[2.], \
+         #### number of processes or threads over which the regions of the time-series are detrended in parallel
+         numbprocbdtr=None, \
+         #### type of the pool for detrending in parallel: 'thrd' for threads or 'proc' for processes
+         typepoolbdtr='thrd', \
+         #### Boolean flag to optimize the parameters of the GP baseline over the joint likelihood of the regions of each time-series
+         booloptigpro=False, \
 
          ### maximum frequency (per day) for LS periodogram
          maxmfreqlspe=None, \
@@ -10896,6 +13903,14 @@ def init( \
                 gdat.listarrytser[strgarryclipinpt] = [[[[] for y in gdat.indxchun[b][p]] for p in gdat.indxinst[b]] for b in gdat.indxdatatser]
                 gdat.listarrytser[strgarrybdtrblin] = [[[[] for y in gdat.indxchun[b][p]] for p in gdat.indxinst[b]] for b in gdat.indxdatatser]
         
+        # pool over which the regions of the time-series are detrended in parallel
+        if gdat.numbprocbdtr is not None and gdat.numbprocbdtr > 1:
+            if gdat.typeverb > 0:
+                print('Detrending the regions of the time-series over %d %s...' % (gdat.numbprocbdtr, {'thrd': 'threads', 'proc': 'processes'}[gdat.typepoolbdtr]))
+            gdat.objtpoolbdtr = retr_poolbdtr(gdat.numbprocbdtr, typepool=gdat.typepoolbdtr)
+        else:
+            gdat.objtpoolbdtr = None
+        
         # iterate over all detrending time scales (including, but not limited to the (first) time scale used for later analysis and model)
         gdat.indxenerclip = 0
         for z, timescalbdtr in enumerate(gdat.listtimescalbdtr):
@@ -10927,6 +13942,9 @@ def init( \
                     indxtimetotl = np.arange(gdat.listarrytser['maskcust'][0][p][y].shape[0])
                     indxtimekeep = np.copy(indxtimetotl)
                     
+                    # detrended regions carried across the clipping iterations so that only the regions that lost samples are fitted again
+                    dictwarm = dict()
+                    
                     r = 0
                     while True:
                         
@@ -10952,7 +13970,7 @@ def init( \
                         if gdat.typeverb > 0:
                             print('Trial detrending into %s...' % strgarryclipinpt)
                         bdtr_wrap(gdat, 0, p, y, gdat.epocmask, gdat.perimask, gdat.fitt.duramask, strgarrybdtrinpt, strgarryclipinpt, 'temp', \
-                                                                                                                    timescalbdtr=timescalbdtr)
+                                                                                                                    timescalbdtr=timescalbdtr, dictwarm=dictwarm)
                         
                         if r == 0:
                             gdat.listtimebrekfrst = np.copy(gdat.listtimebrek)
@@ -11094,6 +14112,11 @@ def init( \
                             print('Writing to %s...' % path)
                         np.savetxt(path, gdat.listarrytser[strgarrybdtr][0][p][y][:, e, :], delimiter=',', header=gdat.strgheadtser[0])
         
+        if gdat.objtpoolbdtr is not None:
+            gdat.objtpoolbdtr.close()
+            gdat.objtpoolbdtr.join()
+            gdat.objtpoolbdtr = None
+        
         # place the output of detrending into the baseline-detrended 'Detrended' light curve
         if gdat.listtimescalbdtr[0] == 0.:
             gdat.listarrytser['Detrended'] = gdat.listarrytser['maskcust']
@@ -11274,9 +14297,14 @@ def init( \
             # input data to the periodic box search pipeline
             if gdat.boolanlsbandmerg:
                 listarry = []
-                for tk_ in gdat.indxanlsband:
-                    listarry.append(gdat.arrytser['Detrended'][0][tk_][:, 0, :])
-                arry = np.concatenate(listarry)
+                for tk_ in gdat.indxband:
+                    listarry.append(np.copy(gdat.arrytser['Detrended'][0][tk_][:, 0, :]))
+                if len(listarry) > 1 and (not 'typecalc' in gdat.dictboxsperiinpt or gdat.dictboxsperiinpt['typecalc'] == 'native'):
+                    # search the bands jointly, each at its own cadence, in a single process
+                    arry = listarry
+                else:
+                    arry = np.concatenate(listarry)
+                    arry = arry[np.argsort(arry[:, 0]), :]
                 strgextn = 'Merged'
             else:
                 arry = np.copy(gdat.arrytser['Detrended'][0][tk][:, 0, :])
@@ -11482,13 +14510,18 @@ def init( \
                 for h in gdat.indxfittiter:
                     if gdat.numbinst[b] > 1:
                         strgextn = '%s%s_%s' % (gdat.liststrgdatatser[b], gdat.liststrgdatafittiter[h], gdat.strgtarg)
-                        gdat.dictlspeoutp = exec_lspe(gdat.arrytsertotl[b][:, e, :], pathvisu=pathvisulspe, strgextn=strgextn, maxmfreq=maxmfreqlspe, \
+                        gdat.dictlspeoutp = exec_lspe(gdat.arrytsertotl[b], pathvisu=pathvisulspe, strgextn=strgextn, maxmfreq=maxmfreqlspe, \
                                                                                   typeverb=gdat.typeverb, typefileplot=gdat.typefileplot, pathdata=gdat.pathdatatarg)
                     
                     for p in gdat.indxinst[b]:
                         for strg in liststrgarrylspe:
                             strgextn = '%s_%s_%s%s_%s' % (strg, gdat.liststrgdatatser[b], gdat.liststrginst[b][p], gdat.liststrgdatafittiter[h], gdat.strgtarg) 
-                            gdat.dictlspeoutp = exec_lspe(gdat.arrytser[strg][b][p][:, e, :], pathvisu=pathvisulspe, strgextn=strgextn, maxmfreq=maxmfreqlspe, \
+                            # the periodograms of all channels of a spectral time-series are computed at once
+                            if gdat.numbener[p] > 1:
+                                arrylspe = gdat.arrytser[strg][b][p]
+                            else:
+                                arrylspe = gdat.arrytser[strg][b][p][:, 0, :]
+                            gdat.dictlspeoutp = exec_lspe(arrylspe, pathvisu=pathvisulspe, strgextn=strgextn, maxmfreq=maxmfreqlspe, \
                                                                                   typeverb=gdat.typeverb, typefileplot=gdat.typefileplot, pathdata=gdat.pathdatatarg)
         
                     gdat.dictmileoutp['perilspempow'] = gdat.dictlspeoutp['perimpow']
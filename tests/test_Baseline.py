@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+
+import miletos
+
+
+def retr_lcursynt(seed=0, numbregi=4):
+    '''
+    Return a light curve of several regions separated by gaps, made of a slow variation and white noise.
+    '''
+
+    objtrand = np.random.default_rng(seed)
+    time = np.concatenate([np.linspace(k, k + 0.8, 1000) for k in range(numbregi)])
+    stdvlcur = np.full(time.size, 1e-3)
+    lcur = 1. + 0.01 * np.sin(3. * time) + stdvlcur * objtrand.standard_normal(time.size)
+
+    return time, lcur, stdvlcur
+
+
+def test_cachgpro():
+    '''
+    Repeated GP detrending should hit the cache of computed GP models and not be affected by changes to the GP models returned earlier.
+    '''
+
+    pytest.importorskip('celerite')
+
+    time, lcur, stdvlcur = retr_lcursynt()
+    miletos.setp_cachgpro(boolclea=True)
+
+    lcurbdtr, lcurbdtrregi, indxtimeregi, indxtimeregioutt, listobjtspln, timeedge = miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=0.5, \
+                                                                                                            typebdtr='GaussianProcess', typeverb=0)
+    numbregi = len(listobjtspln)
+    assert miletos.dictcachgpro['numbmiss'] == numbregi
+
+    lcurbdtrseco = miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=0.5, typebdtr='GaussianProcess', typeverb=0)[0]
+    assert miletos.dictcachgpro['numbhits'] == numbregi
+    assert np.array_equal(lcurbdtrseco, lcurbdtr)
+
+    # change the parameters of a returned GP model, which is the one in the cache
+    listobjtspln[0].set_parameter_vector(listobjtspln[0].get_parameter_vector() + 1.)
+
+    lcurbdtrthrd = miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=0.5, typebdtr='GaussianProcess', typeverb=0)[0]
+    assert np.array_equal(lcurbdtrthrd, lcurbdtr)
+    assert miletos.dictcachgpro['numbmiss'] == numbregi + 1
+
+
+def test_optigpro():
+    '''
+    The parameters optimized over the joint likelihood of the regions should increase the likelihood and keep the time scale near the requested one.
+    '''
+
+    pytest.importorskip('celerite')
+
+    time, lcur, stdvlcur = retr_lcursynt()
+    timescalbdtr = 0.5
+    listtime = [time[k*1000:(k+1)*1000] for k in range(4)]
+    listlcur = [lcur[k*1000:(k+1)*1000] for k in range(4)]
+    liststdvlcur = [stdvlcur[k*1000:(k+1)*1000] for k in range(4)]
+
+    paragpro = miletos.retr_paragproopti(listtime, listlcur, liststdvlcur, timescalbdtr, typeverb=0)
+    assert timescalbdtr / 2. <= np.exp(paragpro[1]) <= 2. * timescalbdtr
+
+    parainit = np.median([miletos.retr_parainitgpro(lcurregi, timescalbdtr) for lcurregi in listlcur], axis=0)
+    listobjtgpro = [miletos.retr_objtgpro(listtime[k], liststdvlcur[k], parainit, np.mean(listlcur[k]), boolcach=False) for k in range(4)]
+    assert miletos.retr_lliknegagprojoin(paragpro, listlcur, listobjtgpro) <= miletos.retr_lliknegagprojoin(parainit, listlcur, listobjtgpro)
+
+    # the optimized parameters are kept across the calls sharing dictwarm
+    dictwarm = dict()
+    lcurbdtr = miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=timescalbdtr, typebdtr='GaussianProcess', booloptigpro=True, \
+                                                                                                            dictwarm=dictwarm, typeverb=0)[0]
+    assert np.allclose(dictwarm['paragpro'][1], paragpro)
+    lcurbdtrwarm = miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=timescalbdtr, typebdtr='GaussianProcess', booloptigpro=True, \
+                                                                                                            dictwarm=dictwarm, typeverb=0)[0]
+    assert np.array_equal(lcurbdtrwarm, lcurbdtr)
+
+
+def test_objtsplnmult():
+    '''
+    The least-squares spline fitted to many channels at once should match scipy's spline fitted to each channel.
+    '''
+
+    import scipy.interpolate
+
+    objtrand = np.random.default_rng(2)
+    time = np.sort(objtrand.uniform(0., 5., 500))
+    lcur = np.stack([np.sin(time * k) + 0.1 * objtrand.standard_normal(time.size) for k in range(1, 4)], 1)
+    timeknot = np.linspace(0.5, 4.5, 9)
+
+    objtspln = miletos.retr_objtsplnmult(time, lcur, timeknot, 3)
+    for e in range(lcur.shape[1]):
+        objtsplnscip = scipy.interpolate.LSQUnivariateSpline(time, lcur[:, e], timeknot, k=3)
+        assert np.allclose(objtspln(time)[:, e], objtsplnscip(time), rtol=0., atol=1e-10)
+
+
+def test_dictwarm():
+    '''
+    After a region of the time-series changes, detrending with the regions kept in dictwarm should match detrending from scratch.
+    '''
+
+    time, lcur, stdvlcur = retr_lcursynt()
+
+    dictwarm = dict()
+    miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=0.5, dictwarm=dictwarm, typeverb=0)
+
+    lcur = np.copy(lcur)
+    lcur[(time > 2.) & (time < 3.)] += 1e-3 * np.sin(20. * time[(time > 2.) & (time < 3.)])
+
+    lcurbdtrwarm = miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=0.5, dictwarm=dictwarm, typeverb=0)[0]
+    lcurbdtrcold = miletos.bdtr_tser(time, lcur, stdvlcur, timescalbdtr=0.5, typeverb=0)[0]
+
+    assert np.array_equal(lcurbdtrwarm, lcurbdtrcold)
+
+
+@pytest.mark.parametrize('typepool', ['thrd', 'proc'])
+def test_listtser(typepool):
+    '''
+    Detrending many time-series at many time scales over a pool should give the same output as doing so serially.
+    '''
+
+    listtime = []
+    listlcur = []
+    liststdvlcur = []
+    for seed in range(3):
+        time, lcur, stdvlcur = retr_lcursynt(seed=seed)
+        listtime.append(time)
+        listlcur.append(lcur)
+        liststdvlcur.append(stdvlcur)
+
+    listlcurbdtr = miletos.bdtr_listtser(listtime, listlcur, liststdvlcur, [0.3, 0.5], typeverb=0)[0]
+    listlcurbdtrpool = miletos.bdtr_listtser(listtime, listlcur, liststdvlcur, [0.3, 0.5], numbproc=3, typepool=typepool, typeverb=0)[0]
+
+    for n in range(3):
+        for z in range(2):
+            assert np.array_equal(listlcurbdtrpool[n][z], listlcurbdtr[n][z])
+
+
+def test_listtsergpro(capsys):
+    '''
+    Detrending with Gaussian processes over a pool of processes should warn and fall back to detrending serially.
+    '''
+
+    time, lcur, stdvlcur = retr_lcursynt()
+
+    lcurbdtr = miletos.bdtr_listtser([time], [lcur], [stdvlcur], [0.5], typebdtr='GaussianProcess', typeverb=0)[0]
+    capsys.readouterr()
+    lcurbdtrpool = miletos.bdtr_listtser([time], [lcur], [stdvlcur], [0.5], typebdtr='GaussianProcess', numbproc=2, typepool='proc', typeverb=0)[0]
+
+    assert 'Detrending the regions serially' in capsys.readouterr().out
+    assert np.array_equal(lcurbdtrpool[0][0], lcurbdtr[0][0])
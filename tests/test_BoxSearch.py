@@ -0,0 +1,265 @@
+import numpy as np
+import pytest
+
+import miletos
+
+
+def retr_arryinje(peri, seed, dept=2e-3, stdv=2e-3, dura=2.5/24., delttime=27.):
+    '''
+    Return a light curve at a 2-minute cadence with a periodic box of given period and depth injected at a random epoch.
+    '''
+
+    objtrand = np.random.default_rng(seed)
+    time = np.arange(0., delttime, 2. / 60. / 24.)
+    epoc = 0.3 + objtrand.random() * peri
+    rflx = 1. + stdv * objtrand.standard_normal(time.size)
+    phas = ((time - epoc) / peri + 0.5) % 1. - 0.5
+    rflx[np.abs(phas) < dura / peri / 2.] -= dept
+    arry = np.stack([time, rflx, np.full(time.size, stdv)], 1)
+
+    return arry
+
+
+@pytest.mark.parametrize('peri', [2.37, 3.21, 4.63])
+def test_coarfine(peri):
+    '''
+    The coarse-to-fine search should recover the same period and epoch as the single pass.
+    '''
+
+    arry = retr_arryinje(peri, 2)
+    dictsing = miletos.srch_boxsperi(arry, minmperi=1., boolprocmult=False, typeverb=0)
+    dictcoarfine = miletos.srch_boxsperi(arry, minmperi=1., boolprocmult=False, boolcoarfine=True, typeverb=0)
+
+    assert abs(dictsing['peri'][0] - peri) / peri < 0.01
+    assert dictcoarfine['peri'][0] == dictsing['peri'][0]
+    assert dictcoarfine['epoc'][0] == dictsing['epoc'][0]
+
+
+def test_gridofir():
+    '''
+    The duration-aware frequency grid should have fewer trial periods than the uniform grid and recover at least as many injected boxes.
+    '''
+
+    minmfreq = 1. / 27.
+    maxmfreq = 1.
+    numbperiunif = miletos.retr_listfreqboxsperi(minmfreq, maxmfreq, 10., 'unif', 27., 0.5, None).size
+    numbperiofir = miletos.retr_listfreqboxsperi(minmfreq, maxmfreq, 10., 'ofir', 27., 0.5, None).size
+    assert numbperiofir < numbperiunif
+
+    dictnumbreco = {'unif': 0, 'ofir': 0}
+    for peri in [1.3, 1.9, 2.37, 3.21]:
+        for seed in [0, 1]:
+            arry = retr_arryinje(peri, seed)
+            for typegridfreq in dictnumbreco:
+                dictboxsperioutp = miletos.srch_boxsperi(arry, minmperi=1., boolprocmult=False, typegridfreq=typegridfreq, typeverb=0)
+                if abs(dictboxsperioutp['peri'][0] - peri) / peri < 0.01:
+                    dictnumbreco[typegridfreq] += 1
+
+    assert dictnumbreco['ofir'] >= dictnumbreco['unif']
+
+
+def test_benchboxsperi():
+    '''
+    The backends should recover the injected boxes at similar rates when scored on the same baseline-tied grid and detection statistic.
+    '''
+
+    dictbenc = miletos.exec_benchboxsperi(listtypecalc=['native', 'ffa', 'astropy'], numbinje=6)
+
+    assert dictbenc['native']['fracreco'] >= 0.5
+    for typecalc in ['ffa', 'astropy']:
+        assert abs(dictbenc['native']['fracreco'] - dictbenc[typecalc]['fracreco']) <= 1. / 6.
+
+
+def test_join(capsys):
+    '''
+    The joint search over two instruments with different cadences and baselines should recover the injected box 
+    and warn that the incremental update is not used, as well as the pool of processes when it is explicitly requested.
+    '''
+
+    peri = 2.3
+    epoc = 1.3
+    dura = 2.5 / 24.
+    listarry = []
+    objtrand = np.random.default_rng(1)
+    for time, stdv in [[np.arange(0., 27., 2. / 60. / 24.), 2e-3], [np.arange(27., 60., 30. / 60. / 24.), 1.5e-3]]:
+        rflx = 1. + stdv * objtrand.standard_normal(time.size)
+        rflx[np.abs(((time - epoc) / peri + 0.5) % 1. - 0.5) < dura / peri / 2.] -= 2.5e-3
+        listarry.append(np.stack([time, rflx, np.full(time.size, stdv)], 1))
+
+    dictboxsperioutp = miletos.srch_boxsperi(listarry, minmperi=1.5, maxmperi=3., boolincr=True, typeverb=0)
+
+    assert abs(dictboxsperioutp['peri'][0] - peri) / peri < 0.01
+    assert abs(((dictboxsperioutp['epoc'][0] - epoc) / peri + 0.5) % 1. - 0.5) * peri < dura / 2.
+
+    strgoutp = capsys.readouterr().out
+    assert not 'Ignoring boolprocmult' in strgoutp
+    assert 'Ignoring boolincr' in strgoutp
+    
+    miletos.srch_boxsperi(listarry, minmperi=1.5, maxmperi=3., boolprocmult=True, typeverb=0)
+    strgoutp = capsys.readouterr().out
+    assert 'Ignoring boolprocmult' in strgoutp
+    assert not 'Ignoring boolincr' in strgoutp
+
+
+def test_rflxitraboxsperi():
+    '''
+    The mean in-transit relative flux of the trial boxes evaluated from the cumulative sums of the phase histogram should match brute force, 
+    including the boxes that wrap around the phase.
+    '''
+
+    objtrand = np.random.default_rng(4)
+    peri = 2.7
+    time = np.sort(objtrand.uniform(0., 27., 5000))
+    rflx = 1. + 1e-3 * objtrand.standard_normal(time.size)
+    phas = (time % peri) / peri
+
+    numbbinsphas = 1000
+    dcyc = 0.05
+    cumsnumb, cumsdflx = miletos.retr_cumsphas(phas, rflx, numbbinsphas)
+
+    # epochs at the bin edges, such that the box edges are also at the bin edges
+    epoc = np.array([0, 3, 400, 990, 999]) * peri / numbbinsphas
+    indxepocgood, rflxitra = miletos.retr_rflxitraboxsperi(cumsnumb, cumsdflx, numbbinsphas, peri, dcyc, epoc)
+
+    assert np.array_equal(indxepocgood, np.arange(epoc.size))
+    for k in range(epoc.size):
+        booltran = np.abs((phas - epoc[k] / peri + 0.5) % 1. - 0.5) < dcyc / 2.
+        assert np.isclose(rflxitra[k], np.mean(rflx[booltran]), rtol=0., atol=1e-12)
+
+
+def retr_arrytwoo():
+    '''
+    Return a light curve with two periodic boxes of different periods.
+    '''
+
+    arry = retr_arryinje(2.37, 3)
+    time = arry[:, 0]
+    arry[np.abs(((time - 1.1) / 3.9 + 0.5) % 1. - 0.5) < 2. / 24. / 3.9 / 2., 1] -= 2e-3
+
+    return arry
+
+
+@pytest.mark.parametrize('dictpara', [{'typecalc': 'numba'}, {'boolprocmult': True, 'numbproc': 2}, {'boolincr': True}, \
+                                      {'typecalc': 'numba', 'boolincr': True}, {'boolprocmult': True, 'numbproc': 2, 'boolincr': True}])
+def test_backboxsperi(dictpara):
+    '''
+    The other ways of running the periodic box search should give the same detections as the native search in a single process.
+    '''
+
+    arry = retr_arrytwoo()
+    dictnatv = miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=2, boolprocmult=False, typeverb=0)
+    dictpara = dict(dictpara)
+    dictpara.setdefault('boolprocmult', False)
+    dicttest = miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=2, typeverb=0, **dictpara)
+
+    assert len(dicttest['peri']) == len(dictnatv['peri']) == 2
+    for name in ['peri', 'epoc', 'dura']:
+        assert np.array_equal(dicttest[name], dictnatv[name])
+    assert np.allclose(dicttest['s2nr'], dictnatv['s2nr'], rtol=1e-10, atol=0.)
+
+
+def test_poolaftrnumb():
+    '''
+    A search over a pool of processes should not deadlock after the compiled backend has started its threads in the same process.
+    '''
+
+    arry = retr_arryinje(2.37, 2)
+    dictnumb = miletos.srch_boxsperi(arry, minmperi=1., typecalc='numba', boolprocmult=False, typeverb=0)
+    dictpool = miletos.srch_boxsperi(arry, minmperi=1., numbproc=2, typeverb=0)
+
+    assert dictpool['peri'][0] == dictnumb['peri'][0]
+
+
+def test_chkpboxsperi(tmp_path, monkeypatch):
+    '''
+    A search interrupted after writing a checkpoint should resume from it and give the same detections as an uninterrupted search.
+    '''
+
+    import miletos.main
+
+    arry = retr_arrytwoo()
+    pathdata = str(tmp_path) + '/'
+    dictrefr = miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=2, boolprocmult=False, typeverb=0)
+
+    # interrupt the search right after its first checkpoint
+    writ_chkpboxsperi = miletos.main.writ_chkpboxsperi
+    def writ_chkpboxsperiintr(*args):
+        writ_chkpboxsperi(*args)
+        raise KeyboardInterrupt
+    monkeypatch.setattr(miletos.main, 'writ_chkpboxsperi', writ_chkpboxsperiintr)
+    with pytest.raises(KeyboardInterrupt):
+        miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=2, boolprocmult=False, pathdata=pathdata, timechkp=-1., typeverb=0)
+    monkeypatch.setattr(miletos.main, 'writ_chkpboxsperi', writ_chkpboxsperi)
+    assert len(list(tmp_path.glob('boxsperi_chkp_*.npz'))) == 1
+
+    dictresu = miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=2, boolprocmult=False, pathdata=pathdata, typeverb=0)
+    assert len(list(tmp_path.glob('boxsperi_chkp_*'))) == 0
+
+    for name in ['peri', 'epoc', 'dura']:
+        assert np.array_equal(dictresu[name], dictrefr[name])
+    assert np.allclose(dictresu['s2nr'], dictrefr['s2nr'], rtol=1e-10, atol=0.)
+
+
+def test_specboxsperi(tmp_path, monkeypatch):
+    '''
+    A rerun should reproduce the detections from the stored spectra without searching, and search again once the detection parameters require it.
+    '''
+
+    import miletos.main
+
+    arry = retr_arrytwoo()
+    pathdata = str(tmp_path) + '/'
+    dictrefr = miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=2, boolprocmult=False, pathdata=pathdata, typeverb=0)
+    assert (tmp_path / 'boxsperi_spec.npz').exists()
+
+    # the stored spectra are reused without searching
+    srch_boxsperi_work = miletos.main.srch_boxsperi_work
+    def srch_boxsperi_workfail(*args, **kwargs):
+        raise Exception('The periodic box search should not run when the stored spectra are reused.')
+    monkeypatch.setattr(miletos.main, 'srch_boxsperi_work', srch_boxsperi_workfail)
+    (tmp_path / 'boxsperi.csv').unlink()
+    dictreus = miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=2, boolprocmult=False, pathdata=pathdata, typeverb=0)
+
+    for name in ['peri', 'epoc', 'dura']:
+        assert np.array_equal(dictreus[name], dictrefr[name])
+    assert np.allclose(dictreus['s2nr'], dictrefr['s2nr'], rtol=1e-10, atol=0.)
+
+    # more detections than stored require searching again
+    with pytest.raises(Exception, match='should not run'):
+        miletos.srch_boxsperi(arry, minmperi=1., maxmnumbboxsperi=3, boolprocmult=False, pathdata=pathdata, typeverb=0)
+    monkeypatch.setattr(miletos.main, 'srch_boxsperi_work', srch_boxsperi_work)
+
+
+@pytest.mark.parametrize('boolprocmult', [False, True])
+def test_boxsperimult(boolprocmult):
+    '''
+    Searching many targets at once should return the highest peak of each target as found by searching each target separately.
+    '''
+
+    listarry = [retr_arryinje(2.37, 2), retr_arryinje(3.21, 2), retr_arryinje(1.9, 1)[::2, :]]
+    listdictmult = miletos.srch_boxsperi_mult(listarry, minmperi=1., boolprocmult=boolprocmult, numbproc=2, typeverb=0)
+
+    assert len(listdictmult) == len(listarry)
+    for arry, dictmult in zip(listarry, listdictmult):
+        dictsing = miletos.srch_boxsperi(arry, minmperi=1., boolprocmult=False, typeverb=0)
+        assert len(dictmult['peri']) == 1
+        for name in ['peri', 'epoc', 'dura']:
+            assert np.array_equal(dictmult[name], dictsing[name][:1])
+        assert np.allclose(dictmult['s2nr'], dictsing['s2nr'][:1], rtol=1e-10, atol=0.)
+
+
+@pytest.mark.parametrize('peri', [2.37, 3.21, 4.63])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_ffatboxsperi(peri, seed):
+    '''
+    The fast-folding backend should recover the injected box and agree with the native backend on the period and, within the trial duration, on the epoch.
+    '''
+
+    arry = retr_arryinje(peri, seed, dept=3e-3)
+    dictnatv = miletos.srch_boxsperi(arry, minmperi=1., boolprocmult=False, typeverb=0)
+    dictffat = miletos.srch_boxsperi(arry, minmperi=1., boolprocmult=False, typecalc='ffa', typeverb=0)
+
+    assert abs(dictffat['peri'][0] - peri) / peri < 0.01
+    assert dictffat['peri'][0] == dictnatv['peri'][0]
+    diffepoc = ((dictffat['epoc'][0] - dictnatv['epoc'][0]) / peri + 0.5) % 1. - 0.5
+    assert abs(diffepoc) * peri < dictnatv['dura'][0] / 24.
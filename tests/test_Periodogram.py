@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+import astropy.timeseries
+
+import miletos
+
+
+def retr_arrysynt(seed=1, numbtime=3000):
+    '''
+    Return irregular times and three channels of sinusoids with white noise.
+    '''
+
+    objtrand = np.random.default_rng(seed)
+    time = np.sort(objtrand.uniform(0., 27., numbtime))
+    lcur = np.stack([np.sin(2. * np.pi * time / peri) + objtrand.standard_normal(numbtime) for peri in [1.3, 2.2, 5.]], 1)
+
+    return time, lcur
+
+
+def retr_powrastr(time, lcur, freq):
+    '''
+    Return the exact LS power of each channel from astropy.
+    '''
+
+    return np.stack([astropy.timeseries.LombScargle(time, lcur[:, e]).power(freq, method='cython') for e in range(lcur.shape[1])], 1)
+
+
+@pytest.mark.parametrize('tolrlspe', [1e-4, 1e-8])
+def test_powrlspefast(tolrlspe):
+    '''
+    The fast LS power of all channels should match the exact power to about the requested tolerance.
+    '''
+
+    time, lcur = retr_arrysynt()
+    freq = miletos.retr_freqlspe(1. / 27., 10., 3.)
+    powr, errr, timeexac = miletos.retr_powrlspefast(time, lcur, freq, tolrlspe)
+
+    assert errr < tolrlspe
+    assert np.amax(np.abs(powr - retr_powrastr(time, lcur, freq))) < 10. * tolrlspe
+
+    powrsing = miletos.retr_powrlspefast(time, lcur[:, 1], freq, tolrlspe)[0]
+    assert np.allclose(powrsing, powr[:, 1], rtol=0., atol=10. * tolrlspe)
+
+
+def test_freqlspe():
+    '''
+    The cached frequency grid should not be writeable by the callers.
+    '''
+
+    freq = miletos.retr_freqlspe(1. / 27., 10., 3.)
+    with pytest.raises(ValueError):
+        freq[0] = 0.
+    assert miletos.retr_freqlspe(1. / 27., 10., 3.)[0] == 1. / 27.
+
+
+def test_powrlspemult():
+    '''
+    The LS power of all channels computed at once should match the exact power of each channel from astropy to numerical precision.
+    '''
+
+    time, lcur = retr_arrysynt()
+    freq = miletos.retr_freqlspe(1. / 27., 10., 3.)
+    powr = miletos.retr_powrlspemult(time, lcur, freq, maxmsizeblok=int(1e6))
+
+    assert np.amax(np.abs(powr - retr_powrastr(time, lcur, freq))) < 1e-12
+
+
+def test_lspecach(tmp_path, capsys):
+    '''
+    The LS periodogram stored under pathdata should be reused by a call with the same inputs, also to make a missing plot, 
+    and recomputed when the inputs change.
+    '''
+
+    time, lcur = retr_arrysynt()
+    arrylcur = np.stack([time, lcur[:, 0], np.ones(time.size)], 1)
+    pathdata = str(tmp_path) + '/'
+    pathvisu = str(tmp_path) + '/'
+
+    dictlspeoutp = miletos.exec_lspe(arrylcur, pathdata=pathdata, pathvisu=pathvisu, strgextn='test')
+    assert 'Calculating LS periodogram' in capsys.readouterr().out
+    assert len(list(tmp_path.glob('LSPeriodogram_test.npz'))) == 1
+
+    # the stored periodogram is reused, including to make the plot again after it is deleted
+    (tmp_path / 'LSPeriodogram_test.png').unlink()
+    dictlspeoutpseco = miletos.exec_lspe(arrylcur, pathdata=pathdata, pathvisu=pathvisu, strgextn='test')
+    strgoutp = capsys.readouterr().out
+    assert 'Calculating LS periodogram' not in strgoutp
+    assert 'Reading from' in strgoutp
+    assert (tmp_path / 'LSPeriodogram_test.png').exists()
+    for name in ['perimpow', 'powrmpow', 'powrfals']:
+        assert np.array_equal(dictlspeoutpseco[name], dictlspeoutp[name])
+
+    # the stored periodogram is outdated when the data change
+    arrylcur[:, 1] = lcur[:, 1]
+    dictlspeoutpthrd = miletos.exec_lspe(arrylcur, pathdata=pathdata, strgextn='test')
+    assert 'Calculating LS periodogram' in capsys.readouterr().out
+    assert abs(dictlspeoutpthrd['perimpow'] - 2.2) / 2.2 < 0.01
+    assert dictlspeoutpthrd['perimpow'] == miletos.exec_lspe(arrylcur, typeverb=0)['perimpow']
+
+
+def test_lspetypecalc():
+    '''
+    An unknown type of evaluation of the LS periodogram should raise an error naming the valid types.
+    '''
+
+    time, lcur = retr_arrysynt()
+    with pytest.raises(Exception, match="'auto', 'exact' or 'fast'"):
+        miletos.exec_lspe(np.stack([time, lcur[:, 0], np.ones(time.size)], 1), typecalc='nufft', typeverb=0)
+
+
+@pytest.mark.parametrize('listindxsect', [[0, 1, 2], [0, 2, 1]])
+def test_lspeincr(tmp_path, listindxsect):
+    '''
+    The LS periodogram updated one sector at a time, including a sector filling a gap between the sectors seen so far, 
+    should match the exact power of all samples from astropy.
+    '''
+
+    time, lcur = retr_arrysynt(numbtime=6000)
+    lcur = lcur[:, 0]
+    arrylcur = np.stack([time, lcur, np.ones(time.size)], 1)
+    pathdata = str(tmp_path) + '/'
+
+    indxsect = np.floor(time / 9.).astype(int)
+    boolseen = np.zeros(time.size, dtype=bool)
+    for k in listindxsect:
+        boolseen |= indxsect == k
+        # the samples seen earlier are passed again along with the new sector
+        dictlspeoutp = miletos.exec_lspeincr(arrylcur[boolseen, :], pathdata, typeverb=0)
+
+    powr = astropy.timeseries.LombScargle(time, lcur).power(1. / dictlspeoutp['peri'], method='cython')
+    assert np.amax(np.abs(dictlspeoutp['powr'] - powr)) < 1e-12
+    assert abs(dictlspeoutp['perimpow'] - 1.3) / 1.3 < 0.01
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+import miletos
+
+
+def retr_stdvwindbrut(ydat, listminmindx, listmaxmindx, boolcuttpeak):
+    '''
+    Return the standard deviation inside running windows by brute force.
+    '''
+
+    stdv = np.full(ydat.size, np.nan)
+    for k in range(ydat.size):
+        indxwind = np.arange(listminmindx[k], listmaxmindx[k] + 1)
+        if boolcuttpeak:
+            indxwind = indxwind[ydat[indxwind] != np.amax(ydat[indxwind])]
+        else:
+            indxwind = indxwind[indxwind != k]
+            if k + 1 == listmaxmindx[k]:
+                indxwind = indxwind[indxwind != listmaxmindx[k]]
+        if indxwind.size > 0:
+            stdv[k] = np.std(ydat[indxwind])
+
+    return stdv
+
+
+@pytest.mark.parametrize('boolcuttpeak', [True, False])
+def test_stdvwind(boolcuttpeak):
+    '''
+    The running standard deviation should match brute force over windows of a fixed number of data points and of a fixed width in sorted xdat.
+    '''
+
+    objtrand = np.random.default_rng(0)
+    numbdata = 2000
+    indxdata = np.arange(numbdata)
+    # near-constant series with a large offset and series with isolated spikes dominating the windows
+    ydatspik = objtrand.standard_normal(numbdata)
+    ydatspik[::300] = 1e7
+    listydat = [objtrand.standard_normal(numbdata), np.round(3. * objtrand.standard_normal(numbdata)), 1e4 + np.cumsum(objtrand.standard_normal(numbdata)), \
+                                                                                            1e8 + 1e-3 * objtrand.standard_normal(numbdata), ydatspik]
+    for ydat in listydat:
+        stdv = miletos.retr_stdvwind(ydat, 51, boolcuttpeak=boolcuttpeak)
+        stdvbrut = retr_stdvwindbrut(ydat, np.maximum(0, indxdata - 25), np.minimum(numbdata - 1, indxdata + 25), boolcuttpeak)
+        assert np.allclose(stdv, stdvbrut, rtol=1e-7, equal_nan=True)
+
+        xdat = np.sort(objtrand.random(numbdata))**3
+        stdv = miletos.retr_stdvwind(ydat, 0.02, boolcuttpeak=boolcuttpeak, xdat=xdat)
+        stdvbrut = retr_stdvwindbrut(ydat, np.searchsorted(xdat, xdat - 0.01), np.searchsorted(xdat, xdat + 0.01, side='right') - 1, boolcuttpeak)
+        assert np.allclose(stdv, stdvbrut, rtol=1e-7, atol=1e-12, equal_nan=True)
+
+
+def retr_arryrebn(seed=5, numbtime=3000):
+    '''
+    Return a sorted time-series to be rebinned.
+    '''
+
+    objtrand = np.random.default_rng(seed)
+    time = np.sort(objtrand.uniform(0., 10., numbtime))
+    arry = np.stack([time, 1. + 1e-3 * objtrand.standard_normal(numbtime), np.full(numbtime, 1e-3)], 1)
+
+    return arry
+
+
+def test_rebnsort():
+    '''
+    Rebinning a sorted time-series, which locates the samples of each bin by bisection, should match rebinning it after shuffling.
+    '''
+
+    arry = retr_arryrebn()
+    arryshuf = arry[np.random.default_rng(0).permutation(arry.shape[0]), :]
+    for dictpara in [{'delt': 0.1}, {'numbbins': 37}, {'blimxdat': np.linspace(-1., 11., 50)}]:
+        arryrebn = miletos.rebn_tser(arry, **dictpara)
+        arryrebnshuf = miletos.rebn_tser(arryshuf, **dictpara)
+        assert np.allclose(arryrebn, arryrebnshuf, rtol=1e-12, atol=0., equal_nan=True)
+
+
+def test_cachrebn():
+    '''
+    The cache of rebinned time-series should count hits and misses, return copies that the callers can modify, and evict the least recently used entries.
+    '''
+
+    arry = retr_arryrebn()
+    miletos.setp_cachrebn(maxmsize=500e6, boolclea=True)
+
+    # the cache is only used when enabled
+    miletos.rebn_tser(arry, delt=0.1)
+    assert miletos.dictcachrebn['numbmiss'] == 0
+
+    arryrebn = miletos.rebn_tser(arry, delt=0.1, boolcach=True)
+    assert miletos.dictcachrebn['numbmiss'] == 1
+    assert np.array_equal(arryrebn, miletos.rebn_tser(arry, delt=0.1), equal_nan=True)
+
+    # modifying a returned rebinned time-series does not affect the cache
+    arryrebn[:, 1] = 0.
+    arryrebnseco = miletos.rebn_tser(arry, delt=0.1, boolcach=True, strghasharry=miletos.retr_strghasharry(arry))
+    assert miletos.dictcachrebn['numbhits'] == 1
+    assert np.array_equal(arryrebnseco, miletos.rebn_tser(arry, delt=0.1), equal_nan=True)
+
+    # a different binning or content is a miss
+    miletos.rebn_tser(arry, delt=0.2, boolcach=True)
+    arrymodi = arry.copy()
+    arrymodi[0, 1] += 1e-3
+    miletos.rebn_tser(arrymodi, delt=0.1, boolcach=True)
+    assert miletos.dictcachrebn['numbmiss'] == 3
+    assert len(miletos.dictcachrebn['dictarry']) == 3
+
+    # shrinking the cache evicts the least recently used entries first
+    miletos.rebn_tser(arry, delt=0.1, boolcach=True)
+    miletos.setp_cachrebn(maxmsize=2 * arryrebn.nbytes)
+    assert len(miletos.dictcachrebn['dictarry']) == 2
+    assert miletos.dictcachrebn['sizetotl'] <= 2 * arryrebn.nbytes
+    numbhits = miletos.dictcachrebn['numbhits']
+    miletos.rebn_tser(arry, delt=0.1, boolcach=True)
+    assert miletos.dictcachrebn['numbhits'] == numbhits + 1
+    miletos.rebn_tser(arry, delt=0.2, boolcach=True)
+    assert miletos.dictcachrebn['numbhits'] == numbhits + 1
+
+    miletos.setp_cachrebn(maxmsize=500e6, boolclea=True)
+
+
+@pytest.mark.parametrize('boolmask', [False, True])
+def test_medirunn(boolmask):
+    '''
+    The running median over a time window should match brute force on irregular times, including when samples are masked out of the windows.
+    '''
+
+    objtrand = np.random.default_rng(3)
+    time = np.sort(objtrand.uniform(0., 10., 2000))
+    ydat = objtrand.standard_normal(time.size)
+    timewind = 0.3
+    if boolmask:
+        boolfitt = objtrand.random(time.size) > 0.2
+    else:
+        boolfitt = np.ones(time.size, dtype=bool)
+
+    medi = miletos.retr_medirunn(time, ydat, timewind, boolfitt=boolfitt if boolmask else None)
+
+    medibrut = np.empty(time.size)
+    for k in range(time.size):
+        medibrut[k] = np.median(ydat[boolfitt & (np.abs(time - time[k]) <= timewind / 2.)])
+
+    assert np.allclose(medi, medibrut, rtol=0., atol=1e-12)